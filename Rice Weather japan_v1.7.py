@@ -1,8 +1,11 @@
+import argparse
 import os
 import sys
 # sourceフォルダからゲームのロジックを読み込む
 # これで RiceGameWindow クラスが使えるようになる
 from source.rice_game_window import RiceGameWindow
+from source import log
+from source.cache_paths import user_data_dir
 
 def resource_path(relative_path):
     """ 実行ファイル（.exe)とソースコードの両方でリソースへのパスを解決する """
@@ -14,8 +17,49 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def parse_size(text):
+    """'400x300' の形式の解像度を (幅, 高さ) に変換する"""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"解像度は 幅x高さ の形式で指定してください: {text}")
+    return width, height
+
+def parse_address(text):
+    """'8765' または '0.0.0.0:8765' の形式の待ち受けアドレスを (ホスト, ポート) に変換する"""
+    host, _, port = text.rpartition(":")
+    try:
+        return host or "0.0.0.0", int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"待ち受けアドレスは [ホスト:]ポート の形式で指定してください: {text}")
+
 def main():
     """メイン関数"""
+    parser = argparse.ArgumentParser(description="ファミコン風米価格アドベンチャー")
+    parser.add_argument("--profile", action="store_true",
+                        help="フレームのフェーズ別処理時間を計測し、終了時にCSVへ書き出す（F3でHUD表示）")
+    parser.add_argument("--record", metavar="PATH", help="放送（月・価格・ニュース・セリフ）を記録するファイル")
+    parser.add_argument("--replay", metavar="PATH", help="記録した放送を再生する（PageUp/PageDownで1年ずつ移動）")
+    parser.add_argument("--seek", type=int, default=None, metavar="MONTHS",
+                        help="再生を開始する月番号（記録開始からの月数）")
+    parser.add_argument("--native", type=parse_size, metavar="WxH",
+                        help="低解像度で描画し整数倍に拡大して表示する（例: 256x240, 400x300）")
+    parser.add_argument("--window", type=parse_size, metavar="WxH", help="ウィンドウの大きさ")
+    parser.add_argument("--fullscreen", action="store_true", help="全画面で表示する")
+    parser.add_argument("--time-scale", type=float, default=1.0, metavar="SCALE",
+                        help="ゲーム内時計の倍率（例: 100 で1年を約1分で進める）")
+    parser.add_argument("--prices", metavar="PATH_OR_URL",
+                        help="米価格の実データ（CSV/JSONLファイル、またはHTTPのURL）。無い月は乱数で代替")
+    parser.add_argument("--serve", type=parse_address, metavar="[HOST:]PORT",
+                        help="LAN内の画面へ放送を配信する（ブラウザで http://HOST:PORT/ を開く）")
+    parser.add_argument("--serve-frames", action="store_true",
+                        help="状態に加えて、変化した画面もPNGで配信する")
+    parser.add_argument("--state", metavar="PATH", default=os.path.join(user_data_dir(), "broadcast_state.rws"),
+                        help="月の切り替わりごとに状態を保存し、次回の起動時にその続きから再開するファイル")
+    parser.add_argument("--fresh", action="store_true", help="保存した状態を使わず、最初から始める")
+    parser.add_argument("--no-autosave", action="store_true", help="状態を保存しない")
+    args = parser.parse_args()
+
     print("=== ファミコン風米価格アドベンチャー v1.7 ===")
     print("新機能: ニュースCSV連携")
     print("")
@@ -24,10 +68,13 @@ def main():
     print("- 月の切り替わり時、10-36%の確率でニュースが表示されます")
     print("- ニュースは4秒間表示され、その後キャラクター会話が5秒間表示されます")
     print("- スペースキーでメッセージを進められます")
+    print("- F3キーで処理時間のHUDを表示、F4キーで計測結果をCSVに書き出します")
+    print("- Pキーで一時停止、1/2/3キーで1倍/10倍/100倍速、Nキーで次の月へ進みます")
     print("")
     print("必要ファイル・フォルダ構成:")
     print("- assets/data/news.csv: C列に名前、D列に本文を記載")
     print("- assets/images/characters/ - キャラクター画像")
+    print("- assets/images/<役割ID>_sheet.png - キャラクターのスプライトシート（任意。正方形のコマを横に並べ、1行目: 待機、2行目: 口パク）")
     print("- assets/images/backgrounds/ - 背景画像（spring.png, summer.png, autumn.png, winter.png）")
     print("- assets/images/rice/ - 米関連画像")
     print("- assets/images/ui/ - UI要素画像")
@@ -59,7 +106,23 @@ def main():
 
     print("\nゲームを開始します...")
 
-    game = RiceGameWindow()
+    # 異常終了時は直近のログを書き出す（RICE_LOG_LEVEL でログの詳細度を変更可能）
+    log.install_crash_dump()
+
+    game = RiceGameWindow(profile=args.profile, native_size=args.native,
+                          window_size=args.window, fullscreen=args.fullscreen,
+                          time_scale=args.time_scale)
+    if args.prices:
+        game.set_price_source(args.prices)
+    if args.replay:
+        game.start_replay(args.replay, args.seek)
+    elif not args.no_autosave:
+        # 再生中は保存しない（放送中の状態を上書きしないように）
+        game.enable_autosave(args.state, resume=not args.fresh)
+    if args.record:
+        game.start_recording(args.record)
+    if args.serve:
+        game.start_broadcast(*args.serve, frames=args.serve_frames)
     game.run()
 
 if __name__ == "__main__":
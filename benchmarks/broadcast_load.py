@@ -0,0 +1,160 @@
+"""配信サーバーに多数の合成クライアントをつなぎ、遅いクライアントがいても配信が滞らないことを確かめる負荷試験
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.broadcast_load --clients 300 --slow 0.1 --seconds 10
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from source.broadcast_server import BroadcastServer, read_websocket_frame
+
+
+class SyntheticClient:
+    """WebSocketで状態を受け取り、差分を重ねて手元の状態を保つクライアント"""
+
+    def __init__(self, stall: float = 0.0):
+        self.stall = stall  # 接続後、読み取りを止めておく秒数（遅い視聴者の模擬）
+        self.state = {}
+        self.messages = 0
+        self.frames = 0
+        self.bytes = 0
+        self.connected = asyncio.Event()
+
+    async def run(self, host: str, port: int, stop: asyncio.Event):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if self.stall:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (host, port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        writer.write((f"GET /ws HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                      "Sec-WebSocket-Version: 13\r\n\r\n").encode('latin-1'))
+        response = await reader.readuntil(b"\r\n\r\n")
+        if not response.startswith(b"HTTP/1.1 101"):
+            raise RuntimeError(response.decode('latin-1'))
+        self.connected.set()
+        if self.stall:
+            await asyncio.sleep(self.stall)
+        try:
+            while not stop.is_set():
+                try:
+                    opcode, payload = await asyncio.wait_for(read_websocket_frame(reader), 0.5)
+                except asyncio.TimeoutError:
+                    continue
+                self.bytes += len(payload)
+                if opcode == 0x1:
+                    self.messages += 1
+                    self.state.update(json.loads(payload))
+                elif opcode == 0x2:
+                    self.frames += 1
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def produce(server: BroadcastServer, seconds: float, rate: float, frames: bool, timings: list):
+    """文字送りと月の切り替えを模した状態を rate 回/秒で渡す（メインスレッドの代わり）"""
+    rng = random.Random(1)
+    surface = pygame.Surface((800, 600))
+    line = "今月の米価格は前月より上がりました。" * 3
+    month, price, typed = 1, 500, 0
+    interval = 1.0 / rate
+    deadline = time.perf_counter() + seconds
+    next_time = time.perf_counter()
+    while time.perf_counter() < deadline:
+        typed += 1
+        if typed > len(line):
+            typed = 0
+            month = month % 12 + 1
+            price = max(200, min(800, price + rng.randint(-100, 100)))
+        state = {"month": month, "price": price, "speaker": month % 3, "line": line, "typed": typed}
+        start = time.perf_counter()
+        server.publish_state(state)
+        if frames:
+            surface.fill((24, 24, 88))
+            surface.fill((252, 252, 6), (typed * 12 % 800, 400, 12, 24))
+            server.publish_frame(surface)
+        timings.append(time.perf_counter() - start)
+        next_time += interval
+        time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+async def run_load(args) -> int:
+    server = BroadcastServer("127.0.0.1", 0, frames=args.frames)
+    server.start()
+    stop = asyncio.Event()
+    slow_count = int(args.clients * args.slow)
+    clients = [SyntheticClient(args.stall if i < slow_count else 0.0) for i in range(args.clients)]
+    tasks = [asyncio.create_task(client.run("127.0.0.1", server.port, stop)) for client in clients]
+    await asyncio.wait_for(asyncio.gather(*(client.connected.wait() for client in clients)), 30)
+
+    timings = []
+    producer = threading.Thread(target=produce, args=(server, args.seconds, args.rate, args.frames, timings))
+    wall_start = time.perf_counter()
+    producer.start()
+    while producer.is_alive():
+        await asyncio.sleep(0.1)
+    produce_wall = time.perf_counter() - wall_start
+
+    # 遅いクライアントも含め、全員が最後の状態に追いつくまでの時間
+    final = dict(server.state, seq=server.seq)
+    converge_start = time.perf_counter()
+    while any(client.state != final for client in clients):
+        if time.perf_counter() - converge_start > args.stall + 30:
+            break
+        await asyncio.sleep(0.05)
+    converge = time.perf_counter() - converge_start
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    server.stop()
+
+    fast = [c for c in clients if not c.stall]
+    slow = [c for c in clients if c.stall]
+    behind = sum(1 for c in clients if c.state != final)
+    ordered = sorted(timings)
+    print(f"クライアント: {len(clients)}（遅い: {len(slow)}、{args.stall:.1f}秒停止）")
+    print(f"生成: {len(timings)}回 / {produce_wall:.2f}秒（目標 {args.rate:g}回/秒）, 配信した差分: {server.seq}")
+    print(f"publish の所要時間: 平均 {statistics.mean(timings) * 1e6:.0f}us, "
+          f"p99 {ordered[int(len(ordered) * 0.99)] * 1e6:.0f}us, 最大 {ordered[-1] * 1e6:.0f}us")
+    for label, group in (("通常", fast), ("遅い", slow)):
+        if group:
+            print(f"{label}クライアントの受信: 平均 {statistics.mean(c.messages for c in group):.0f}件, "
+                  f"画面 {statistics.mean(c.frames for c in group):.0f}枚, "
+                  f"{statistics.mean(c.bytes for c in group) / 1024:.0f}KiB")
+    if args.frames:
+        print(f"符号化した画面: {server.frames_encoded}枚")
+    print(f"最後の状態への収束: {converge:.2f}秒, 追いつかなかったクライアント: {behind}")
+    too_slow = produce_wall > args.seconds * 1.5
+    return 1 if behind or too_slow else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--slow", type=float, default=0.1, help="遅いクライアントの割合")
+    parser.add_argument("--stall", type=float, default=3.0, help="遅いクライアントが読み取りを止める秒数")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=float, default=50.0, help="状態を渡す回数（回/秒）")
+    parser.add_argument("--frames", action="store_true", help="画面（PNG）も配信する")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run_load(args)))
+
+
+if __name__ == "__main__":
+    main()
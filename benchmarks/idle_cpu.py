@@ -0,0 +1,66 @@
+"""アイドル時のCPU使用率を計測するベンチマーク
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.idle_cpu --seconds 10 --target 5
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from source.rice_game_window import RiceGameWindow
+
+
+def measure(game: RiceGameWindow, seconds: float) -> Tuple[float, int, int]:
+    """game.run() を動かし、開始時のメッセージを全文表示してから seconds 秒間の
+    CPU使用率（%）・描画したフレーム数・イベント待ちで眠った回数を返す"""
+    original_apply = game.apply_simulation_events
+    start = {}
+
+    def apply_and_reveal(events):
+        # run() の開始時（simulation.start() のイベント）だけ差し替え、以降は元に戻す
+        game.apply_simulation_events = original_apply
+        original_apply(events)
+        game.reveal_all(game.current_text())
+        assert game.message_index == len(game.current_text()), "メッセージが全文表示されていません"
+        timer = threading.Timer(seconds, lambda: pygame.event.post(pygame.event.Event(pygame.QUIT)))
+        start["cpu"] = time.process_time()
+        start["wall"] = time.perf_counter()
+        start["frames"] = game.scheduler.frames
+        start["idle_waits"] = game.scheduler.idle_waits
+        timer.start()
+
+    game.apply_simulation_events = apply_and_reveal
+    game.run()
+    cpu = time.process_time() - start["cpu"]
+    wall = time.perf_counter() - start["wall"]
+    return (cpu / wall * 100, game.scheduler.frames - start["frames"],
+            game.scheduler.idle_waits - start["idle_waits"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--target", type=float, default=5.0, help="アイドル時CPU使用率の上限（%%）")
+    args = parser.parse_args()
+
+    game = RiceGameWindow()
+    # 月切り替えを起こさず、全文表示済みのまま待機する状態を作る
+    game.simulation.character_message_duration = args.seconds * 10
+    game.play_sound_effect = lambda name: None
+    usage, frames, idle_waits = measure(game, args.seconds)
+
+    print(f"idle cpu: {usage:.2f}% (target {args.target:.2f}%)")
+    print(f"frames: {frames}, idle waits: {idle_waits}")
+    sys.exit(0 if usage <= args.target else 1)
+
+
+if __name__ == "__main__":
+    main()
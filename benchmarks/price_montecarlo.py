@@ -0,0 +1,42 @@
+"""NumPy版モンテカルロを、経路ごとにゲームの価格モデル（RiceSimulation）を動かす参照版と比較するベンチマーク
+
+同じ乱数列を使うため結果は一致するはずで、一致しなければゲームのモデルとNumPy版がずれている。
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.price_montecarlo --paths 5000 --months 120 --seed 0
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from source import price_montecarlo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=5000)
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    scalar = price_montecarlo.simulate_scalar(args.paths, args.months, args.seed)
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = price_montecarlo.simulate(args.paths, args.months, args.seed)
+    vectorized_time = time.perf_counter() - start
+
+    identical = (np.array_equal(scalar.histograms, vectorized.histograms)
+                 and scalar.news_count == vectorized.news_count)
+    path_months = args.paths * args.months
+    print(f"scalar:     {scalar_time:.3f}s ({path_months / scalar_time:,.0f} path-months/s)")
+    print(f"vectorized: {vectorized_time:.3f}s ({path_months / vectorized_time:,.0f} path-months/s)")
+    print(f"speedup: {scalar_time / vectorized_time:.1f}x, identical: {identical}")
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""価格データの逐次読み込み（CSV/JSONL）と先読みキュー経由の取り出しの速度を計測する
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.price_stream --rows 2000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from source.price_source import StreamPriceSource, iter_file_prices
+
+
+def write_series(path: str, rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    price = 400
+    jsonl = path.endswith(".jsonl")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if not jsonl:
+            f.write("month,price\n")
+        for i in range(rows):
+            price = max(200, min(800, price + rng.randint(-30, 30)))
+            month = f"{1900 + i // 12}-{i % 12 + 1:02d}"
+            if jsonl:
+                f.write(json.dumps({"month": month, "price": price}) + "\n")
+            else:
+                f.write(f"{month},{price}\n")
+
+
+def timed(label: str, rows: int, iterable) -> int:
+    start = time.perf_counter()
+    count = 0
+    total = 0
+    for point in iterable:
+        count += 1
+        total += point.price
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>10,}行 {elapsed:7.3f}秒 ({count / elapsed:,.0f}行/秒)")
+    if count != rows:
+        raise SystemExit(f"{label}: 行数が一致しません ({count} != {rows})")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--prefetch", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for extension in ("csv", "jsonl"):
+            path = os.path.join(temp_dir, f"prices.{extension}")
+            write_series(path, args.rows)
+            size = os.path.getsize(path) / 1e6
+            print(f"{extension}: {size:.1f}MB")
+            direct = timed(f"{extension} ジェネレーター", args.rows, iter_file_prices(path))
+            source = StreamPriceSource(iter_file_prices(path), args.prefetch, name=path)
+            queued = timed(f"{extension} 先読みキュー経由", args.rows, source)
+            source.close()
+            if direct != queued:
+                raise SystemExit("先読みキュー経由の結果が一致しません")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""ゲーム内時計を早送りし、描画を続けたまま1年分を進める耐久テスト
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.soak_year --scale 100 --months 12 --target 10
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from source.rice_game_window import RiceGameWindow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=100.0, help="ゲーム内時計の倍率")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--target", type=float, default=10.0, help="許容する実時間（秒）")
+    args = parser.parse_args()
+
+    game = RiceGameWindow(time_scale=args.scale)
+    start_months = game.price_history.total
+    finished = threading.Event()
+
+    def watch_progress():
+        # 価格履歴は月が変わるたびに1件増える
+        while game.price_history.total - start_months < args.months:
+            if finished.wait(0.05):
+                return
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    threading.Thread(target=watch_progress, daemon=True).start()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    game.run()
+    finished.set()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    months = game.price_history.total - start_months
+    print(f"{months}か月を実時間{wall:.2f}秒で進めました（倍率 x{args.scale:g}, CPU {cpu:.2f}秒）")
+    print(f"frames: {game.scheduler.frames}, game time: {game.game_clock.now():.1f}s")
+    sys.exit(0 if months >= args.months and wall <= args.target else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""描画・折り返し・起動・データ読み込み・状態の保存と再開の回帰検出用ベンチマーク
+
+SDL のダミードライバで動くため、画面の無い Linux でも実行できる。
+結果は JSON で出力し、保存済みのベースラインと比較して閾値を超えて遅くなった
+項目があれば終了コード 1 を返す。計測は別々のプロセスで --runs 回行い、項目ごとに
+最も速かった回を使う。ベースラインの更新時にはプロセス間の揺れから項目ごとの
+許容範囲も記録する（揺れの大きいファイル読み込みなどで誤検出しないため）。
+
+使い方（リポジトリのルートで実行）:
+    python -m benchmarks.suite                      # ベースラインと比較
+    python -m benchmarks.suite --threshold 0.5      # 50% までの悪化は許容
+    python -m benchmarks.suite --output result.json # 結果を保存
+    python -m benchmarks.suite --update-baseline --runs 5  # ベースラインと許容範囲を更新
+    python -m benchmarks.suite --only wrap_text_short,get_message
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from source import log
+from source.news_item import NewsItem
+from source.rice_game_window import RiceGameWindow
+from source.snapshot import Snapshot
+
+RESULT_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_RUNS = 3
+NOISE_MARGIN = 1.5  # ベースライン更新時に観測した揺れの何倍まで許容するか
+NEWS_CSV = os.path.join("assets", "data", "news.csv")
+
+
+def measure(func: Callable[[], object], number: int, repeat: int, warmup: int = 0) -> Dict[str, float]:
+    """func を number 回実行する計測を repeat 回行い、1回あたりの秒数を返す
+
+    計測の前に warmup 回空実行する。timeit と同じく、計測中はガベージコレクションを止め、
+    各回の前に回収しておく（割り当ての多い項目で回収の時機による揺れを抑える）。
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number)
+        finally:
+            gc.enable()
+    return {
+        "seconds": statistics.median(timings),
+        "min": min(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def write_synthetic_news(path: str, rows: int, seed: int = 0):
+    """news.csv と同じ列構成（ID, カテゴリ, タグ, 本文）の合成データを書き出す"""
+    rng = random.Random(seed)
+    categories = ("豊作", "不作", "普通")
+    tags = ("話題", "災害", "政策", "市場", "天候")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(("ID", "カテゴリ", "タグ", "本文"))
+        for i in range(rows):
+            body = "お米の価格について" + "、".join("新米" for _ in range(rng.randint(1, 20))) + "が話題です。"
+            writer.writerow((i + 1, rng.choice(categories), rng.choice(tags), body))
+
+
+def close_game(game: RiceGameWindow):
+    game.loader.shutdown()
+    pygame.quit()
+
+
+def bench_window_init(repeat: int) -> Dict[str, float]:
+    """RiceGameWindow() の生成（スプラッシュ前まで）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        game = RiceGameWindow()
+        timings.append(time.perf_counter() - start)
+        close_game(game)
+    return {"seconds": statistics.median(timings), "min": min(timings), "number": 1, "repeat": repeat}
+
+
+def bench_startup_ready(repeat: int) -> Dict[str, float]:
+    """RiceGameWindow() の生成から必須資源の読み込み完了まで（起動時の計測値も記録する）"""
+    timings = []
+    font_times = []
+    font_cache_hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        game = RiceGameWindow()
+        while not game.loader.essential_ready:
+            pygame.event.wait(50)
+            game.loader.poll()
+        timings.append(time.perf_counter() - start)
+        font_times.append(game.startup_metrics["font_resolution_ms"])
+        font_cache_hits += game.startup_metrics["font_cache_hit"]
+        close_game(game)
+    return {"seconds": statistics.median(timings), "min": min(timings), "number": 1, "repeat": repeat,
+            "font_resolution_ms": statistics.median(font_times), "font_cache_hits": font_cache_hits}
+
+
+def ready_game() -> RiceGameWindow:
+    """全資源の読み込みを終えたゲームを用意する"""
+    game = RiceGameWindow()
+    while not game.loader.finished:
+        pygame.event.wait(50)
+        game.loader.poll()
+    return game
+
+
+def news_extremes() -> Tuple[str, str]:
+    """news.csv の最短・最長の本文（無ければ固定文）"""
+    contents = [item.content for item in NewsItem.load_from_csv(NEWS_CSV)]
+    if not contents:
+        contents = ["米の価格が上がりました。", "今年のお米は" + "とても" * 40 + "おいしいです。"]
+    return min(contents, key=len), max(contents, key=len)
+
+
+def run_suite(repeat: int, only: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    def selected(name: str) -> bool:
+        return only is None or name in only
+
+    results = {}
+
+    if selected("window_init"):
+        results["window_init"] = bench_window_init(repeat)
+    if selected("startup_ready"):
+        results["startup_ready"] = bench_startup_ready(repeat)
+
+    game_cases = ("wrap_text_short", "wrap_text_long", "full_frame", "get_message",
+                  "snapshot_capture", "snapshot_resume")
+    if any(selected(name) for name in game_cases):
+        game = ready_game()
+        short_text, long_text = news_extremes()
+        max_width = game.width - 140
+        if selected("wrap_text_short"):
+            results["wrap_text_short"] = measure(lambda: game.wrap_text(short_text, max_width), 5000, repeat)
+        if selected("wrap_text_long"):
+            results["wrap_text_long"] = measure(lambda: game.wrap_text(long_text, max_width), 2000, repeat)
+        if selected("full_frame"):
+            game.reveal_all(long_text)
+
+            def full_frame():
+                game.draw_background()
+                game.draw_ui()
+                game.draw_text_window()
+            results["full_frame"] = measure(full_frame, 100, repeat)
+        if selected("get_message"):
+            character = game.characters[0]
+            rng = random.Random(0)
+            prices = [rng.randint(100, 1000) for _ in range(1000)]
+
+            def get_messages():
+                for price in prices:
+                    character.get_message(price, rng)
+            result = measure(get_messages, 20, repeat)
+            result["seconds"] /= len(prices)
+            result["min"] /= len(prices)
+            result["number"] *= len(prices)
+            results["get_message"] = result
+        if selected("snapshot_capture") or selected("snapshot_resume"):
+            # 履歴が満杯（100年分）の状態で計測する
+            history = game.price_history
+            for i in range(history.capacity):
+                history.append(i % 12 + 1, 200 + i % 600, game.get_season(i % 12 + 1), i % 5 == 0)
+            if selected("snapshot_capture"):
+                results["snapshot_capture"] = measure(lambda: game.capture_snapshot().to_bytes(), 1000, repeat,
+                                                      warmup=100)
+            if selected("snapshot_resume"):
+                data = game.capture_snapshot().to_bytes()
+                results["snapshot_resume"] = measure(
+                    lambda: Snapshot.from_bytes(data).restore(game.simulation, history), 1000, repeat, warmup=100)
+        close_game(game)
+
+    for rows in (10_000, 100_000):
+        name = f"load_news_csv_{rows // 1000}k"
+        if not selected(name):
+            continue
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "news.csv")
+            write_synthetic_news(path, rows)
+            # ファイル読み込みは揺れが大きいため、空読みで温めてから多めに繰り返す
+            results[name] = measure(lambda: NewsItem.load_from_csv(path), max(1, 50_000 // rows), repeat * 2,
+                                    warmup=1)
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """ベースラインより許容範囲を超えて遅い項目名を返す
+
+    比較には繰り返しの最小値を使う（他プロセスの影響などの雑音が最も少ない）。
+    許容範囲は threshold と、ベースラインに項目ごとに記録した threshold の大きい方。
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<20} {result['min'] * 1e3:10.4f}ms  (ベースライン無し)")
+            continue
+        ratio = result["min"] / base["min"] if base["min"] else 1.0
+        allowed = max(threshold, base.get("threshold", 0.0))
+        mark = ""
+        if ratio > 1.0 + allowed:
+            regressions.append(name)
+            mark = "  <-- 悪化"
+        print(f"{name:<20} {result['min'] * 1e3:10.4f}ms  基準 {base['min'] * 1e3:10.4f}ms  "
+              f"x{ratio:.2f} (許容 x{1.0 + allowed:.2f}){mark}")
+    return regressions
+
+
+def run_processes(runs: int, repeat: int, only: Optional[List[str]]) -> List[Dict[str, Dict[str, float]]]:
+    """別々のプロセスで runs 回計測し、それぞれの結果を返す
+
+    同じコードでもプロセスごとに速さがまとまって変わる（メモリ配置や他の仮想マシンの影響）ため、
+    1つのプロセスの中で繰り返すだけでは雑音を取り除けない。
+    """
+    all_results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for i in range(runs):
+            path = os.path.join(temp_dir, f"run{i}.json")
+            command = [sys.executable, "-m", "benchmarks.suite", "--runs", "1", "--measure-only",
+                       "--repeat", str(repeat), "--output", path]
+            if only:
+                command += ["--only", ",".join(only)]
+            subprocess.run(command, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           stdout=subprocess.DEVNULL)
+            with open(path, 'r', encoding='utf-8') as f:
+                all_results.append(json.load(f)["results"])
+    return all_results
+
+
+def best_of(all_results: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """項目ごとに最も速かったプロセスの結果を選ぶ"""
+    best = {}
+    for results in all_results:
+        for name, result in results.items():
+            if name not in best or result["min"] < best[name]["min"]:
+                best[name] = result
+    return best
+
+
+def noise_thresholds(all_results: List[Dict[str, Dict[str, float]]], threshold: float) -> Dict[str, float]:
+    """プロセス間で観測した揺れ（最も遅い回/最も速い回）に余裕を持たせた項目ごとの許容範囲"""
+    thresholds = {}
+    for name in all_results[0]:
+        values = [results[name]["min"] for results in all_results if name in results]
+        spread = max(values) / min(values) - 1.0 if min(values) else 0.0
+        thresholds[name] = round(max(threshold, spread * NOISE_MARGIN), 2)
+    return thresholds
+
+
+def result_document(results: Dict[str, Dict[str, float]]) -> dict:
+    return {
+        "version": RESULT_VERSION,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "video_driver": os.environ.get("SDL_VIDEODRIVER", ""),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="許容する悪化の割合（0.25 なら 25%%。項目ごとの記録値の方が大きければそちら）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help="計測するプロセスの数（項目ごとに最も速かった回を使う）")
+    parser.add_argument("--output", help="結果のJSONを書き出すパス")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--only", help="実行する項目名（カンマ区切り）")
+    parser.add_argument("--measure-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    log.configure(level=log.WARNING)
+    only = args.only.split(",") if args.only else None
+    if args.runs > 1:
+        all_results = run_processes(args.runs, args.repeat, only)
+    else:
+        all_results = [run_suite(args.repeat, only)]
+    document = result_document(best_of(all_results))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+    if args.measure_only:
+        return
+
+    if args.update_baseline:
+        baseline = {}
+        if only and os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)["results"]
+        thresholds = noise_thresholds(all_results, args.threshold)
+        for name, result in document["results"].items():
+            baseline[name] = dict(result, threshold=thresholds[name])
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(result_document(baseline), f, ensure_ascii=False, indent=2)
+        print(f"ベースラインを更新しました: {args.baseline}（{len(all_results)}プロセスの計測）")
+        for name in document["results"]:
+            print(f"{name:<20} 許容 x{1.0 + thresholds[name]:.2f}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(document["results"], baseline, args.threshold)
+    startup = document["results"].get("startup_ready")
+    if startup is not None:
+        print(f"フォント解決: {startup['font_resolution_ms']:.2f}ms "
+              f"（キャッシュあり {startup['font_cache_hits']}/{startup['repeat']}回）")
+    if regressions:
+        print(f"許容範囲を超えて悪化: {', '.join(regressions)}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@ echo ===================================
 echo  Rice Weather Japan - EXE Builder
 echo ===================================
 echo.
+echo Baking pre-scaled images...
+python -m source.asset_bake
+echo.
 echo Building executable file...
 echo Please wait, this may take a few minutes.
 echo.
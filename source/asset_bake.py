@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+import pygame
+from PIL import Image
+
+from source.cache_paths import user_cache_dir
+from source.log import get_logger
+
+log = get_logger("asset_bake")
+
+
+def resource_path(relative_path):
+    """ 実行ファイル（.exe) とソースコードの両方でリソースへのパスを解決する """
+    try:
+        # PyInstallerが作成する一時フォルダ
+        base_path = sys._MEIPASS
+    except Exception:
+        # 通常のPython環境
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+CHARACTER_SIZE = (120, 120)
+BACKGROUND_SIZE = (800, 600)
+
+# ベイク対象（assets/images からの相対パス, 出力サイズ）
+BAKE_TARGETS = [
+    ("housewife.png", CHARACTER_SIZE),
+    ("farmer.png", CHARACTER_SIZE),
+    ("politician.png", CHARACTER_SIZE),
+    ("backgrounds/spring.png", BACKGROUND_SIZE),
+    ("backgrounds/summer.png", BACKGROUND_SIZE),
+    ("backgrounds/autumn.png", BACKGROUND_SIZE),
+    ("backgrounds/winter.png", BACKGROUND_SIZE),
+]
+
+IMAGE_ROOT = os.path.join('assets', 'images')
+MANIFEST_NAME = "baked_manifest.json"
+# 実行時のベイク結果の保存先（exe 内の assets は読み取り専用のため）
+RUNTIME_BAKE_DIR = "baked"
+
+
+def baked_path(source_path: str, size: Tuple[int, int]) -> str:
+    """元画像の隣に置くベイク済み画像のパス（例: farmer.120x120.png）"""
+    stem, _ = os.path.splitext(source_path)
+    return f"{stem}.{size[0]}x{size[1]}.png"
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BakeManifest:
+    """元画像のハッシュとベイク結果の対応表
+
+    output_root を省略すると元画像の隣にベイクする（ビルド時）。
+    指定した場合は output_root の下に同じ階層でベイクし、対応表もそこに置く（実行時）。
+    """
+
+    def __init__(self, image_root: str, output_root: Optional[str] = None):
+        self.image_root = image_root
+        self.output_root = output_root or image_root
+        self.path = os.path.join(self.output_root, MANIFEST_NAME)
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("ベイク情報の読み込みに失敗しました: %s, %s", self.path, e)
+
+    def save(self):
+        os.makedirs(self.output_root, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        self.dirty = False
+
+    def _relative(self, source_path: str) -> str:
+        relative = os.path.relpath(os.path.abspath(source_path), os.path.abspath(self.image_root))
+        if relative.startswith(os.pardir):
+            # 画像フォルダの外（キャラクターパックなど）はフォルダのハッシュで区別する
+            folder, name = os.path.split(os.path.abspath(source_path))
+            digest = hashlib.sha1(folder.encode('utf-8')).hexdigest()[:12]
+            relative = os.path.join("external", digest, name)
+        return relative.replace(os.sep, '/')
+
+    def _key(self, source_path: str, size: Tuple[int, int]) -> str:
+        return f"{self._relative(source_path)}@{size[0]}x{size[1]}"
+
+    def output_path(self, source_path: str, size: Tuple[int, int]) -> str:
+        if self.output_root == self.image_root:
+            return baked_path(source_path, size)
+        return baked_path(os.path.join(self.output_root, self._relative(source_path)), size)
+
+    def is_fresh(self, source_path: str, size: Tuple[int, int]) -> bool:
+        """ベイク済み画像が元画像の現在の内容から作られたものか"""
+        entry = self.entries.get(self._key(source_path, size))
+        if not entry or not os.path.exists(self.output_path(source_path, size)):
+            return False
+        stat = os.stat(source_path)
+        if entry.get("mtime") == stat.st_mtime_ns and entry.get("bytes") == stat.st_size:
+            return True
+        # 更新日時だけが変わった場合（チェックアウトし直しや exe の展開など）は内容のハッシュで判定
+        if entry.get("sha256") == file_hash(source_path):
+            entry["mtime"] = stat.st_mtime_ns
+            self.dirty = True
+            return True
+        return False
+
+    def bake(self, source_path: str, size: Tuple[int, int]) -> str:
+        """元画像を指定サイズに縮小して保存し、対応表を更新する"""
+        output_path = self.output_path(source_path, size)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with Image.open(source_path) as image:
+            mode = "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+            # pygame.transform.scale と同じく最近傍補間（ドット感を保つ）
+            image.convert(mode).resize(size, Image.Resampling.NEAREST).save(output_path, optimize=True)
+
+        stat = os.stat(source_path)
+        self.entries[self._key(source_path, size)] = {
+            "sha256": file_hash(source_path),
+            "mtime": stat.st_mtime_ns,
+            "bytes": stat.st_size,
+            "output": os.path.relpath(output_path, self.output_root).replace(os.sep, '/'),
+        }
+        self.dirty = True
+        return output_path
+
+
+_manifest: Optional[BakeManifest] = None
+_runtime_manifest: Optional[BakeManifest] = None
+_manifest_lock = threading.Lock()
+
+
+def _get_manifest() -> BakeManifest:
+    """同梱（ビルド時にベイク済み）の対応表。実行時は読み取り専用として扱う"""
+    global _manifest
+    if _manifest is None:
+        _manifest = BakeManifest(resource_path(IMAGE_ROOT))
+    return _manifest
+
+
+def _get_runtime_manifest() -> BakeManifest:
+    """実行時にベイクした結果の対応表（ユーザーのキャッシュフォルダに置く）"""
+    global _runtime_manifest
+    if _runtime_manifest is None:
+        _runtime_manifest = BakeManifest(resource_path(IMAGE_ROOT),
+                                         os.path.join(user_cache_dir(), RUNTIME_BAKE_DIR))
+    return _runtime_manifest
+
+
+def decode_image(source_path: str, size: Tuple[int, int]) -> pygame.Surface:
+    """ベイク済み画像を読み込む（ワーカースレッドから呼び出し可能）
+
+    同梱のベイク済み画像が新しければそれを使い、無いか古い場合は
+    ユーザーのキャッシュフォルダにその場でベイクする。
+    書き込めない場合は元画像を読み込んで縮小する。
+    """
+    with _manifest_lock:
+        bundled = _get_manifest()
+        if bundled.is_fresh(source_path, size):
+            path = bundled.output_path(source_path, size)
+        else:
+            manifest = _get_runtime_manifest()
+            path = manifest.output_path(source_path, size)
+            if not manifest.is_fresh(source_path, size):
+                try:
+                    manifest.bake(source_path, size)
+                except OSError as e:
+                    log.warning("画像のベイクに失敗しました（元画像を使用します）: %s, %s", source_path, e)
+                    path = None
+            if manifest.dirty:
+                try:
+                    manifest.save()
+                except OSError as e:
+                    log.warning("ベイク情報の保存に失敗しました: %s, %s", manifest.path, e)
+
+    if path is None:
+        return pygame.transform.scale(pygame.image.load(source_path), size)
+    return pygame.image.load(path)
+
+
+def to_display_format(surface: pygame.Surface) -> pygame.Surface:
+    """画面のピクセル形式に変換（メインスレッドで一度だけ呼ぶ）"""
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+def load_image(source_path: str, size: Tuple[int, int]) -> pygame.Surface:
+    """ベイク済み画像を読み込み、画面のピクセル形式に変換して返す"""
+    return to_display_format(decode_image(source_path, size))
+
+
+def bake_all(force: bool = False) -> int:
+    """BAKE_TARGETS をすべてベイクし、新たにベイクした数を返す"""
+    manifest = _get_manifest()
+    baked = 0
+    for relative, size in BAKE_TARGETS:
+        source_path = os.path.join(manifest.image_root, relative)
+        if not os.path.exists(source_path):
+            print(f"元画像が見つかりません: {source_path}")
+            continue
+        if force or not manifest.is_fresh(source_path, size):
+            output_path = manifest.bake(source_path, size)
+            print(f"ベイクしました: {output_path}")
+            baked += 1
+    manifest.save()
+    return baked
+
+
+if __name__ == "__main__":
+    count = bake_all(force="--force" in sys.argv)
+    print(f"{count}件の画像をベイクしました。")
@@ -0,0 +1,81 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import pygame
+
+from source.log import get_logger
+
+log = get_logger("asset_loader")
+
+# 読み込み完了を知らせるイベント（メインループの pygame.event.wait を起こす）
+ASSET_LOADED = pygame.event.custom_type()
+
+
+class AssetLoader:
+    """独立したファイルをスレッドプールで読み込み、結果をメインスレッドに渡すローダー
+
+    読み込み処理（load）はワーカースレッドで、結果の反映（on_ready）は
+    poll() を呼んだメインスレッドで実行される。失敗した資源は反映されず、
+    呼び出し側の代替表示がそのまま使われる。
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset")
+        self._finished = queue.Queue()
+        self.total = 0
+        self.done = 0
+        self._essential_pending = 0
+
+    def submit(self, name: str, load: Callable[[], object],
+               on_ready: Callable[[object], None], essential: bool = False):
+        """読み込みを予約する。essential な資源が揃うまではスプラッシュを表示する"""
+        self.total += 1
+        if essential:
+            self._essential_pending += 1
+        future = self._executor.submit(load)
+        future.add_done_callback(lambda f: self._on_done(name, f, on_ready, essential))
+
+    def _on_done(self, name, future, on_ready, essential):
+        # ワーカースレッドから呼ばれる
+        self._finished.put((name, future, on_ready, essential))
+        try:
+            pygame.event.post(pygame.event.Event(ASSET_LOADED))
+        except pygame.error:
+            pass  # ディスプレイ終了後など
+
+    def poll(self) -> int:
+        """完了した読み込みをメインスレッドで反映し、反映した件数を返す"""
+        applied = 0
+        while True:
+            try:
+                name, future, on_ready, essential = self._finished.get_nowait()
+            except queue.Empty:
+                return applied
+            self.done += 1
+            if essential:
+                self._essential_pending -= 1
+            error: Optional[BaseException] = future.exception()
+            if error is not None:
+                log.error("資源の読み込みに失敗しました: %s, %s", name, error)
+                continue
+            try:
+                on_ready(future.result())
+                applied += 1
+            except Exception as e:
+                log.error("資源の反映に失敗しました: %s, %s", name, e)
+
+    @property
+    def essential_ready(self) -> bool:
+        return self._essential_pending == 0
+
+    @property
+    def finished(self) -> bool:
+        return self.done == self.total
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
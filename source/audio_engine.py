@@ -0,0 +1,124 @@
+import threading
+from typing import Dict, Optional, Set
+
+import pygame
+
+from source.log import get_logger
+
+log = get_logger("audio_engine")
+
+# Each category gets its own reserved mixer channel, so typing clicks can never
+# steal the channel of a news alert (and vice versa).
+CATEGORY_CHANNELS = {
+    "typing": 0,
+    "alert": 1,
+    "month": 2,
+}
+
+SOUND_CATEGORIES = {
+    "text_click": "typing",
+    "news_alert": "alert",
+    "month_change": "month",
+}
+
+
+class AudioEngine:
+    """Plays preloaded sound effects on reserved channels and streams background music.
+
+    Rapid-fire typing clicks are throttled to one per `click_interval_ms`, and
+    missing or failing sounds are reported only once, so the render loop never
+    blocks or floods the console because of audio.
+    """
+
+    def __init__(self, mixer_available: bool, click_interval_ms: int = 45):
+        self.mixer_available = mixer_available
+        self.click_interval_ms = click_interval_ms
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.channels: Dict[str, pygame.mixer.Channel] = {}
+        self.music_path: Optional[str] = None
+        self._last_click = -click_interval_ms
+        self._reported: Set[str] = set()
+        # Guards the mixer against the music loader thread once shutdown() has begun
+        self._music_lock = threading.Lock()
+        self._music_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        if mixer_available:
+            pygame.mixer.set_reserved(len(CATEGORY_CHANNELS))
+            for category, index in CATEGORY_CHANNELS.items():
+                self.channels[category] = pygame.mixer.Channel(index)
+
+    def add_sound(self, name: str, sound: pygame.mixer.Sound):
+        """Registers a decoded sound buffer (called once the loader has it)."""
+        self.sounds[name] = sound
+        self._reported.discard(name)
+
+    def _report_once(self, key: str, message: str, *args):
+        if key not in self._reported:
+            self._reported.add(key)
+            log.warning(message, *args)
+
+    def play(self, name: str):
+        """Plays a sound effect on its category channel, if it is loaded."""
+        if not self.mixer_available:
+            return
+
+        sound = self.sounds.get(name)
+        if sound is None:
+            self._report_once(name, "Sound effect '%s' not found or not loaded.", name)
+            return
+
+        category = SOUND_CATEGORIES.get(name)
+        channel = self.channels.get(category)
+        try:
+            if category == "typing":
+                now = pygame.time.get_ticks()
+                if now - self._last_click < self.click_interval_ms:
+                    return  # coalesce clicks that arrive faster than the throttle
+                self._last_click = now
+            if channel is None:
+                sound.play()
+            else:
+                # Restarting on the same channel cuts off the previous click instead of stacking
+                channel.play(sound)
+        except pygame.error as e:
+            self._report_once(name, "Error playing sound effect '%s': %s", name, e)
+
+    def play_music(self, path: str):
+        """Starts looping background music; the file is opened off the main thread."""
+        if not self.mixer_available:
+            return
+        self.music_path = path
+
+        def start():
+            with self._music_lock:
+                if self._closed:
+                    return  # shutdown() ran first; the mixer may already be gone
+                try:
+                    pygame.mixer.music.load(path)
+                    pygame.mixer.music.play(-1)  # -1 for infinite loop, streamed by SDL_mixer
+                    log.info("Playing background music: %s", path)
+                except pygame.error as e:
+                    log.error("Error playing background music %s: %s", path, e)
+
+        self._music_thread = threading.Thread(target=start, name="music", daemon=True)
+        self._music_thread.start()
+
+    def stop_music(self):
+        """Stops the background music."""
+        if self.mixer_available:
+            with self._music_lock:
+                pygame.mixer.music.stop()
+            log.info("Background music stopped.")
+
+    def shutdown(self, timeout: float = 2.0):
+        """Stops the music and waits for the loader thread, so nothing touches the mixer after quit."""
+        if not self.mixer_available:
+            return
+        with self._music_lock:
+            self._closed = True
+            pygame.mixer.music.stop()
+        if self._music_thread is not None:
+            self._music_thread.join(timeout)
+            self._music_thread = None
+        log.info("Background music stopped.")
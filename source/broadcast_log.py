@@ -0,0 +1,462 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_right
+from typing import BinaryIO, Callable, List, Optional, Tuple
+
+from source.character import Character
+from source.log import get_logger
+from source.news_item import NewsItem
+from source.simulation import LINE, MONTH, NEWS, PRICE, SPEAKER, RiceSimulation, SimulationEvent
+
+log = get_logger("broadcast_log")
+
+# 放送ログ（.rwb）: ヘッダーの後に [種類 u8][長さ u32][内容] のレコードを追記していく
+# 索引（.rwb.idx）: ヘッダーの後に キーフレームの (月番号 u32, 位置 u64) を追記していく
+LOG_MAGIC = b"RWBL"
+INDEX_MAGIC = b"RWBI"
+FORMAT_VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+RECORD_HEADER = struct.Struct("<BI")
+INDEX_ENTRY = struct.Struct("<IQ")
+
+# レコードの種類
+KEYFRAME = 1  # その時点の状態一式（月番号, 月, 価格, 最後の話者, セリフ, ニュース）
+MONTH_STEP = 2  # 月の切り替え（月番号, 月, 価格, ニュース または 話者とセリフ）
+LINE_STEP = 3  # 話者とセリフの切り替え（ニュース終了・スペースキー）
+
+KEYFRAME_INTERVAL = 12  # キーフレームを書く間隔（月）
+
+_KEYFRAME_FIELDS = struct.Struct("<IBihB")
+_MONTH_FIELDS = struct.Struct("<IBiB")
+_SPEAKER_FIELD = struct.Struct("<B")
+_STRING_LENGTH = struct.Struct("<H")
+
+
+def index_path(log_path: str) -> str:
+    return log_path + ".idx"
+
+
+def _pack_string(text: str) -> bytes:
+    data = text.encode('utf-8')
+    return _STRING_LENGTH.pack(len(data)) + data
+
+
+def _unpack_string(buffer, offset: int) -> Tuple[str, int]:
+    (length,) = _STRING_LENGTH.unpack_from(buffer, offset)
+    start = offset + _STRING_LENGTH.size
+    return bytes(buffer[start:start + length]).decode('utf-8'), start + length
+
+
+def _pack_news(news: NewsItem) -> bytes:
+    return b"".join(_pack_string(s) for s in (news.name, news.content, news.news_id, news.category))
+
+
+def _unpack_news(buffer, offset: int) -> Tuple[NewsItem, int]:
+    fields = []
+    for _ in range(4):
+        text, offset = _unpack_string(buffer, offset)
+        fields.append(text)
+    return NewsItem(*fields), offset
+
+
+class BroadcastRecorder:
+    """シミュレーションのイベントを追記専用の放送ログに記録する
+
+    record() には RiceSimulation が返したイベントのリスト（月の切り替え・ニュース・
+    セリフの切り替え1回分）をそのまま渡す。KEYFRAME_INTERVAL か月ごとに状態一式を
+    キーフレームとして書き、その位置を索引ファイルに追記する。
+    """
+
+    def __init__(self, path: str, simulation: RiceSimulation, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.month_seq = 0
+        self.month = simulation.current_month
+        self.price = simulation.rice_price
+        self.message = simulation.current_message
+        self.last_speaker = (simulation.current_speaker - 1) % len(simulation.characters) if self.message else -1
+        self.news = simulation.current_news if simulation.showing_news else None
+
+        self._log: BinaryIO = open(path, 'wb')
+        self._index: BinaryIO = open(index_path(path), 'wb')
+        header = FILE_HEADER.pack(LOG_MAGIC, FORMAT_VERSION)
+        self._log.write(header)
+        self._offset = len(header)
+        self._index.write(FILE_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION))
+        self._write_keyframe()
+        log.info("放送を記録しています: %s", path)
+
+    def record(self, events: List[SimulationEvent]):
+        if not events or self._log is None:
+            return
+        if events[0].kind == MONTH:
+            if self.month_seq % self.keyframe_interval == 0 and self.month_seq > 0:
+                self._write_keyframe()
+            self.month_seq += 1
+            self.month = events[0].value
+            self.price = events[1].value
+            self._record_month(events[2:])
+            # 月の切り替えごとに書き出し、異常終了しても失うのは最後の1か月分だけにする
+            self._log.flush()
+        elif events[0].kind == SPEAKER:
+            self._set_line(events)
+            payload = _SPEAKER_FIELD.pack(self.last_speaker) + _pack_string(self.message)
+            self._write_record(LINE_STEP, payload)
+
+    def _record_month(self, events: List[SimulationEvent]):
+        payload = _MONTH_FIELDS.pack(self.month_seq, self.month, self.price, 1 if events[0].kind == NEWS else 0)
+        if events[0].kind == NEWS:
+            self.news = events[0].value
+            payload += _pack_news(self.news)
+        else:
+            self._set_line(events)
+            payload += _SPEAKER_FIELD.pack(self.last_speaker) + _pack_string(self.message)
+        self._write_record(MONTH_STEP, payload)
+
+    def _set_line(self, events: List[SimulationEvent]):
+        for event in events:
+            if event.kind == SPEAKER:
+                self.last_speaker = event.value
+            elif event.kind == LINE:
+                self.message = event.value
+        self.news = None
+
+    def _write_keyframe(self):
+        payload = _KEYFRAME_FIELDS.pack(self.month_seq, self.month, self.price, self.last_speaker,
+                                        1 if self.news is not None else 0)
+        payload += _pack_string(self.message)
+        if self.news is not None:
+            payload += _pack_news(self.news)
+        offset = self._write_record(KEYFRAME, payload)
+        self._log.flush()
+        self._index.write(INDEX_ENTRY.pack(self.month_seq, offset))
+        self._index.flush()
+
+    def _write_record(self, record_type: int, payload: bytes) -> int:
+        offset = self._offset
+        self._log.write(RECORD_HEADER.pack(record_type, len(payload)))
+        self._log.write(payload)
+        self._offset += RECORD_HEADER.size + len(payload)
+        return offset
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._index.close()
+            self._log = None
+            log.info("放送の記録を終了しました: %s (%dか月)", self.path, self.month_seq)
+
+
+class Keyframe:
+    __slots__ = ("month_seq", "month", "price", "last_speaker", "message", "news")
+
+    def __init__(self, month_seq: int, month: int, price: int, last_speaker: int,
+                 message: str, news: Optional[NewsItem]):
+        self.month_seq = month_seq
+        self.month = month
+        self.price = price
+        self.last_speaker = last_speaker
+        self.message = message
+        self.news = news
+
+
+class _KeyframeMonths:
+    """索引の月番号を bisect で探すためのシーケンス（mmap から直接読む）"""
+
+    def __init__(self, buffer, count: int):
+        self.buffer = buffer
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.buffer, FILE_HEADER.size + i * INDEX_ENTRY.size)[0]
+
+    def offset(self, i: int) -> int:
+        return INDEX_ENTRY.unpack_from(self.buffer, FILE_HEADER.size + i * INDEX_ENTRY.size)[1]
+
+
+class _MemoryIndex:
+    """索引ファイルが無い・壊れている場合にログを走査して作る索引"""
+
+    def __init__(self, months: array, offsets: array):
+        self.months = months
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    def __getitem__(self, i: int) -> int:
+        return self.months[i]
+
+    def offset(self, i: int) -> int:
+        return self.offsets[i]
+
+
+class BroadcastLog:
+    """放送ログをメモリマップで読み、キーフレームの索引で任意の月へ O(log n) で移動する"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self.data, 0)
+        if magic != LOG_MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"放送ログの形式が違います: {path}")
+
+        self._index_file = None
+        self._index_data = None
+        self.keyframes = self._open_index() or self._scan_index()
+        if len(self.keyframes) == 0:
+            self.close()
+            raise ValueError(f"放送ログにキーフレームがありません: {path}")
+        self._last_month: Optional[int] = None
+
+    def _open_index(self) -> Optional[_KeyframeMonths]:
+        try:
+            self._index_file = open(index_path(self.path), 'rb')
+            self._index_data = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # 索引が無い（または空の）場合はログから作り直す
+            return None
+        magic, version = FILE_HEADER.unpack_from(self._index_data, 0)
+        if magic != INDEX_MAGIC or version != FORMAT_VERSION:
+            return None
+        count = (len(self._index_data) - FILE_HEADER.size) // INDEX_ENTRY.size
+        keyframes = _KeyframeMonths(self._index_data, count)
+        # 記録中の異常終了で索引だけが先に書かれた場合は、ログ内に収まる分だけを使う
+        while keyframes.count and keyframes.offset(keyframes.count - 1) >= len(self.data):
+            keyframes.count -= 1
+        return keyframes
+
+    def _scan_index(self) -> _MemoryIndex:
+        log.info("放送ログの索引を作り直しています: %s", self.path)
+        months, offsets = array('I'), array('Q')
+        offset = FILE_HEADER.size
+        while True:
+            record = self.read(offset)
+            if record is None:
+                break
+            record_type, value, next_offset = record
+            if record_type == KEYFRAME:
+                months.append(value.month_seq)
+                offsets.append(offset)
+            offset = next_offset
+        return _MemoryIndex(months, offsets)
+
+    def read(self, offset: int) -> Optional[Tuple[int, object, int]]:
+        """offset のレコードを (種類, 内容, 次のレコードの位置) として読む（末尾なら None）
+
+        内容は KEYFRAME なら Keyframe、MONTH_STEP なら (月番号, 月, 価格, ニュース, 話者, セリフ)、
+        LINE_STEP なら (話者, セリフ)。
+        """
+        data = self.data
+        if offset + RECORD_HEADER.size > len(data):
+            return None
+        record_type, length = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + length
+        if end > len(data):
+            return None  # 書きかけのレコード
+
+        if record_type == KEYFRAME:
+            month_seq, month, price, last_speaker, has_news = _KEYFRAME_FIELDS.unpack_from(data, start)
+            message, position = _unpack_string(data, start + _KEYFRAME_FIELDS.size)
+            news = _unpack_news(data, position)[0] if has_news else None
+            value = Keyframe(month_seq, month, price, last_speaker, message, news)
+        elif record_type == MONTH_STEP:
+            month_seq, month, price, has_news = _MONTH_FIELDS.unpack_from(data, start)
+            position = start + _MONTH_FIELDS.size
+            if has_news:
+                news = _unpack_news(data, position)[0]
+                value = (month_seq, month, price, news, -1, "")
+            else:
+                (speaker,) = _SPEAKER_FIELD.unpack_from(data, position)
+                line = _unpack_string(data, position + _SPEAKER_FIELD.size)[0]
+                value = (month_seq, month, price, None, speaker, line)
+        elif record_type == LINE_STEP:
+            (speaker,) = _SPEAKER_FIELD.unpack_from(data, start)
+            value = (speaker, _unpack_string(data, start + _SPEAKER_FIELD.size)[0])
+        else:
+            value = None  # 未知の種類は読み飛ばす
+        return record_type, value, end
+
+    def keyframe_before(self, month_seq: int) -> Tuple[Keyframe, int]:
+        """month_seq 以前で最も近いキーフレームと、その次のレコードの位置"""
+        i = max(0, bisect_right(self.keyframes, month_seq) - 1)
+        _, keyframe, next_offset = self.read(self.keyframes.offset(i))
+        return keyframe, next_offset
+
+    @property
+    def last_month(self) -> int:
+        """記録されている最後の月番号（最後のキーフレームから末尾までを読む）"""
+        if self._last_month is None:
+            keyframe, offset = self.keyframe_before(self.keyframes[len(self.keyframes) - 1])
+            last = keyframe.month_seq
+            while True:
+                record = self.read(offset)
+                if record is None:
+                    break
+                record_type, value, offset = record
+                if record_type == MONTH_STEP:
+                    last = value[0]
+            self._last_month = last
+        return self._last_month
+
+    def close(self):
+        for resource in (self.data, self._file, getattr(self, "_index_data", None),
+                         getattr(self, "_index_file", None)):
+            if resource is not None:
+                resource.close()
+
+
+class _NoRandom:
+    """再生中に乱数が使われていないことを保証するための乱数生成器の代わり"""
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"再生中は乱数を使用しません: random.{name}")
+
+
+class ReplaySimulation(RiceSimulation):
+    """放送ログを再生するシミュレーション（RiceSimulation と同じインターフェース）
+
+    表示時間の管理は RiceSimulation と共通で、月の切り替えやセリフの変更の内容だけを
+    ログから読む。乱数は一切使わない。
+    """
+
+    def __init__(self, characters: List[Character], broadcast: BroadcastLog,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__(characters, [], rng=_NoRandom(), clock=clock)
+        self.broadcast = broadcast
+        self.month_seq = 0
+        self.finished = False
+        keyframe, self._cursor = broadcast.keyframe_before(0)
+        self._apply_keyframe(keyframe)
+
+    def _apply_keyframe(self, keyframe: Keyframe):
+        self.month_seq = keyframe.month_seq
+        self.current_month = keyframe.month
+        self.rice_price = keyframe.price
+        self.current_message = keyframe.message
+        self.current_speaker = (keyframe.last_speaker + 1) % len(self.characters)
+        self.showing_news = keyframe.news is not None
+        self.current_news = keyframe.news
+
+    def _apply_line(self, speaker: int, line: str) -> List[SimulationEvent]:
+        self.showing_news = False
+        self.current_news = None
+        self.current_message = line
+        self.current_speaker = (speaker + 1) % len(self.characters)
+        return [SimulationEvent(SPEAKER, speaker), SimulationEvent(LINE, line)]
+
+    def _apply_month(self, value: tuple) -> List[SimulationEvent]:
+        self.month_seq, self.current_month, self.rice_price, news, speaker, line = value
+        events = [SimulationEvent(MONTH, self.current_month), SimulationEvent(PRICE, self.rice_price)]
+        if news is not None:
+            self.showing_news = True
+            self.current_news = news
+            events.append(SimulationEvent(NEWS, news))
+        else:
+            events.extend(self._apply_line(speaker, line))
+        return events
+
+    def step(self) -> List[SimulationEvent]:
+        """記録された次の状態変化を1つ反映する"""
+        while True:
+            record = self.broadcast.read(self._cursor)
+            if record is None:
+                if not self.finished:
+                    self.finished = True
+                    log.info("放送ログの最後まで再生しました（%dか月）", self.month_seq)
+                return []
+            record_type, value, self._cursor = record
+            if record_type == MONTH_STEP:
+                return self._apply_month(value)
+            if record_type == LINE_STEP:
+                return self._apply_line(*value)
+
+    def state_events(self) -> List[SimulationEvent]:
+        """現在の状態を表示し直すためのイベント"""
+        return [SimulationEvent(MONTH, self.current_month), SimulationEvent(PRICE, self.rice_price),
+                *self.display_events()]
+
+    def seek(self, month_seq: int) -> List[SimulationEvent]:
+        """month_seq か月目の終わり（次の月に切り替わる直前）の状態へ移動する"""
+        month_seq = max(0, min(month_seq, self.broadcast.last_month))
+        keyframe, offset = self.broadcast.keyframe_before(month_seq)
+        self._apply_keyframe(keyframe)
+        while True:
+            record = self.broadcast.read(offset)
+            if record is None:
+                break
+            record_type, value, next_offset = record
+            if record_type == MONTH_STEP:
+                if value[0] > month_seq:
+                    break
+                self._apply_month(value)
+            elif record_type == LINE_STEP:
+                self._apply_line(*value)
+            offset = next_offset
+        self._cursor = offset
+        self.finished = False
+
+        now = self.clock()
+        self.last_update = now
+        self.news_start_time = now
+        self.character_start_time = 0
+        return self.state_events()
+
+    def start(self) -> List[SimulationEvent]:
+        # 途中から再生する場合は、移動先の状態をそのまま表示する
+        if self.current_message or self.showing_news:
+            return self.state_events()
+        return self.step()
+
+    def advance_month(self, current_time: float) -> List[SimulationEvent]:
+        events = self.step()
+        if self.showing_news:
+            self.news_start_time = current_time
+        else:
+            self.last_update = current_time
+        return events
+
+    def end_news(self) -> List[SimulationEvent]:
+        self.showing_news = False
+        self.current_news = None
+        return self.step()
+
+    def set_new_message(self) -> List[SimulationEvent]:
+        return self.step()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="放送ログの内容を表示します")
+    parser.add_argument("path")
+    parser.add_argument("--month", type=int, default=None, help="この月番号の終わりの状態を表示")
+    args = parser.parse_args()
+
+    broadcast = BroadcastLog(args.path)
+    print(f"{args.path}: {broadcast.last_month}か月, キーフレーム{len(broadcast.keyframes)}個, "
+          f"{os.path.getsize(args.path):,}バイト")
+    if args.month is not None:
+        characters = [Character("", "", "", Character.default_messages()) for _ in range(3)]
+        replay = ReplaySimulation(characters, broadcast)
+        start = time.perf_counter()
+        replay.seek(args.month)
+        elapsed = time.perf_counter() - start
+        print(f"{replay.month_seq}か月目: {replay.current_month}月 {replay.rice_price}円 ({elapsed * 1e3:.3f}ms)")
+        if replay.showing_news:
+            print(f"  ニュース【{replay.current_news.name}】{replay.current_news.content}")
+        else:
+            print(f"  {replay.current_message}")
+    broadcast.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""1つのシミュレーションの放送を、LAN内の多数の画面へHTTP/WebSocketで配信する
+
+    GET /           ブラウザ用の簡易ビューア
+    GET /ws         WebSocket（テキスト: 状態の差分JSON、バイナリ: 画面のPNG）
+    GET /state      現在の状態一式（JSON）
+    GET /frame.png  最新の画面（画面配信を有効にした場合）
+"""
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import socket
+import struct
+import threading
+from typing import Optional, Set, Tuple
+
+import pygame
+from PIL import Image
+
+from source.log import get_logger
+
+log = get_logger("broadcast_server")
+
+_WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_OP_TEXT = 0x1
+_OP_BINARY = 0x2
+_OP_CLOSE = 0x8
+_OP_PING = 0x9
+_OP_PONG = 0xA
+
+CLOSE_PROTOCOL_ERROR = 1002
+CLOSE_TOO_BIG = 1009
+MAX_CLIENT_FRAME_BYTES = 125  # クライアントから届くのは制御フレーム（ping/close）だけ
+
+MAX_REQUEST_BYTES = 8192
+WRITE_BUFFER_LIMIT = 64 * 1024  # 1クライアントあたりの送信バッファの上限
+
+_MISSING = object()
+
+
+def websocket_frame(opcode: int, payload: bytes) -> bytes:
+    """サーバーからクライアントへの（マスクなしの）WebSocketフレーム"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def websocket_accept(key: str) -> str:
+    return base64.b64encode(hashlib.sha1(key.encode('ascii') + _WEBSOCKET_GUID).digest()).decode('ascii')
+
+
+class WebSocketProtocolError(Exception):
+    """受け付けないWebSocketフレーム（code は切断時に送るクローズコード）"""
+
+    def __init__(self, code: int, reason: str):
+        super().__init__(reason)
+        self.code = code
+
+
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    value = int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')
+    return value.to_bytes(len(payload), 'big')
+
+
+async def read_websocket_frame(reader: asyncio.StreamReader, max_length: Optional[int] = None,
+                               require_mask: bool = False) -> Tuple[int, bytes]:
+    """WebSocketのフレームを1つ読む（マスクの有無どちらにも対応）
+
+    max_length を超える長さのフレームや、require_mask なのにマスクの無いフレームは
+    本体を読む前に WebSocketProtocolError にする（クライアントから受け取る場合）。
+    """
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if max_length is not None and length > max_length:
+        raise WebSocketProtocolError(CLOSE_TOO_BIG, f"フレームが大きすぎます: {length}バイト")
+    if require_mask and not second & 0x80:
+        raise WebSocketProtocolError(CLOSE_PROTOCOL_ERROR, "マスクの無いフレームです")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = _unmask(payload, mask)
+    return first & 0x0F, payload
+
+
+def _encode_json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def _encode_png(size: Tuple[int, int], rgb: bytes) -> bytes:
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", size, rgb).save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+class _Viewer:
+    """接続中のWebSocketクライアント1つ分の送信待ち
+
+    状態は差分を1つの辞書に重ね、画面は最新の1枚だけを保持する。送信が
+    追いつかないクライアントには、まとめた差分と最新の画面だけが届く。
+    """
+    __slots__ = ("writer", "state", "state_message", "frame", "wakeup")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.state: Optional[dict] = None
+        self.state_message: Optional[bytes] = None  # 重ねていない差分は全員で同じフレームを使う
+        self.frame: Optional[bytes] = None
+        self.wakeup = asyncio.Event()
+
+    def push_state(self, delta: dict, message: bytes):
+        if self.state is None:
+            self.state = dict(delta)
+            self.state_message = message
+        else:
+            self.state.update(delta)
+            self.state_message = None
+        self.wakeup.set()
+
+    def push_frame(self, message: bytes):
+        self.frame = message
+        self.wakeup.set()
+
+
+class BroadcastServer:
+    """放送の状態（と画面）を別スレッドのasyncioループから配信するサーバー
+
+    publish_state / publish_frame はゲームのメインスレッドから呼び、ループへ
+    受け渡すだけで待たない。状態は前回との差分だけを1度JSONにし、画面は
+    変化したときに1度だけPNGにして、全クライアントで同じフレームを使う。
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8765, frames: bool = False,
+                 write_timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.frames = frames
+        self.write_timeout = write_timeout
+        self.state: dict = {}  # メインスレッド側で最後に渡された状態（差分の計算用）
+        self.seq = 0
+        self.snapshot: dict = {"seq": 0}  # ループ側で配信済みの状態一式
+        self.frame_png: Optional[bytes] = None
+        self.frames_encoded = 0
+        self.viewers: Set[_Viewer] = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._raw_frame: Optional[Tuple[Tuple[int, int], bytes]] = None
+        self._encoding = False
+        self._page = VIEWER_PAGE.encode('utf-8')
+
+    # --- ゲーム側（メインスレッド） ---
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="broadcast-server", daemon=True)
+        self._thread.start()
+        self._started.wait(5.0)
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._shutdown)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def publish_state(self, state: dict) -> bool:
+        """最新の状態を渡す（前回から変わった項目だけを配信する。変化があれば True）"""
+        delta = {key: value for key, value in state.items() if self.state.get(key, _MISSING) != value}
+        if not delta:
+            return False
+        self.state.update(delta)
+        self.seq += 1
+        delta["seq"] = self.seq
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fan_out_state, delta)
+        return True
+
+    def publish_frame(self, surface: pygame.Surface):
+        """変化した画面を渡す（符号化が追いつかない間は最新の1枚だけを残す）"""
+        if not self.frames or self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self._frame_ready, surface.get_size(),
+                                       pygame.image.tobytes(surface, "RGB"))
+
+    @property
+    def client_count(self) -> int:
+        return len(self.viewers)
+
+    # --- 配信側（asyncioループ） ---
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        except OSError as e:
+            log.error("配信サーバーを開始できません: %s:%d, %s", self.host, self.port, e)
+            self._started.set()
+        finally:
+            self.loop.close()
+
+    async def _serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_REQUEST_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info("配信を開始しました: http://%s:%d/", self.host, self.port)
+        self._started.set()
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        # 接続中の処理が終わるのを少し待ち、残りは打ち切る
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=2.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _shutdown(self):
+        if self._server is not None:
+            self._server.close()
+        for viewer in list(self.viewers):
+            viewer.writer.close()
+            viewer.wakeup.set()
+
+    def _fan_out_state(self, delta: dict):
+        self.snapshot.update(delta)
+        message = websocket_frame(_OP_TEXT, _encode_json(delta))
+        for viewer in self.viewers:
+            viewer.push_state(delta, message)
+
+    def _frame_ready(self, size: Tuple[int, int], rgb: bytes):
+        self._raw_frame = (size, rgb)
+        if not self._encoding:
+            self._encoding = True
+            self.loop.create_task(self._encode_frames())
+
+    async def _encode_frames(self):
+        try:
+            while self._raw_frame is not None:
+                size, rgb = self._raw_frame
+                self._raw_frame = None
+                png = await self.loop.run_in_executor(None, _encode_png, size, rgb)
+                self.frame_png = png
+                self.frames_encoded += 1
+                message = websocket_frame(_OP_BINARY, png)
+                for viewer in self.viewers:
+                    viewer.push_frame(message)
+        finally:
+            self._encoding = False
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        lines = request.decode('latin-1').split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) < 2 or parts[0] != "GET":
+            await self._respond(writer, "405 Method Not Allowed", "text/plain", b"")
+            return
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        path = parts[1].split("?", 1)[0]
+
+        if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+            await self._handle_websocket(reader, writer, headers.get("sec-websocket-key", ""))
+        elif path == "/":
+            await self._respond(writer, "200 OK", "text/html; charset=utf-8", self._page)
+        elif path == "/state":
+            await self._respond(writer, "200 OK", "application/json; charset=utf-8",
+                                _encode_json(self.snapshot))
+        elif path == "/frame.png" and self.frame_png is not None:
+            await self._respond(writer, "200 OK", "image/png", self.frame_png)
+        else:
+            await self._respond(writer, "404 Not Found", "text/plain", b"not found")
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: str, content_type: str, body: bytes):
+        header = (f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                  f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\nConnection: close\r\n\r\n")
+        try:
+            writer.write(header.encode('latin-1') + body)
+            await asyncio.wait_for(writer.drain(), self.write_timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, key: str):
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n").encode('latin-1'))
+        # 遅い視聴者の分はカーネルとasyncioの送信バッファに溜めず、viewer でまとめる
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, WRITE_BUFFER_LIMIT)
+        viewer = _Viewer(writer)
+        # 接続直後は状態一式（と最新の画面）から始める
+        viewer.push_state(self.snapshot, websocket_frame(_OP_TEXT, _encode_json(self.snapshot)))
+        if self.frame_png is not None:
+            viewer.push_frame(websocket_frame(_OP_BINARY, self.frame_png))
+        self.viewers.add(viewer)
+        log.debug("視聴者が接続しました（%d人）", len(self.viewers))
+
+        receiver = self.loop.create_task(self._receive(reader, viewer))
+        try:
+            while not receiver.done():
+                await viewer.wakeup.wait()
+                viewer.wakeup.clear()
+                if viewer.state is not None:
+                    writer.write(viewer.state_message or websocket_frame(_OP_TEXT, _encode_json(viewer.state)))
+                    viewer.state = viewer.state_message = None
+                if viewer.frame is not None:
+                    writer.write(viewer.frame)
+                    viewer.frame = None
+                # 送信バッファが空くまで待つ間に届いた差分は viewer にまとめられる
+                await asyncio.wait_for(writer.drain(), self.write_timeout)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.viewers.discard(viewer)
+            receiver.cancel()
+            writer.close()
+            log.debug("視聴者が切断しました（%d人）", len(self.viewers))
+
+    async def _receive(self, reader: asyncio.StreamReader, viewer: _Viewer):
+        # クライアントからは ping と close だけを扱う
+        try:
+            while True:
+                opcode, payload = await read_websocket_frame(reader, MAX_CLIENT_FRAME_BYTES, require_mask=True)
+                if opcode == _OP_CLOSE:
+                    viewer.writer.write(websocket_frame(_OP_CLOSE, payload[:2]))
+                    break
+                if opcode == _OP_PING:
+                    viewer.writer.write(websocket_frame(_OP_PONG, payload))
+        except WebSocketProtocolError as e:
+            log.warning("視聴者を切断します: %s", e)
+            viewer.writer.write(websocket_frame(_OP_CLOSE, struct.pack("!H", e.code)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            viewer.wakeup.set()
+
+
+VIEWER_PAGE = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>米価格放送</title>
+<style>
+body { background: #000; color: #fff; font-family: monospace; margin: 16px; }
+#status { color: #fcfc06; } #news { color: #f83800; } #frame { image-rendering: pixelated; max-width: 100%; }
+</style></head>
+<body>
+<div id="status">接続中...</div>
+<div id="news"></div>
+<p id="text"></p>
+<img id="frame" alt="">
+<script>
+const state = {};
+const status = document.getElementById("status");
+const news = document.getElementById("news");
+const text = document.getElementById("text");
+const frame = document.getElementById("frame");
+function connect() {
+  const socket = new WebSocket(`ws://${location.host}/ws`);
+  socket.binaryType = "blob";
+  socket.onmessage = (event) => {
+    if (typeof event.data !== "string") {
+      const url = URL.createObjectURL(event.data);
+      frame.onload = () => URL.revokeObjectURL(url);
+      frame.src = url;
+      return;
+    }
+    Object.assign(state, JSON.parse(event.data));
+    status.textContent = `${state.month}月  米価格: ${state.price}円  ${state.speaker_name || ""} ${state.clock || ""}`;
+    news.textContent = state.news ? `ニュース: ${state.news.name}` : "";
+    text.textContent = (state.line || "").slice(0, state.typed);
+  };
+  socket.onclose = () => { status.textContent = "再接続中..."; setTimeout(connect, 2000); };
+}
+connect();
+</script>
+</body></html>
+"""
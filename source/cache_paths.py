@@ -0,0 +1,24 @@
+import os
+import sys
+
+
+def user_cache_dir() -> str:
+    """ユーザーごとのキャッシュフォルダ（フォント解決結果などを保存）"""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "RiceWeatherJapan", "cache")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Caches/RiceWeatherJapan")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "riceweatherjapan")
+
+
+def user_data_dir() -> str:
+    """ユーザーごとのデータフォルダ（キャッシュと違い、消すと失われる状態を保存）"""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "RiceWeatherJapan")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/RiceWeatherJapan")
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "riceweatherjapan")
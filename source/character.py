@@ -2,6 +2,12 @@ import random
 import json
 import os
 import sys
+from bisect import bisect_right
+from typing import List, Tuple
+
+from source.log import get_logger
+
+log = get_logger("character")
 
 def resource_path(relative_path):
     """ 実行ファイル（.exe) とソースコードの両方でリソースへのパスを解決する """
@@ -15,52 +21,137 @@ def resource_path(relative_path):
 
 class Character:
     @classmethod
-    def create_from_config(cls, name: str, role: str, role_id: str):
-        """指定された役割IDからメッセージと画像を読み込み、Characterインスタンスを生成する"""
-        # role_idから画像パスとメッセージパスを生成
+    def create_from_config(cls, name: str, role: str, role_id: str, load_messages: bool = True):
+        """指定された役割IDからメッセージと画像を読み込み、Characterインスタンスを生成する
+
+        load_messages が False の場合はデフォルトのメッセージで生成し、後から差し替える
+        """
+        # role_idから画像パスを生成
         image_path = resource_path(os.path.join('assets', 'images', f'{role_id}.png'))
-        message_path = resource_path(os.path.join('assets', 'messages', f'{role_id}.json'))
+        messages = cls.load_messages(role_id) if load_messages else cls.default_messages()
+        return cls(name, role, image_path, messages)
 
-        default_messages = {
+    @staticmethod
+    def default_messages() -> dict:
+        return {
             "low_price": {"threshold": 300, "messages": ["..."]},
             "medium_price": {"threshold": 500, "messages": ["..."]},
             "high_price": {"messages": ["..."]}
         }
 
-        messages = default_messages
+    @classmethod
+    def load_messages(cls, role_id: str, strict: bool = False) -> dict:
+        """役割IDのメッセージファイルを読み込む（失敗時はデフォルト）
+
+        strict が True の場合は、ファイルが無い・壊れている・形式が違う場合に例外を送出する。
+        """
+        message_path = cls.message_path(role_id)
+
+        messages = cls.default_messages()
         if not os.path.exists(message_path):
-            print(f"警告: メッセージファイルが見つかりません: {message_path}")
+            if strict:
+                raise FileNotFoundError(message_path)
+            log.warning("メッセージファイルが見つかりません: %s", message_path)
         else:
             try:
                 with open(message_path, 'r', encoding='utf-8') as f:
                     messages = json.load(f)
+                if strict:
+                    cls.compile_messages(messages)
             except Exception as e:
-                print(f"エラー: メッセージファイルの読み込みに失敗しました: {message_path}, {e}")
+                if strict:
+                    raise
+                log.error("メッセージファイルの読み込みに失敗しました: %s, %s", message_path, e)
 
-        return cls(name, role, image_path, messages)
+        return messages
+
+    @staticmethod
+    def message_path(role_id: str) -> str:
+        return resource_path(os.path.join('assets', 'messages', f'{role_id}.json'))
+
+    @classmethod
+    def load_pack(cls, pack_path: str) -> List['Character']:
+        """全キャラクターを1つのパックファイルから読み込む
+
+        形式: {"characters": [{"name": ..., "role": ..., "role_id": ..., "tiers": [...]}, ...]}
+        メッセージは "tiers" の代わりに従来の low_price/medium_price/high_price でもよい。
+        """
+        with open(pack_path, 'r', encoding='utf-8') as f:
+            pack = json.load(f)
+
+        characters = []
+        for entry in pack["characters"]:
+            role_id = entry["role_id"]
+            image_path = resource_path(os.path.join('assets', 'images', f'{role_id}.png'))
+            messages = {key: value for key, value in entry.items() if key not in ("name", "role", "role_id")}
+            characters.append(cls(entry["name"], entry["role"], image_path, messages))
+        return characters
+
+    @staticmethod
+    def save_pack(cast: List[Tuple[str, str, str]], pack_path: str):
+        """(名前, 役割, 役割ID) の一覧から各メッセージファイルをまとめたパックを書き出す"""
+        entries = []
+        for name, role, role_id in cast:
+            entry = {"name": name, "role": role, "role_id": role_id}
+            entry.update(Character.load_messages(role_id))
+            entries.append(entry)
+        with open(pack_path, 'w', encoding='utf-8') as f:
+            json.dump({"characters": entries}, f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def compile_messages(messages: dict) -> Tuple[List[int], List[List[str]]]:
+        """メッセージ定義を昇順のしきい値配列と、それに対応するメッセージ群に変換する
+
+        pools[i] は thresholds[i] 未満（i が最後なら上限なし）の価格帯のメッセージ。
+        """
+        if "tiers" in messages:
+            tiers = messages["tiers"]
+        else:
+            # 従来の3段階形式（しきい値のデフォルトは300と500）
+            low = messages.get("low_price", {})
+            medium = messages.get("medium_price", {})
+            tiers = [
+                {"threshold": low.get("threshold", 300), "messages": low.get("messages", ["..."])},
+                {"threshold": medium.get("threshold", 500), "messages": medium.get("messages", ["..."])},
+                {"messages": messages.get("high_price", {}).get("messages", ["..."])},
+            ]
+
+        bounded = sorted((tier for tier in tiers if "threshold" in tier), key=lambda tier: tier["threshold"])
+        top = [tier for tier in tiers if "threshold" not in tier]
+        thresholds = [int(tier["threshold"]) for tier in bounded]
+        pools = [list(tier.get("messages") or ["..."]) for tier in bounded]
+        pools.append(list(top[-1].get("messages") or ["..."]) if top else ["..."])
+        return thresholds, pools
 
     def __init__(self, name: str, role: str, image_path: str, messages: dict):
         self.name = name
         self.role = role
         self.image_path = image_path
         self.image = None
+        self.frames = None  # スプライトシートから切り出したコマ（シートがある場合）
         self.messages = messages
 
-    def get_message(self, price: int) -> str:
-        """価格に応じてキャラクターのメッセージを生成"""
-        # 低価格帯から順にチェック
-        low_price_data = self.messages.get("low_price", {})
-        if price < low_price_data.get("threshold", 300):
-            message_list = low_price_data.get("messages", ["..."])
-            return random.choice(message_list)
+    @property
+    def messages(self) -> dict:
+        return self._messages
 
-        medium_price_data = self.messages.get("medium_price", {})
-        if price < medium_price_data.get("threshold", 500):
-            message_list = medium_price_data.get("messages", ["..."])
-            return random.choice(message_list)
+    @messages.setter
+    def messages(self, messages: dict):
+        """メッセージを設定し、価格帯の検索表を作り直す"""
+        self._messages = messages
+        self.thresholds, self.message_pools = self.compile_messages(messages)
 
-        # 上記のいずれにも当てはまらない場合は高価格帯
-        else:
-            high_price_data = self.messages.get("high_price", {})
-            message_list = high_price_data.get("messages", ["..."])
-            return random.choice(message_list)
+    def get_message(self, price: int, rng=random) -> str:
+        """価格に応じてキャラクターのメッセージを生成（rngはchoiceを持つ乱数生成器）"""
+        return rng.choice(self.message_pools[bisect_right(self.thresholds, price)])
+
+
+if __name__ == "__main__":
+    # 3人分のメッセージファイルを1つのパックにまとめる
+    pack_path = resource_path(os.path.join('assets', 'messages', 'characters.json'))
+    Character.save_pack([
+        ("田中さん", "主婦", "housewife"),
+        ("山田さん", "農家", "farmer"),
+        ("佐藤議員", "政治家", "politician")
+    ], pack_path)
+    print(f"パックを書き出しました: {pack_path}")
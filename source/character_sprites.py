@@ -0,0 +1,161 @@
+import math
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pygame
+from PIL import Image
+
+from source import asset_bake
+
+IDLE = "idle"  # 待機（瞬きなど）
+TALK = "talk"  # 口パク（タイプ表示の1文字ごとに1コマ進む）
+SHEET_ROWS = (IDLE, TALK)
+
+IDLE_FPS = 2.0  # 待機アニメーションのコマ送り（ゲーム内の秒あたり）
+
+Frames = Dict[str, List[pygame.Surface]]
+
+
+def sheet_path(image_path: str) -> str:
+    """キャラクター画像に対応するスプライトシート（farmer.png → farmer_sheet.png）"""
+    base, ext = os.path.splitext(image_path)
+    return f"{base}_sheet{ext}"
+
+
+def decode_sheet(path: str, size: Tuple[int, int]) -> Frames:
+    """スプライトシートを読み込み、1コマ size の大きさに切り分ける（ワーカースレッドから呼び出し可能）
+
+    シートは正方形のコマを横に並べた2行（1行目: 待機、2行目: 口パク）。
+    縮小はシート全体をまとめて asset_bake でベイクし、切り出しはその結果から行う。
+    """
+    with Image.open(path) as image:
+        width, height = image.size
+    side = height // len(SHEET_ROWS)
+    columns = width // side if side else 0
+    if columns == 0:
+        raise ValueError(f"スプライトシートの大きさが不正です: {path} ({width}x{height})")
+    sheet = asset_bake.decode_image(path, (columns * size[0], len(SHEET_ROWS) * size[1]))
+    return {name: [sheet.subsurface((column * size[0], row * size[1]) + size).copy()
+                   for column in range(columns)]
+            for row, name in enumerate(SHEET_ROWS)}
+
+
+def to_display_frames(frames: Frames) -> Frames:
+    """画面のピクセル形式に変換する（メインスレッドで一度だけ呼ぶ）"""
+    return {name: [asset_bake.to_display_format(frame) for frame in row] for name, row in frames.items()}
+
+
+def still_frames(image: pygame.Surface, bob: int) -> Frames:
+    """1枚絵からコマを作る（口パクの代わりに、話している間は bob ピクセル上下に揺らす）"""
+    if bob <= 0:
+        return {IDLE: [image], TALK: [image]}
+    raised = pygame.Surface(image.get_size(), pygame.SRCALPHA).convert_alpha()
+    raised.fill((0, 0, 0, 0))
+    raised.blit(image, (0, -bob))
+    return {IDLE: [image], TALK: [image, raised]}
+
+
+class CharacterSprite(pygame.sprite.DirtySprite):
+    """キャラクター1人分のスプライト。表示するコマが変わったときだけ dirty にする"""
+
+    def __init__(self, frames: Frames, position: Tuple[int, int], phase: float = 0.0):
+        super().__init__()
+        self.frames = frames
+        self.phase = phase  # 待機アニメーションが全員そろわないようにずらす（コマ数単位）
+        self.current: Tuple[str, int] = (IDLE, 0)
+        self.image = frames[IDLE][0]
+        self.rect = self.image.get_rect(topleft=position)
+
+    def select(self, name: str, index: int):
+        row = self.frames.get(name) or self.frames[IDLE]
+        index %= len(row)
+        if (name, index) != self.current:
+            self.current = (name, index)
+            self.image = row[index]
+            self.dirty = 1
+
+    def animate(self, now: float, talking: bool, typed: int):
+        if talking and len(self.frames.get(TALK, ())) > 1:
+            self.select(TALK, typed)
+        else:
+            self.select(IDLE, int(now * IDLE_FPS + self.phase))
+
+    @property
+    def animated(self) -> bool:
+        return len(self.frames[IDLE]) > 1
+
+
+class CharacterStage:
+    """キャラクターと話者ハイライトを LayeredDirty で描くステージ
+
+    静的レイヤー（背景）の上に重ね、コマが変わったスプライトと動いたハイライトの
+    範囲だけを描き直す。描画範囲はキャラクターの並ぶ帯に限定し、他の動的領域
+    （月・価格、グラフ、本文）には触れない。
+    """
+
+    def __init__(self, highlight_color: Tuple[int, int, int], highlight_margin: int, highlight_width: int):
+        self.highlight_color = highlight_color
+        self.highlight_margin = highlight_margin
+        self.highlight_width = highlight_width
+        self.sprites: List[CharacterSprite] = []
+        self.group = pygame.sprite.LayeredDirty()
+        self.highlight: Optional[pygame.sprite.DirtySprite] = None
+        self.area: Optional[pygame.Rect] = None
+        self.speaker = -1
+
+    def build(self, frame_sets: Sequence[Frames], positions: Sequence[Tuple[int, int]],
+              size: Tuple[int, int]):
+        """スプライトを作り直す（キャラクターや画像が変わったとき）"""
+        self.group.empty()
+        self.sprites = [CharacterSprite(frames, position, phase=i * 0.5)
+                        for i, (frames, position) in enumerate(zip(frame_sets, positions))]
+        self.group.add(*self.sprites, layer=0)
+
+        margin = self.highlight_margin
+        highlight = pygame.sprite.DirtySprite()
+        highlight.image = pygame.Surface((size[0] + 2 * margin, size[1] + 2 * margin), pygame.SRCALPHA)
+        highlight.image.fill((0, 0, 0, 0))
+        pygame.draw.rect(highlight.image, self.highlight_color, highlight.image.get_rect(), self.highlight_width)
+        highlight.image = highlight.image.convert_alpha()
+        highlight.rect = highlight.image.get_rect()
+        highlight.visible = 0
+        self.highlight = highlight
+        self.group.add(highlight, layer=1)
+        self.speaker = -1
+
+        rects = [sprite.rect for sprite in self.sprites]
+        self.area = rects[0].unionall(rects[1:]).inflate(2 * margin, 2 * margin) if rects else None
+        if self.area is not None:
+            self.group.set_clip(self.area)
+        # 全画面モードへ切り替わると背景で他の動的領域まで塗りつぶすため、常に差分で描く
+        self.group.set_timing_threshold(math.inf)
+
+    def update(self, now: float, speaker: int, talking: bool, typed: int):
+        """ゲーム内時計とタイプ表示の進み具合から、各スプライトのコマを選ぶ"""
+        for i, sprite in enumerate(self.sprites):
+            sprite.animate(now, talking and i == speaker, typed)
+        if speaker != self.speaker and self.highlight is not None:
+            self.speaker = speaker
+            highlight = self.highlight
+            if 0 <= speaker < len(self.sprites):
+                highlight.rect.topleft = (self.sprites[speaker].rect.x - self.highlight_margin,
+                                          self.sprites[speaker].rect.y - self.highlight_margin)
+                highlight.visible = 1
+            else:
+                highlight.visible = 0
+            highlight.dirty = 1
+
+    def time_until_next_frame(self, now: float) -> float:
+        """待機アニメーションの次のコマまでのゲーム内秒数（動くキャラクターがいなければ無限大）"""
+        if not any(sprite.animated for sprite in self.sprites):
+            return math.inf
+        return min((math.floor(now * IDLE_FPS + sprite.phase) + 1 - sprite.phase) / IDLE_FPS - now
+                   for sprite in self.sprites if sprite.animated)
+
+    def repaint(self, rect: pygame.Rect):
+        """rect の範囲を次の draw で描き直す（背景ごと上書きされたときなど）"""
+        self.group.repaint_rect(rect)
+
+    def draw(self, surface: pygame.Surface, background: Optional[pygame.Surface] = None) -> List[pygame.Rect]:
+        """変化したスプライトを描き、更新した矩形を返す"""
+        return self.group.draw(surface, background)
@@ -0,0 +1,249 @@
+"""放送の映像を画面なしで書き出す（アニメーションGIF または PNG連番）
+
+使い方（リポジトリのルートで実行）:
+    python -m source.clip_export clip.gif --seconds 60 --fps 10
+    python -m source.clip_export frames/ --format png --months 12 --fps 5
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, List, Optional, Sequence, Tuple
+
+import pygame
+from PIL import GifImagePlugin, Image
+
+from source.log import get_logger
+from source.rice_game_window import RiceGameWindow
+
+log = get_logger("clip_export")
+
+GIF = "gif"
+PNG = "png"
+FORMATS = (GIF, PNG)
+
+
+def _encode_gif_frame(rgb: bytes, size: Tuple[int, int], offset: Tuple[int, int],
+                      first: bool) -> Tuple[Optional[bytes], bytes]:
+    """RGBの画素を256色に減色し、GIFの1コマ分（画像記述子と圧縮データ）に変換する
+
+    表示時間はまだ決まっていないため、グラフィック制御拡張は書き込み側で付ける。
+    先頭のコマではファイルヘッダー（ループ指定付き）も作る。
+    """
+    image = Image.frombytes("RGB", size, rgb).quantize(256, method=Image.Quantize.FASTOCTREE)
+    header = None
+    if first:
+        # getheader は画像のパレットを書き換えることがあるため複製を渡す
+        header = b"".join(GifImagePlugin.getheader(image.copy(), info={"loop": 0})[0])
+    data = b"".join(GifImagePlugin.getdata(image, offset, include_color_table=True))
+    return header, data
+
+
+def _encode_png_frame(rgb: bytes, size: Tuple[int, int], path: str) -> str:
+    Image.frombytes("RGB", size, rgb).save(path, compress_level=6)
+    return os.path.basename(path)
+
+
+class _PendingFrame:
+    __slots__ = ("future", "start", "frames")
+
+    def __init__(self, future: Future, start: int):
+        self.future = future
+        self.start = start  # 何コマ目から表示するか
+        self.frames = 1     # 同じ画面が続いたコマ数
+
+
+class ClipWriter:
+    """描画済みのSurfaceを1コマずつ受け取り、ワーカースレッドで符号化して書き出す
+
+    変化の無いコマ（dirty_rects が空）は直前のコマの表示時間に加える。
+    GIFでは変化した矩形を囲む範囲だけを符号化し、前のコマに重ねて表示する。
+    符号化待ちのコマは max_pending 件までで、それを超えると書き出しが追いつくまで
+    add_frame が待つため、クリップの長さに関わらずメモリ使用量は一定に収まる。
+    """
+
+    def __init__(self, path: str, size: Tuple[int, int], fps: float, fmt: str = GIF,
+                 workers: int = 4, max_pending: int = 16):
+        if fmt not in FORMATS:
+            raise ValueError(f"未対応の形式です: {fmt}")
+        self.path = path
+        self.size = size
+        self.fps = fps
+        self.format = fmt
+        self.max_pending = max(1, max_pending)
+        self.frames = 0   # 受け取ったコマ数
+        self.written = 0  # 書き出した（重複をまとめた後の）コマ数
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clip")
+        self._pending: Deque[_PendingFrame] = deque()
+        self._closed = False
+        if fmt == GIF:
+            self._file = open(path, 'wb')
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._file = open(os.path.join(path, "frames.ffconcat"), 'w', encoding='utf-8')
+            self._file.write("ffconcat version 1.0\n")
+
+    def add_frame(self, surface: pygame.Surface, dirty_rects: Optional[Sequence[pygame.Rect]] = None):
+        """1コマ追加する（dirty_rects が空なら直前のコマと同じ画面とみなす）"""
+        if dirty_rects is not None and not dirty_rects and self._pending:
+            self._pending[-1].frames += 1
+            self.frames += 1
+            return
+
+        bounds = surface.get_rect()
+        if self.format == GIF and self.written + len(self._pending) > 0 and dirty_rects:
+            rect = pygame.Rect(dirty_rects[0]).unionall(list(dirty_rects[1:])).clip(bounds)
+        else:
+            rect = bounds
+        rgb = pygame.image.tobytes(surface.subsurface(rect), "RGB")
+
+        if self.format == GIF:
+            first = self.written + len(self._pending) == 0
+            future = self._executor.submit(_encode_gif_frame, rgb, rect.size, rect.topleft, first)
+        else:
+            name = f"frame_{self.written + len(self._pending):06d}.png"
+            future = self._executor.submit(_encode_png_frame, rgb, rect.size, os.path.join(self.path, name))
+        self._pending.append(_PendingFrame(future, self.frames))
+        self.frames += 1
+        self._flush()
+
+    def _flush(self, final: bool = False):
+        # 表示時間が確定した（後ろに次のコマがある）ものを順番に書き出す
+        pending = self._pending
+        while pending and (final or len(pending) > 1):
+            if not final and len(pending) <= self.max_pending and not pending[0].future.done():
+                break
+            self._write(pending.popleft())
+
+    def _duration_ms(self, frame: _PendingFrame) -> float:
+        return frame.frames * 1000.0 / self.fps
+
+    def _write(self, frame: _PendingFrame):
+        result = frame.future.result()
+        if self.format == GIF:
+            header, data = result
+            if header is not None:
+                self._file.write(header)
+            # 丸め誤差が溜まらないよう、開始・終了時刻をそれぞれ1/100秒単位に丸めた差を使う
+            start = round(frame.start * 100 / self.fps)
+            end = round((frame.start + frame.frames) * 100 / self.fps)
+            delay = min(max(1, end - start), 0xFFFF)
+            # グラフィック制御拡張: 処理方法1（前のコマを残す）と表示時間
+            self._file.write(struct.pack("<3sBHBB", b"!\xf9\x04", 1 << 2, delay, 0, 0))
+            self._file.write(data)
+        else:
+            self._file.write(f"file '{result}'\nduration {self._duration_ms(frame) / 1000.0:.3f}\n")
+        self.written += 1
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._flush(final=True)
+            if self.format == GIF:
+                self._file.write(b";")  # 終端
+        finally:
+            self._file.close()
+            self._executor.shutdown(wait=True)
+
+
+def _wait_for_assets(game):
+    # 読み込み中の資源がある間は進めない（書き出し結果を毎回同じにするため）
+    while not game.loader.finished:
+        for event in game.scheduler.wait(game.scheduler.max_wait_ms):
+            game.handle_event(event)
+
+
+def export_clip(game, writer: ClipWriter, seconds: Optional[float] = None,
+                months: Optional[int] = None) -> int:
+    """game を仮想時計で 1/fps 秒ずつ進めながら描画し、writer に渡す
+
+    seconds（書き出す映像の秒数）か months（月数）のどちらかで長さを指定する。
+    描画は通常の実行と同じ FrameRenderer を使い、書き出したコマ数を返す。
+    """
+    virtual_time = [0.0]
+    game.game_clock.use_source(lambda: virtual_time[0])
+    _wait_for_assets(game)
+    game.apply_simulation_events(game.simulation.start())
+    game.simulation.last_update = game.simulation.clock()
+
+    step = 1.0 / writer.fps  # 仮想の実時間（ゲーム内時間は時計の倍率を掛けて進む）
+    start_months = game.price_history.total
+    total_frames = int(seconds * writer.fps) if seconds is not None else None
+    frame = 0
+    while True:
+        if total_frames is not None and frame >= total_frames:
+            break
+        if months is not None and game.price_history.total - start_months >= months:
+            break
+        game.update_price()
+        game.update_text_display()
+        _wait_for_assets(game)
+        writer.add_frame(game.screen, game.renderer.render())
+        frame += 1
+        virtual_time[0] += step
+    return frame
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"解像度は 幅x高さ の形式で指定してください: {text}")
+    return width, height
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="書き出し先（GIFはファイル、PNGはディレクトリ）")
+    parser.add_argument("--format", choices=FORMATS, help="省略時は出力先の拡張子で判断")
+    parser.add_argument("--fps", type=float, default=10.0)
+    length = parser.add_mutually_exclusive_group()
+    length.add_argument("--seconds", type=float, help="映像の秒数（既定: 60）")
+    length.add_argument("--months", type=int, help="月数")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="ゲーム内時計の倍率")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--max-pending", type=int, default=16, help="符号化待ちにできるコマ数の上限")
+    parser.add_argument("--native", type=_parse_size, metavar="WxH", help="描画解像度（例: 256x240, 400x300）")
+    parser.add_argument("--replay", help="録画した放送ログから書き出す")
+    parser.add_argument("--seek", type=int, help="再生開始の月（--replay と併用）")
+    parser.add_argument("--prices", help="価格データ（CSV/JSONLファイルまたはURL、--replay 指定時は使わない）")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or (GIF if args.output.lower().endswith(".gif") else PNG)
+    seconds = args.seconds if args.seconds is not None or args.months is not None else 60.0
+
+    # 画面も音も出さない
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    game = RiceGameWindow(native_size=args.native,
+                          time_scale=args.time_scale)
+    if args.replay:
+        # 再生中は価格もログから読むため、価格データは開かない
+        game.start_replay(args.replay, args.seek)
+    elif args.prices:
+        game.set_price_source(args.prices)
+
+    writer = ClipWriter(args.output, game.screen.get_size(), args.fps, fmt,
+                        workers=args.workers, max_pending=args.max_pending)
+    wall_start = time.perf_counter()
+    try:
+        frames = export_clip(game, writer, seconds=seconds, months=args.months)
+    finally:
+        writer.close()
+        if game.simulation.price_source is not None:
+            game.simulation.price_source.close()
+        game.loader.shutdown()
+        pygame.quit()
+    elapsed = time.perf_counter() - wall_start
+    print(f"{args.output}: {frames}コマ（重複をまとめて{writer.written}コマ）, "
+          f"{frames / args.fps:.1f}秒分を{elapsed:.1f}秒で書き出しました")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+
+
+class DisplayScaler:
+    """描画先のSurfaceを整数倍（最近傍）に拡大してウィンドウへ転送する
+
+    native_size を指定すると低解像度のオフスクリーンSurfaceに描画し、present() で
+    変化した矩形だけを拡大して転送する。ウィンドウ（または全画面）の余白は黒で埋め、
+    拡大した画面は中央に置く。ウィンドウと描画先が同じ大きさなら直接描画する。
+    """
+
+    def __init__(self, native_size: Tuple[int, int], window_size: Optional[Tuple[int, int]] = None,
+                 fullscreen: bool = False):
+        self.native_size = native_size
+        if fullscreen:
+            self.window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            if window_size is None:
+                # 800x600 に収まる最大の整数倍（最低1倍）
+                factor = max(1, min(800 // native_size[0], 600 // native_size[1]))
+                window_size = (native_size[0] * factor, native_size[1] * factor)
+            self.window = pygame.display.set_mode(window_size)
+
+        window_width, window_height = self.window.get_size()
+        self.factor = max(1, min(window_width // native_size[0], window_height // native_size[1]))
+        self.offset = ((window_width - native_size[0] * self.factor) // 2,
+                       (window_height - native_size[1] * self.factor) // 2)
+        # ウィンドウに一部でも映る描画先の範囲（ウィンドウが native_size x 倍率より小さいとはみ出す）
+        left = max(0, -self.offset[0] // self.factor)
+        top = max(0, -self.offset[1] // self.factor)
+        right = min(native_size[0], -((self.offset[0] - window_width) // self.factor))
+        bottom = min(native_size[1], -((self.offset[1] - window_height) // self.factor))
+        self.visible = pygame.Rect(left, top, max(0, right - left), max(0, bottom - top))
+        self.direct = self.window.get_size() == native_size
+        if self.direct:
+            self.surface = self.window
+        else:
+            self.surface = pygame.Surface(native_size).convert()
+            self.window.fill((0, 0, 0))
+            pygame.display.flip()
+
+    def present(self, dirty_rects: Optional[Sequence[pygame.Rect]] = None):
+        """描画先の dirty_rects（省略時は全体）をウィンドウに転送する"""
+        if self.direct:
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            return
+
+        visible = self.visible
+        if dirty_rects is None:
+            dirty_rects = [visible]
+        factor = self.factor
+        offset_x, offset_y = self.offset
+        window_rect = self.window.get_rect()
+        updated: List[pygame.Rect] = []
+        for rect in dirty_rects:
+            # ウィンドウに映らない部分は転送しない（縮めるのではなく切り取る）
+            rect = rect.clip(visible)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            target = pygame.Rect(offset_x + rect.x * factor, offset_y + rect.y * factor,
+                                 rect.width * factor, rect.height * factor)
+            # transform.scale は最近傍補間
+            if window_rect.contains(target):
+                # 転送先のサブサーフェスに直接書き込む
+                pygame.transform.scale(self.surface.subsurface(rect), target.size, self.window.subsurface(target))
+            else:
+                # ウィンドウの端で画素の途中まで映る場合は、拡大してからはみ出た分を切り取る
+                self.window.blit(pygame.transform.scale(self.surface.subsurface(rect), target.size), target)
+                target = target.clip(window_rect)
+            updated.append(target)
+        pygame.display.update(updated)
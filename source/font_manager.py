@@ -0,0 +1,199 @@
+import io
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+import pygame
+
+from source.cache_paths import user_cache_dir
+from source.log import get_logger
+
+log = get_logger("font_manager")
+
+
+def resource_path(relative_path):
+    """ 実行ファイル（.exe) とソースコードの両方でリソースへのパスを解決する """
+    try:
+        # PyInstallerが作成する一時フォルダ
+        base_path = sys._MEIPASS
+    except Exception:
+        # 通常のPython環境
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def _bundled_relative(path: str) -> Optional[str]:
+    """同梱資源（resource_path の基準フォルダ以下）なら基準からの相対パス、それ以外は None"""
+    base = os.path.abspath(resource_path(""))
+    path = os.path.abspath(path)
+    try:
+        if os.path.commonpath([base, path]) != base:
+            return None
+    except ValueError:  # Windows で別ドライブ
+        return None
+    return os.path.relpath(path, base).replace(os.sep, "/")
+
+
+def font_candidates() -> List[str]:
+    return [
+        # 優先度1: x12y16pxMaruMonica (ファミコン風) - resource_pathを使用
+        resource_path(os.path.join('assets', 'fonts', 'x12y16pxMaruMonica.ttf')),
+
+        # 優先度2: システムフォント（Windows, macOS, Linux）
+        # Windows
+        "C:/Windows/Fonts/msgothic.ttc",  # MS Gothic
+        "C:/Windows/Fonts/msmincho.ttc",  # MS Mincho
+        "C:/Windows/Fonts/meiryo.ttc",    # Meiryo
+        "C:/Windows/Fonts/NotoSansCJK-Regular.ttc",
+        # macOS
+        "/System/Library/Fonts/Helvetica.ttc",
+        "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
+        # Linux
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    ]
+
+
+# フォールバック: システムフォントから探す日本語対応フォント
+JAPANESE_SYSTEM_FONTS = [
+    'msgothic', 'msmincho', 'meiryo', 'notosanscjk',
+    'hiraginokakugothicpro', 'hiraginominchopro',
+    'takao', 'ipa', 'vlgothic', 'arial unicode ms'
+]
+
+CACHE_FILE_NAME = "font_resolution.json"
+
+
+class FontManager:
+    """使用するフォントファイルを一度だけ解決し、全サイズで同じファイル内容を共有する
+
+    見つかったフォントはプラットフォームとフォントフォルダの内容をキーにディスクへ保存し、
+    次回以降の起動では候補の探索やシステムフォントの列挙を省略する（見つからない結果は保存しない）。
+    同梱フォントは resource_path の基準からの相対パスで扱う（PyInstaller の onefile 版では
+    基準が起動ごとに変わる一時フォルダになるため）。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_path = os.path.join(cache_dir or user_cache_dir(), CACHE_FILE_NAME)
+        self.font_path: Optional[str] = None
+        self.resolve_time = 0.0  # 秒
+        self.cache_hit = False
+        self._resolved = False
+        self._font_data: Optional[bytes] = None
+        self._fonts: Dict[int, pygame.font.Font] = {}
+
+    def _cache_key(self) -> str:
+        """候補フォントのフォルダの状態（フォントの追加・削除で変わる）
+
+        システムのフォルダは更新日時、同梱のフォルダは展開のたびに更新日時が変わるため
+        基準からの相対パスとファイル名の一覧を使う。
+        """
+        folders = sorted({os.path.dirname(path) for path in font_candidates()})
+        stamps = []
+        for folder in folders:
+            relative = _bundled_relative(folder)
+            try:
+                if relative is not None:
+                    stamps.append(f"@{relative}:{','.join(sorted(os.listdir(folder)))}")
+                else:
+                    stamps.append(f"{folder}:{os.stat(folder).st_mtime_ns}")
+            except OSError:
+                stamps.append(f"{relative if relative is not None else folder}:-")
+        return "|".join([sys.platform] + stamps)
+
+    def _load_cache(self, key: str) -> bool:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get("key") != key:
+            return False
+        path = cached.get("path")
+        if path is None:
+            # 以前の版が保存した「見つからない」結果は使わずに探し直す
+            return False
+        if cached.get("bundled"):
+            path = resource_path(path)
+        if not os.path.exists(path):
+            return False
+        self.font_path = path
+        return True
+
+    def _save_cache(self, key: str):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            relative = _bundled_relative(self.font_path)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "path": relative if relative is not None else self.font_path,
+                           "bundled": relative is not None}, f, ensure_ascii=False)
+        except OSError as e:
+            log.warning("フォント解決結果の保存に失敗しました: %s, %s", self.cache_path, e)
+
+    def _search(self) -> Optional[str]:
+        for font_path in font_candidates():
+            if os.path.exists(font_path):
+                return font_path
+
+        # フォールバック: システムフォントから日本語対応フォントを探す（列挙は遅い）
+        try:
+            log.info("システムフォントから日本語フォントを検索します...")
+            for jp_font in JAPANESE_SYSTEM_FONTS:
+                path = pygame.font.match_font(jp_font)
+                if path:
+                    log.info("システムフォント '%s' を使用します。", jp_font)
+                    return path
+        except Exception as e:
+            log.error("システムフォントの検索中にエラーが発生しました: %s", e)
+
+        log.warning("日本語対応システムフォントが見つかりません。デフォルトフォントを使用します。")
+        return None
+
+    def resolve(self) -> Optional[str]:
+        """使用するフォントファイルのパスを返す（None はデフォルトフォント）"""
+        if self._resolved:
+            return self.font_path
+
+        start = time.perf_counter()
+        key = self._cache_key()
+        self.cache_hit = self._load_cache(key)
+        if not self.cache_hit:
+            self.font_path = self._search()
+            # 見つからなかった結果は保存しない（フォントの導入やドライブの接続で
+            # フォルダの更新日時が変わらないまま見つかるようになることがある）
+            if self.font_path is not None:
+                self._save_cache(key)
+
+        if self.font_path is not None:
+            try:
+                with open(self.font_path, 'rb') as f:
+                    self._font_data = f.read()
+            except OSError as e:
+                log.error("フォント '%s' の読み込みに失敗しました: %s", self.font_path, e)
+                self.font_path = None
+
+        self._resolved = True
+        self.resolve_time = time.perf_counter() - start
+        log.info("フォントを解決しました: %s (%.1fms, キャッシュ%s)",
+                 self.font_path, self.resolve_time * 1000, 'あり' if self.cache_hit else 'なし')
+        return self.font_path
+
+    def get(self, size: int) -> pygame.font.Font:
+        """指定サイズのフォントを返す（ファイル内容はサイズ間で共有）"""
+        font = self._fonts.get(size)
+        if font is not None:
+            return font
+
+        self.resolve()
+        font = None
+        if self._font_data is not None:
+            try:
+                font = pygame.font.Font(io.BytesIO(self._font_data), size)
+            except Exception as e:
+                log.error("フォント '%s' の読み込みに失敗しました: %s", self.font_path, e)
+        if font is None:
+            font = pygame.font.Font(None, size)
+        self._fonts[size] = font
+        return font
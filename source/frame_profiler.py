@@ -0,0 +1,111 @@
+import time
+from array import array
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+from source.log import get_logger
+
+log = get_logger("frame_profiler")
+
+# 計測するフェーズ（RiceGameWindow.run の処理順）
+EVENTS = 0
+UPDATE_PRICE = 1
+UPDATE_TEXT_DISPLAY = 2
+DRAW_BACKGROUND = 3
+DRAW_UI = 4
+DRAW_TEXT_WINDOW = 5
+DISPLAY_UPDATE = 6
+PHASES = ("events", "update_price", "update_text_display", "draw_background",
+          "draw_ui", "draw_text_window", "display_update")
+
+HUD_REFRESH_NS = 500_000_000
+
+
+class FrameProfiler:
+    """フェーズごとの処理時間をリングバッファに記録するフレームプロファイラー
+
+    記録先の配列は最初に確保し、計測中はメモリ確保を行わない。
+    無効時は RiceGameWindow.profiler が None になり、各計測点の判定だけが残る。
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.samples = [array('q', bytes(8 * capacity)) for _ in PHASES]  # ナノ秒
+        self.frame_count = 0
+        self.hud_visible = False
+        self._row = 0
+        self._last = 0
+        self._hud_surface: Optional[pygame.Surface] = None
+        self._hud_time = 0
+        self._hud_font: Optional[pygame.font.Font] = None
+
+    def begin_frame(self):
+        self._row = self.frame_count % self.capacity
+        for samples in self.samples:
+            samples[self._row] = 0
+        self._last = time.perf_counter_ns()
+
+    def mark(self, phase: int):
+        """直前の計測点からの経過時間を phase に加算する"""
+        now = time.perf_counter_ns()
+        self.samples[phase][self._row] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        self.frame_count += 1
+
+    @property
+    def recorded_frames(self) -> int:
+        return min(self.frame_count, self.capacity)
+
+    def percentiles(self) -> Dict[str, Tuple[float, float, float]]:
+        """フェーズごとの p50/p95/p99（ミリ秒）"""
+        count = self.recorded_frames
+        result = {}
+        for name, samples in zip(PHASES, self.samples):
+            if count == 0:
+                result[name] = (0.0, 0.0, 0.0)
+                continue
+            ordered = sorted(samples[:count])
+            result[name] = tuple(ordered[min(count - 1, int(count * q))] / 1e6 for q in (0.50, 0.95, 0.99))
+        return result
+
+    def export_csv(self, path: Optional[str] = None) -> str:
+        """記録中のフレームを古い順にCSVへ書き出す（1行1フレーム、単位はミリ秒）"""
+        if path is None:
+            path = time.strftime("frame_profile_%Y%m%d_%H%M%S.csv")
+        count = self.recorded_frames
+        first = self.frame_count - count
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("frame," + ",".join(PHASES) + ",total\n")
+            for frame in range(first, self.frame_count):
+                row = frame % self.capacity
+                values = [samples[row] for samples in self.samples]
+                f.write(f"{frame}," + ",".join(f"{v / 1e6:.4f}" for v in values) + f",{sum(values) / 1e6:.4f}\n")
+        log.info("フレームの計測結果を書き出しました: %s (%dフレーム)", path, count)
+        return path
+
+    def hud_surface(self) -> pygame.Surface:
+        """p50/p95/p99 を表示するHUD（更新は0.5秒に1回）"""
+        now = time.perf_counter_ns()
+        if self._hud_surface is not None and now - self._hud_time < HUD_REFRESH_NS:
+            return self._hud_surface
+
+        if self._hud_font is None:
+            self._hud_font = pygame.font.Font(None, 20)
+        font = self._hud_font
+        lines = [f"{'phase':<20} p50    p95    p99 (ms)"]
+        for name, (p50, p95, p99) in self.percentiles().items():
+            lines.append(f"{name:<20} {p50:6.2f} {p95:6.2f} {p99:6.2f}")
+        lines.append(f"frames: {self.frame_count}")
+
+        line_height = font.get_linesize()
+        width = max(font.size(line)[0] for line in lines) + 12
+        surface = pygame.Surface((width, line_height * len(lines) + 8))
+        surface.fill((0, 0, 0))
+        for i, line in enumerate(lines):
+            surface.blit(font.render(line, True, (0, 255, 0)), (6, 4 + i * line_height))
+        self._hud_surface = surface
+        self._hud_time = now
+        return surface
@@ -0,0 +1,186 @@
+from collections import OrderedDict
+from typing import List, Optional
+
+import pygame
+
+from source.frame_profiler import DRAW_BACKGROUND, DRAW_TEXT_WINDOW, DRAW_UI
+
+
+class FrameRenderer:
+    """静的レイヤーを事前合成し、変化した領域だけを画面に転送するレンダラー
+
+    静的レイヤー: 背景・タイトル・テキストウィンドウ枠
+    動的領域: 月と価格の表示欄、価格グラフ、話者名の見出し、メッセージ本文の表示欄
+    スプライト: キャラクターと話者ハイライト（コマが変わったものだけを描き直す）
+    """
+
+    def __init__(self, game, max_layers: int = 8):
+        self.game = game
+        self.max_layers = max_layers
+        self._layers: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self._current_key = None
+        self._status_state = None
+        self._text_state = None
+        self._chart_state = None
+        self._label_state = None
+        self._overlay: Optional[pygame.Surface] = None
+        self._overlay_rect: Optional[pygame.Rect] = None
+        self._sprites_ready = False
+        self._update_regions()
+
+    def _update_regions(self):
+        game = self.game
+        width, height = game.width, game.height
+        status_height = game.font_medium.get_height() + 8
+        # 月・価格・インジケーターの行
+        self.status_rect = pygame.Rect(0, game.ui_y(66), width, max(status_height, game.ui_y(45)))
+        # テキストウィンドウの見出し（話者名）。本文の領域とは重ならないようにする
+        text_top = game.ui_y(445)
+        self.label_rect = pygame.Rect(game.ui_x(50), game.ui_y(400), game.ui_x(750) - game.ui_x(50),
+                                      text_top - game.ui_y(400))
+        # メッセージ本文（最終行はウィンドウ下端をはみ出すことがあるため画面下端まで）
+        self.text_rect = pygame.Rect(0, text_top, width, height - text_top)
+        # 価格グラフ（枠線の分だけ広げる）
+        self.chart_rect = game.chart_rect.inflate(2, 2)
+
+    def invalidate(self):
+        """静的レイヤーを破棄し、次のフレームで全画面を描き直す（資源の差し替え時など）"""
+        self._layers.clear()
+        self._current_key = None
+        self._sprites_ready = False
+        self._update_regions()
+
+    def static_key(self) -> tuple:
+        game = self.game
+        # 話者のハイライトと話者名は静的レイヤーに含めない（ステージと見出しの領域で描き直す）
+        return (game.get_season(game.current_month),
+                game.showing_news,
+                game.current_news is not None)
+
+    def _get_layer(self, key: tuple) -> pygame.Surface:
+        layer = self._layers.get(key)
+        if layer is not None:
+            self._layers.move_to_end(key)
+            return layer
+
+        game = self.game
+        layer = pygame.Surface((game.width, game.height)).convert()
+        screen = game.screen
+        game.screen = layer
+        try:
+            game.draw_background()
+            game.draw_title()
+            game.draw_news_indicator()
+            game.draw_text_frame()
+        finally:
+            game.screen = screen
+
+        self._layers[key] = layer
+        if len(self._layers) > self.max_layers:
+            self._layers.popitem(last=False)
+        return layer
+
+    def render(self, overlay: Optional[pygame.Surface] = None) -> List[pygame.Rect]:
+        """フレームを描画し、更新が必要な矩形のリストを返す（変化がなければ空）
+
+        overlay は左上に重ねて表示するSurface（プロファイラーのHUDなど）。
+        """
+        game = self.game
+        profiler = game.profiler
+        screen = game.screen
+        key = self.static_key()
+        layer = self._get_layer(key)
+        status_state = (game.current_month, game.rice_price, game.game_clock.label())
+        chart_state = (game.price_history.generation, game.price_history.total)
+        label_state = game.highlighted_speaker()
+        text_state = game.display_message
+        stage = game.character_stage
+        if not self._sprites_ready:
+            game.build_character_sprites()
+            self._sprites_ready = True
+            self._current_key = None
+
+        if key != self._current_key:
+            screen.blit(layer, (0, 0))
+            if profiler:
+                profiler.mark(DRAW_BACKGROUND)
+            game.update_character_sprites()
+            stage.repaint(screen.get_rect())
+            stage.draw(screen, layer)
+            game.draw_status()
+            game.draw_price_chart()
+            if profiler:
+                profiler.mark(DRAW_UI)
+            game.draw_speaker_label()
+            game.draw_message_lines()
+            if profiler:
+                profiler.mark(DRAW_TEXT_WINDOW)
+            self._current_key = key
+            self._status_state = status_state
+            self._chart_state = chart_state
+            self._label_state = label_state
+            self._text_state = text_state
+            self._overlay_rect = None
+            self._overlay = None
+            if overlay is not None:
+                self._draw_overlay(overlay)
+            return [screen.get_rect()]
+
+        dirty = []
+        overlay_changed = overlay is not self._overlay
+        if overlay_changed and self._overlay_rect is not None:
+            # 前回のオーバーレイを消し、下にあった動的領域は描き直す
+            screen.blit(layer, self._overlay_rect, self._overlay_rect)
+            stage.repaint(self._overlay_rect)
+            dirty.append(self._overlay_rect)
+            if self._overlay_rect.colliderect(self.status_rect):
+                self._status_state = None
+            if self._overlay_rect.colliderect(self.chart_rect):
+                self._chart_state = None
+            if self._overlay_rect.colliderect(self.label_rect):
+                self._label_state = None
+            if self._overlay_rect.colliderect(self.text_rect):
+                self._text_state = None
+            self._overlay_rect = None
+        if profiler:
+            profiler.mark(DRAW_BACKGROUND)
+
+        game.update_character_sprites()
+        dirty.extend(stage.draw(screen, layer))
+        if status_state != self._status_state:
+            screen.blit(layer, self.status_rect, self.status_rect)
+            game.draw_status()
+            self._status_state = status_state
+            dirty.append(self.status_rect)
+        if chart_state != self._chart_state:
+            screen.blit(layer, self.chart_rect, self.chart_rect)
+            game.draw_price_chart()
+            self._chart_state = chart_state
+            dirty.append(self.chart_rect)
+        if profiler:
+            profiler.mark(DRAW_UI)
+
+        if label_state != self._label_state:
+            screen.blit(layer, self.label_rect, self.label_rect)
+            game.draw_speaker_label()
+            self._label_state = label_state
+            dirty.append(self.label_rect)
+        if text_state != self._text_state:
+            screen.blit(layer, self.text_rect, self.text_rect)
+            game.draw_message_lines()
+            self._text_state = text_state
+            dirty.append(self.text_rect)
+        if profiler:
+            profiler.mark(DRAW_TEXT_WINDOW)
+
+        if overlay is not None and (overlay_changed or any(rect.colliderect(overlay.get_rect()) for rect in dirty)):
+            dirty.append(self._draw_overlay(overlay))
+        elif overlay is None:
+            self._overlay = None
+
+        return dirty
+
+    def _draw_overlay(self, overlay: pygame.Surface) -> pygame.Rect:
+        self._overlay = overlay
+        self._overlay_rect = self.game.screen.blit(overlay, (0, 0))
+        return self._overlay_rect
@@ -0,0 +1,34 @@
+from typing import List
+
+import pygame
+
+
+class FrameScheduler:
+    """次の状態変化まで pygame.event.wait でスリープするフレームスケジューラー
+
+    タイプライター・ニュース・月切り替えの各タイマーから次の締め切りを受け取り、
+    それまでは入力イベントが来ない限りCPUを使わずに待機する。
+    """
+
+    def __init__(self, max_fps: int = 60, max_wait_ms: int = 1000):
+        self.max_fps = max_fps
+        self.max_wait_ms = max_wait_ms
+        self.clock = pygame.time.Clock()
+        self.frames = 0
+        self.idle_waits = 0
+
+    def wait(self, timeout_ms: float) -> List[pygame.event.Event]:
+        """締め切りまで（または入力があるまで）待機し、溜まったイベントを返す"""
+        # 連続して更新がある場合でも max_fps を超えないようにする
+        self.clock.tick(self.max_fps)
+        self.frames += 1
+
+        timeout = int(min(timeout_ms, self.max_wait_ms))
+        if timeout <= 0:
+            return pygame.event.get()
+
+        self.idle_waits += 1
+        event = pygame.event.wait(timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        return events
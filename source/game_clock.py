@@ -0,0 +1,85 @@
+import math
+import time
+from typing import Callable
+
+# 切り替え可能な速度（キー 1/2/3）
+TIME_SCALES = (1.0, 10.0, 100.0)
+
+
+class GameClock:
+    """ゲーム内のすべてのタイマーが読む単調増加の時計
+
+    実時間（time.monotonic）に倍率を掛けて進み、一時停止・倍率変更・
+    指定秒数の早送りができる。倍率を変えても時刻は連続したまま変わらない。
+    """
+
+    def __init__(self, scale: float = 1.0, source: Callable[[], float] = time.monotonic):
+        self.source = source
+        self._base_real = source()
+        self._base_game = 0.0
+        self._scale = scale
+        self.paused = False
+
+    def now(self) -> float:
+        """ゲーム内の経過秒数"""
+        if self.paused:
+            return self._base_game
+        return self._base_game + (self.source() - self._base_real) * self._scale
+
+    def now_ms(self) -> int:
+        return int(self.now() * 1000)
+
+    def _rebase(self):
+        game_time = self.now()
+        self._base_real = self.source()
+        self._base_game = game_time
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    @scale.setter
+    def scale(self, scale: float):
+        self._rebase()
+        self._scale = scale
+
+    def pause(self):
+        if not self.paused:
+            self._rebase()
+            self.paused = True
+
+    def resume(self):
+        if self.paused:
+            self._base_real = self.source()
+            self.paused = False
+
+    def toggle_pause(self):
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def use_source(self, source: Callable[[], float]):
+        """実時間の代わりに読む時計を差し替える（動画書き出し時の仮想時計など）"""
+        game_time = self.now()
+        self.source = source
+        self._base_real = source()
+        self._base_game = game_time
+
+    def advance(self, seconds: float):
+        """ゲーム内時間を seconds 秒だけ進める（次の月へのスキップなど）"""
+        self._base_game += max(0.0, seconds)
+
+    def real_delay_ms(self, game_ms: float) -> float:
+        """ゲーム内の game_ms ミリ秒後が実時間で何ミリ秒後か（停止中は無限大）"""
+        if self.paused or self._scale <= 0:
+            return math.inf
+        return game_ms / self._scale
+
+    def label(self) -> str:
+        """ステータス欄に表示する速度（通常速度なら空）"""
+        if self.paused:
+            return "停止中"
+        if self._scale == 1.0:
+            return ""
+        return f"x{self._scale:g}"
@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from source.log import get_logger
+
+log = get_logger("hot_reload")
+
+
+class _Watch:
+    __slots__ = ("path", "load", "on_ready", "stamp", "group")
+
+    def __init__(self, path: str, load: Callable[[], object], on_ready: Callable[[object], None],
+                 stamp: Optional[Tuple[int, int]], group: Optional[str] = None):
+        self.path = path
+        self.load = load
+        self.on_ready = on_ready
+        self.stamp = stamp
+        self.group = group
+
+
+WatchEntry = Tuple[str, Callable[[], object], Callable[[object], None]]
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """更新日時とサイズ（ファイルが無ければ None）"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class AssetWatcher:
+    """資源ファイルの更新日時を低頻度で確認し、変更されたものだけを読み直すスレッド
+
+    読み込み（load）は監視スレッドで行い、結果は apply_pending() を呼んだ
+    メインスレッドでまとめて反映する。読み込みに失敗した場合（編集途中や
+    書式の誤り）は反映せず、以前の内容を使い続ける。
+    """
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._watches: List[_Watch] = []
+        self._lock = threading.Lock()
+        self._ready = queue.Queue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, path: str, load: Callable[[], object], on_ready: Callable[[object], None],
+              group: Optional[str] = None):
+        """path が更新されたら load() で読み直し、反映時に on_ready(結果) を呼ぶ"""
+        with self._lock:
+            self._watches.append(_Watch(path, load, on_ready, file_stamp(path), group))
+
+    def replace_group(self, group: str, entries: Iterable[WatchEntry]):
+        """group の監視対象を entries（path, load, on_ready）で置き換える
+
+        再読み込みで対象のファイル自体が増減する場合（キャラクターの入れ替えなど）に使う。
+        置き換え前から監視していたファイルは、記録済みの更新日時を引き継ぐ。
+        """
+        with self._lock:
+            previous = {watch.path: watch.stamp for watch in self._watches if watch.group == group}
+            watches = [watch for watch in self._watches if watch.group != group]
+            for path, load, on_ready in entries:
+                stamp = previous[path] if path in previous else file_stamp(path)
+                watches.append(_Watch(path, load, on_ready, stamp, group))
+            self._watches = watches
+
+    @property
+    def paths(self) -> List[str]:
+        with self._lock:
+            return [watch.path for watch in self._watches]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="asset-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def _run(self):
+        # 停止要求が来るまで interval 秒ごとに確認する（待機中はCPUを使わない）
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> int:
+        """更新されたファイルを読み直し、反映待ちにした件数を返す"""
+        with self._lock:
+            watches = list(self._watches)
+        reloaded = 0
+        for watch in watches:
+            stamp = file_stamp(watch.path)
+            if stamp == watch.stamp:
+                continue
+            watch.stamp = stamp
+            if stamp is None:
+                continue  # 削除された場合は以前の内容のまま
+            try:
+                value = watch.load()
+            except Exception as e:
+                log.warning("資源の再読み込みに失敗したため、以前の内容を使います: %s, %s", watch.path, e)
+                continue
+            self._ready.put((watch, value))
+            reloaded += 1
+        return reloaded
+
+    @property
+    def pending(self) -> bool:
+        return not self._ready.empty()
+
+    def apply_pending(self) -> int:
+        """読み直した資源をまとめて反映する（メインスレッドから呼ぶ）"""
+        latest: Dict[str, Tuple[_Watch, object]] = {}
+        while True:
+            try:
+                watch, value = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            latest[watch.path] = (watch, value)  # 同じファイルは最新の結果だけを使う
+
+        applied = 0
+        for path, (watch, value) in latest.items():
+            try:
+                watch.on_ready(value)
+                applied += 1
+                log.info("資源を再読み込みしました: %s", path)
+            except Exception as e:
+                log.error("再読み込みした資源の反映に失敗しました: %s, %s", path, e)
+        return applied
@@ -0,0 +1,173 @@
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from source.cache_paths import user_cache_dir
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS_BY_NAME = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+
+# 同じメッセージ（書式文字列）を出力する上限（RATE_WINDOW 秒あたり）
+RATE_LIMIT = 5
+RATE_WINDOW = 1.0
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+class RingBufferSink:
+    """直近のログを保持し、クラッシュ時にファイルへ書き出すためのバッファ"""
+
+    def __init__(self, size: int):
+        self.records: Deque[Tuple[float, int, str, str]] = deque(maxlen=size)
+
+    def write(self, created: float, level: int, name: str, message: str):
+        self.records.append((created, level, name, message))
+
+    def dump(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for created, level, name, message in self.records:
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))
+                f.write(f"{stamp} [{LEVEL_NAMES.get(level, level)}] {name}: {message}\n")
+
+
+class Logger:
+    """レベル付きロガー
+
+    無効なレベルのメソッドは何もしない関数に差し替えるため、フレームループ内の
+    無効なログ呼び出しのコストは関数呼び出し1回分で済む。引数の書式化は出力時のみ行う。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.level = OFF
+        self.debug = self.info = self.warning = self.error = _noop
+        self.debug_enabled = False
+
+    def set_level(self, level: int):
+        self.level = level
+        self.debug = self._emitter(DEBUG) if level <= DEBUG else _noop
+        self.info = self._emitter(INFO) if level <= INFO else _noop
+        self.warning = self._emitter(WARNING) if level <= WARNING else _noop
+        self.error = self._emitter(ERROR) if level <= ERROR else _noop
+        # 引数の準備自体が重い場合は `if log.debug_enabled:` で囲む
+        self.debug_enabled = level <= DEBUG
+
+    def _emitter(self, level: int):
+        def emit(message: str, *args):
+            _emit(self.name, level, message, args)
+        return emit
+
+
+_loggers: Dict[str, Logger] = {}
+_level = INFO
+_console = True
+_ring: Optional[RingBufferSink] = RingBufferSink(256)
+_rates: Dict[str, List[float]] = {}
+_lock = threading.Lock()  # 資源読み込みスレッドからも呼ばれる
+
+
+def _emit(name: str, level: int, message: str, args: tuple):
+    with _lock:
+        _emit_locked(name, level, message, args)
+
+
+def _emit_locked(name: str, level: int, message: str, args: tuple):
+    now = time.monotonic()
+    # 書式文字列ごとの出力回数制限（毎フレーム・毎文字の経路からの連続出力を抑える）
+    rate = _rates.get(message)
+    if rate is None:
+        _rates[message] = [now, 1, 0]
+    elif now - rate[0] >= RATE_WINDOW:
+        if rate[2]:
+            _write(name, WARNING, f"（直前の{RATE_WINDOW:g}秒間に同じログを{rate[2]}件省略しました）")
+        rate[:] = [now, 1, 0]
+    elif rate[1] >= RATE_LIMIT:
+        rate[2] += 1
+        return
+    else:
+        rate[1] += 1
+
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = f"{message} {args}"
+    _write(name, level, message)
+
+
+def _write(name: str, level: int, message: str):
+    if _ring is not None:
+        _ring.write(time.time(), level, name, message)
+    if _console and sys.stdout is not None:  # --windowed ビルドでは stdout が無い
+        print(f"[{LEVEL_NAMES.get(level, level)}] {name}: {message}")
+
+
+def get_logger(name: str) -> Logger:
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = Logger(name)
+        logger.set_level(_level)
+        _loggers[name] = logger
+    return logger
+
+
+def configure(level: Optional[int] = None, console: Optional[bool] = None,
+              ring_size: Optional[int] = None):
+    """全ロガーの出力レベル・コンソール出力・リングバッファを設定する"""
+    global _level, _console, _ring
+    if level is not None:
+        _level = level
+        for logger in _loggers.values():
+            logger.set_level(level)
+    if console is not None:
+        _console = console
+    if ring_size is not None:
+        _ring = RingBufferSink(ring_size) if ring_size > 0 else None
+
+
+def configure_from_env():
+    """環境変数 RICE_LOG_LEVEL（debug/info/warning/error/off）と RICE_LOG_RING（件数）で設定"""
+    level = LEVELS_BY_NAME.get(os.environ.get("RICE_LOG_LEVEL", "").lower())
+    ring = os.environ.get("RICE_LOG_RING", "")
+    configure(level=level, ring_size=int(ring) if ring.isdigit() else None)
+
+
+def dump_ring(path: Optional[str] = None) -> Optional[str]:
+    """リングバッファの内容をファイルに書き出し、そのパスを返す"""
+    if _ring is None or not _ring.records:
+        return None
+    if path is None:
+        os.makedirs(user_cache_dir(), exist_ok=True)
+        path = os.path.join(user_cache_dir(), time.strftime("crash_%Y%m%d_%H%M%S.log"))
+    _ring.dump(path)
+    return path
+
+
+def install_crash_dump():
+    """未処理の例外で終了する際にリングバッファを書き出す"""
+    previous_hook = sys.excepthook
+
+    def hook(exc_type, exc, tb):
+        try:
+            path = dump_ring()
+            if path:
+                print(f"直近のログを書き出しました: {path}", file=sys.stderr)
+        except OSError:
+            pass
+        previous_hook(exc_type, exc, tb)
+
+    sys.excepthook = hook
+
+
+configure_from_env()
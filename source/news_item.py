@@ -1,33 +1,54 @@
 import csv
 import os
-from typing import List
+from typing import List, Tuple
+
+from source.log import get_logger
+
+log = get_logger("news_item")
 
 
 class NewsItem:
+    __slots__ = ("name", "content", "news_id", "category")
+
     @classmethod
     def load_from_csv(cls, file_path: str) -> List['NewsItem']:
         """CSVファイルからニュース項目を読み込み、NewsItemのリストを生成する"""
-        news_items = []
         if not os.path.exists(file_path):
-            print(f"警告: {file_path}が見つかりません。ニュース機能は無効になります。")
-            return news_items
+            log.warning("%sが見つかりません。ニュース機能は無効になります。", file_path)
+            return []
+
+        news_items = [cls(name, content, news_id, category)
+                      for news_id, category, name, content in cls.read_rows(file_path)]
+        log.info("ニュース項目を%d件読み込みました。", len(news_items))
+        return news_items
+
+    @staticmethod
+    def read_rows(file_path: str, strict: bool = False) -> List[Tuple[str, str, str, str]]:
+        """CSVを (ID, カテゴリ, 名前, 本文) の行として読み込む
 
+        strict が True の場合は読み込みエラーを呼び出し側に送出する。
+        """
+        rows = []
         try:
             with open(file_path, 'r', encoding='utf-8') as file:
                 csv_reader = csv.reader(file)
-                next(csv_reader, None)  # ヘッダー行をスキップ
-
-                for row in csv_reader:
+                for line_number, row in enumerate(csv_reader):
+                    # 1行目がヘッダー行（IDが数字でない）の場合はスキップ
+                    if line_number == 0 and row and not row[0].strip().isdigit():
+                        continue
                     if len(row) >= 4:
                         name, content = row[2].strip(), row[3].strip()
                         if name and content:
-                            news_items.append(cls(name, content))
-            print(f"ニュース項目を{len(news_items)}件読み込みました。")
+                            rows.append((row[0].strip(), row[1].strip(), name, content))
         except Exception as e:
-            print(f"news.csvの読み込み中にエラーが発生しました: {e}")
+            if strict:
+                raise
+            log.error("news.csvの読み込み中にエラーが発生しました: %s", e)
 
-        return news_items
+        return rows
 
-    def __init__(self, name: str, content: str):
+    def __init__(self, name: str, content: str, news_id: str = "", category: str = ""):
         self.name = name
         self.content = content
+        self.news_id = news_id
+        self.category = category
@@ -0,0 +1,170 @@
+import hashlib
+import marshal
+import os
+import random
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from source.cache_paths import user_cache_dir
+from source.news_item import NewsItem
+from source.log import get_logger
+
+log = get_logger("news_store")
+
+CACHE_VERSION = 1
+
+# 価格の動き（上昇・下落・横ばい）と季節ごとのカテゴリの重み
+PRICE_MOVES = ("up", "down", "flat")
+SEASONS = ("spring", "summer", "autumn", "winter")
+CATEGORY_WEIGHTS = {
+    # 不作のニュースは価格上昇時に、豊作のニュースは価格下落時や秋に出やすい
+    "不作": {"up": 3.0, "down": 0.5, "flat": 1.0},
+    "豊作": {"up": 0.5, "down": 3.0, "flat": 1.0},
+}
+SEASON_WEIGHTS = {
+    ("豊作", "autumn"): 2.0,
+    ("不作", "summer"): 1.5,
+}
+
+
+def price_move(price_change: int) -> str:
+    if price_change > 0:
+        return "up"
+    if price_change < 0:
+        return "down"
+    return "flat"
+
+
+class AliasTable:
+    """Walker/Vose のエイリアス法による重み付きサンプリング（1回 O(1)）"""
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        self.size = n
+        self.probability = array('d', [0.0] * n)
+        self.alias = array('I', [0] * n)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            self.size = 0
+            return
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.probability[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def sample(self, rng) -> int:
+        column = int(rng.random() * self.size)
+        if rng.random() < self.probability[column]:
+            return column
+        return self.alias[column]
+
+
+class NewsStore:
+    """news.csv を一度だけ読み込み、カテゴリ・タグ別の索引と重み付き抽選を提供する
+
+    CSVの列: A=ID, B=カテゴリ（豊作/不作/普通など）, C=タグ（話題/災害など・見出しに使用）, D=本文
+    """
+
+    def __init__(self, items: List[NewsItem]):
+        self.items = items
+        self.by_category: Dict[str, array] = {}
+        self.by_tag: Dict[str, array] = {}
+        for index, item in enumerate(items):
+            self.by_category.setdefault(item.category, array('I')).append(index)
+            self.by_tag.setdefault(item.name, array('I')).append(index)
+
+        # 価格の動きと季節の組み合わせごとにエイリアス表を事前計算
+        self._tables: Dict[tuple, AliasTable] = {}
+        for move in PRICE_MOVES:
+            for season in SEASONS:
+                weights = [self.weight(item, move, season) for item in items]
+                self._tables[(move, season)] = AliasTable(weights)
+        self._uniform = AliasTable([1.0] * len(items))
+
+    @staticmethod
+    def weight(item: NewsItem, move: str, season: str) -> float:
+        weight = CATEGORY_WEIGHTS.get(item.category, {}).get(move, 1.0)
+        return weight * SEASON_WEIGHTS.get((item.category, season), 1.0)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index: int) -> NewsItem:
+        return self.items[index]
+
+    def sample(self, rng=random, price_change: Optional[int] = None,
+               season: Optional[str] = None) -> Optional[NewsItem]:
+        """価格の動きと季節に合ったニュースを重み付きで1件選ぶ（指定が無ければ一様）"""
+        if not self.items:
+            return None
+        if price_change is None or season is None:
+            table = self._uniform
+        else:
+            table = self._tables[(price_move(price_change), season)]
+        return self.items[table.sample(rng)]
+
+    def in_category(self, category: str) -> List[NewsItem]:
+        return [self.items[i] for i in self.by_category.get(category, ())]
+
+    def with_tag(self, tag: str) -> List[NewsItem]:
+        return [self.items[i] for i in self.by_tag.get(tag, ())]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> 'NewsStore':
+        return cls([NewsItem(name, content, news_id, category)
+                    for news_id, category, name, content in rows])
+
+    @classmethod
+    def load(cls, file_path: str, cache_dir: Optional[str] = None, strict: bool = False) -> 'NewsStore':
+        """CSVを読み込む。更新日時とサイズが同じなら解析済みのバイナリキャッシュを使う"""
+        if not os.path.exists(file_path):
+            log.warning("%sが見つかりません。ニュース機能は無効になります。", file_path)
+            return cls([])
+
+        stat = os.stat(file_path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cache_path = cls.cache_path(file_path, cache_dir)
+        rows = cls._read_cache(cache_path, stamp)
+        if rows is None:
+            rows = NewsItem.read_rows(file_path, strict=strict)
+            cls._write_cache(cache_path, stamp, rows)
+            log.info("ニュース項目を%d件読み込みました。", len(rows))
+        return cls.from_rows(rows)
+
+    @staticmethod
+    def cache_path(file_path: str, cache_dir: Optional[str] = None) -> str:
+        digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(cache_dir or user_cache_dir(), f"news_{digest}.bin")
+
+    @staticmethod
+    def _read_cache(cache_path: str, stamp: tuple) -> Optional[list]:
+        try:
+            with open(cache_path, 'rb') as f:
+                version, cached_stamp, rows = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != CACHE_VERSION or tuple(cached_stamp) != stamp:
+            return None
+        return rows
+
+    @staticmethod
+    def _write_cache(cache_path: str, stamp: tuple, rows: list):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = cache_path + ".tmp"
+            with open(temp_path, 'wb') as f:
+                marshal.dump((CACHE_VERSION, stamp, rows), f)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            log.warning("ニュースキャッシュの保存に失敗しました: %s, %s", cache_path, e)
@@ -0,0 +1,110 @@
+from typing import Optional, Tuple
+
+import pygame
+
+from source.price_history import PriceHistory, RollingStats
+
+PRICE_MIN = 200  # RiceSimulation の価格範囲
+PRICE_MAX = 800
+
+SEASON_COLORS = {
+    'spring': (56, 32, 48),
+    'summer': (24, 48, 24),
+    'autumn': (56, 40, 16),
+    'winter': (24, 32, 56),
+}
+LINE_COLOR = (0, 168, 0)
+AVERAGE_COLOR = (252, 252, 6)
+NEWS_COLOR = (248, 56, 0)
+MAX_COLOR = (248, 120, 88)
+MIN_COLOR = (88, 152, 248)
+BORDER_COLOR = (255, 255, 255)
+
+
+class PriceChart:
+    """価格履歴の折れ線グラフ
+
+    グラフ本体はキャッシュしたSurfaceに描き、1か月ごとに column_width だけ左へ
+    スクロールして新しい区間だけを描き足す。表示範囲の最高値・最安値と移動平均は
+    RollingStats で1か月ごとに更新する。
+    """
+
+    def __init__(self, history: PriceHistory, size: Tuple[int, int],
+                 column_width: int = 3, average_window: int = 12):
+        self.history = history
+        self.column_width = column_width
+        self.columns = size[0] // column_width
+        # 幅は列幅の倍数にそろえる（端数の列にスクロールしきれない線が残らないように）
+        self.width, self.height = self.columns * column_width, size[1]
+        self.surface = pygame.Surface((self.width, self.height))
+        self.visible = RollingStats(self.columns)
+        self.average = RollingStats(average_window)
+        self.drawn = 0  # 描画済みの履歴の通し番号（history.total と比較する）
+        self.generation = history.generation  # 描画済みの履歴の世代（消去されたら描き直す）
+        self._last_point: Optional[Tuple[int, int]] = None
+        self._last_average: Optional[int] = None
+        self.surface.fill((0, 0, 0))
+
+    def price_y(self, price: float) -> int:
+        ratio = (min(max(price, PRICE_MIN), PRICE_MAX) - PRICE_MIN) / (PRICE_MAX - PRICE_MIN)
+        return int(round((self.height - 2) * (1.0 - ratio))) + 1
+
+    def reset(self):
+        """履歴から描き直す（履歴を消去した場合など）"""
+        self.surface.fill((0, 0, 0))
+        self.visible.clear()
+        self.average.clear()
+        self._last_point = None
+        self._last_average = None
+        self.generation = self.history.generation
+        # 表示範囲と移動平均の計算に必要な分だけ遡る
+        self.drawn = max(0, self.history.total - len(self.history),
+                         self.history.total - self.columns - self.average.window)
+
+    def update(self) -> bool:
+        """追加された月の分だけグラフを進める（変化があれば True）"""
+        history = self.history
+        if history.generation != self.generation or history.total < self.drawn:
+            # 履歴が消去された（再生中の移動や保存した状態の復元）ので、残っている列ごと描き直す
+            self.reset()
+            if history.total == self.drawn:
+                return True
+        if history.total == self.drawn:
+            return False
+        if history.total - self.drawn > self.columns + self.average.window:
+            self.reset()
+        while self.drawn < history.total:
+            self._push(history[self.drawn - history.total])
+            self.drawn += 1
+        return True
+
+    def _push(self, record):
+        width = self.column_width
+        right = self.width - 1
+        self.surface.scroll(-width, 0)
+        self.surface.fill(SEASON_COLORS[record.season], (self.width - width, 0, width, self.height))
+
+        self.visible.push(record.price)
+        self.average.push(record.price)
+        point = (right, self.price_y(record.price))
+        average = self.price_y(self.average.mean)
+        if self._last_point is not None:
+            previous = (self._last_point[0] - width, self._last_point[1])
+            pygame.draw.line(self.surface, AVERAGE_COLOR, (previous[0], self._last_average), (right, average))
+            pygame.draw.line(self.surface, LINE_COLOR, previous, point, 2)
+        if record.news:
+            pygame.draw.circle(self.surface, NEWS_COLOR, point, 2)
+        self._last_point = point
+        self._last_average = average
+
+    def draw(self, target: pygame.Surface, position: Tuple[int, int]) -> pygame.Rect:
+        """グラフと最高値・最安値の線を target に描く"""
+        self.update()
+        rect = target.blit(self.surface, position)
+        if self.visible.count:
+            for price, color in ((self.visible.maximum, MAX_COLOR), (self.visible.minimum, MIN_COLOR)):
+                y = rect.top + self.price_y(price)
+                pygame.draw.line(target, color, (rect.left, y), (rect.left + 6, y))
+                pygame.draw.line(target, color, (rect.right - 7, y), (rect.right - 1, y))
+        pygame.draw.rect(target, BORDER_COLOR, rect.inflate(2, 2), 1)
+        return rect
@@ -0,0 +1,112 @@
+from array import array
+from collections import deque
+from typing import Deque, NamedTuple, Tuple
+
+from source.news_store import SEASONS
+
+
+class PriceRecord(NamedTuple):
+    month: int
+    price: int
+    season: str
+    news: bool
+
+
+class PriceHistory:
+    """月ごとの価格の履歴（容量固定のリングバッファ）
+
+    月・価格・季節・ニュースの有無を列ごとの配列に持ち、追加は O(1)、
+    何年動かしてもメモリ使用量は capacity で決まる量から増えない。
+    """
+
+    def __init__(self, capacity: int = 1200):
+        self.capacity = capacity
+        self.months = array('B', bytes(capacity))
+        self.prices = array('i', bytes(4 * capacity))
+        self.seasons = array('B', bytes(capacity))  # SEASONS のインデックス
+        self.news = array('B', bytes(capacity))
+        self.total = 0  # これまでに追加した件数（容量を超えて古い記録が消えても増え続ける）
+        self.generation = 0  # clear() のたびに増える（グラフなどが描き直しを判断する）
+
+    def append(self, month: int, price: int, season: str, news: bool = False):
+        i = self.total % self.capacity
+        self.months[i] = month
+        self.prices[i] = price
+        self.seasons[i] = SEASONS.index(season)
+        self.news[i] = 1 if news else 0
+        self.total += 1
+
+    def clear(self):
+        self.total = 0
+        self.generation += 1
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def _slot(self, index: int) -> int:
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("price history index out of range")
+        return (self.total - count + index) % self.capacity
+
+    def __getitem__(self, index: int) -> PriceRecord:
+        """古い順のインデックス（負数なら新しい方から）で記録を返す"""
+        i = self._slot(index)
+        return PriceRecord(self.months[i], self.prices[i], SEASONS[self.seasons[i]], bool(self.news[i]))
+
+    def price_at(self, serial: int) -> int:
+        """追加した通し番号（0始まり、total 未満）の価格"""
+        return self.prices[serial % self.capacity]
+
+
+class RollingStats:
+    """直近 window 件の最小・最大・平均を1件ごとに O(1)（償却）で更新する"""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.total = 0
+        self._values: Deque[int] = deque()
+        self._min: Deque[Tuple[int, int]] = deque()  # (通し番号, 値) 値は単調増加
+        self._max: Deque[Tuple[int, int]] = deque()  # (通し番号, 値) 値は単調減少
+
+    def push(self, value: int):
+        serial = self.count
+        self.count += 1
+        self._values.append(value)
+        self.total += value
+        if len(self._values) > self.window:
+            self.total -= self._values.popleft()
+
+        oldest = serial - self.window
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((serial, value))
+        if self._min[0][0] <= oldest:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((serial, value))
+        if self._max[0][0] <= oldest:
+            self._max.popleft()
+
+    def clear(self):
+        self.count = 0
+        self.total = 0
+        self._values.clear()
+        self._min.clear()
+        self._max.clear()
+
+    @property
+    def minimum(self) -> int:
+        return self._min[0][1]
+
+    @property
+    def maximum(self) -> int:
+        return self._max[0][1]
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self._values)
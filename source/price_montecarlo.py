@@ -0,0 +1,185 @@
+import argparse
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from source.character import Character
+from source.news_item import NewsItem
+from source.simulation import SEASON_PRICE_FACTORS, RiceSimulation, get_season
+
+MIN_PRICE = 200
+MAX_PRICE = 800
+INITIAL_PRICE = 400
+INITIAL_MONTH = 1
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# advance_month の各月の季節係数（1月〜12月）
+_MONTH_FACTORS = np.array([SEASON_PRICE_FACTORS[get_season(m)] for m in range(1, 13)])
+
+# 乱数は毎月「基本変動・季節変動・ニュース確率・ニュース判定」の順に全経路分まとめて引く。
+# 範囲は RiceSimulation.advance_month が rng.randint(a, b) に渡す両端を含む範囲と同じ。
+_DRAWS = ((-100, 100), (-50, 50), (10, 36), (1, 100))
+_DRAW_DTYPE = np.int32
+
+
+def _draw_month(rng: np.random.Generator, n_paths: int) -> Tuple[np.ndarray, ...]:
+    return tuple(rng.integers(low, high + 1, size=n_paths, dtype=_DRAW_DTYPE) for low, high in _DRAWS)
+
+
+def _month_after(step: int) -> int:
+    """step 回目の advance_month 後の月 (1-12)"""
+    return (INITIAL_MONTH + step) % 12 + 1
+
+
+class MonteCarloResult:
+    """モンテカルロ実行の集計結果"""
+
+    def __init__(self, n_paths: int, months: int, histograms: np.ndarray, news_count: int):
+        self.n_paths = n_paths
+        self.months = months
+        # histograms[m, p - MIN_PRICE] = m+1ヶ月目に価格pだった経路数
+        self.histograms = histograms
+        self.news_count = news_count
+
+    def percentile_bands(self, percentiles: Sequence[float] = PERCENTILES) -> Dict[float, np.ndarray]:
+        """月ごとの価格パーセンタイル（キー: パーセンタイル、値: 月数分の配列）"""
+        cumulative = np.cumsum(self.histograms, axis=1)
+        bands = {}
+        for q in percentiles:
+            rank = np.ceil(q / 100 * self.n_paths).clip(1, self.n_paths)
+            bands[q] = MIN_PRICE + np.argmax(cumulative >= rank, axis=1)
+        return bands
+
+    def tier_fractions(self, thresholds: Sequence[int]) -> List[float]:
+        """価格帯ごとの滞在時間の割合（thresholds は Character.thresholds と同じく昇順の上限価格）"""
+        total = self.histograms.sum(axis=0)
+        edges = [MIN_PRICE] + [min(max(t, MIN_PRICE), MAX_PRICE + 1) for t in thresholds] + [MAX_PRICE + 1]
+        grand_total = total.sum()
+        return [total[lo - MIN_PRICE:hi - MIN_PRICE].sum() / grand_total
+                for lo, hi in zip(edges, edges[1:])]
+
+    @property
+    def news_frequency(self) -> float:
+        """月あたりのニュース発生確率"""
+        return self.news_count / (self.n_paths * self.months)
+
+
+def simulate(n_paths: int, months: int, seed: Optional[int] = None,
+             initial_price: int = INITIAL_PRICE) -> MonteCarloResult:
+    """advance_month の価格モデルを全経路まとめてNumPyで計算"""
+    rng = np.random.default_rng(seed)
+    prices = np.full(n_paths, initial_price, dtype=np.int64)
+    histograms = np.zeros((months, MAX_PRICE - MIN_PRICE + 1), dtype=np.int64)
+    news_count = 0
+
+    for step in range(months):
+        factor = _MONTH_FACTORS[_month_after(step) - 1]
+        base, seasonal, probability, roll = _draw_month(rng, n_paths)
+        prices += (base + factor * seasonal).astype(np.int64)  # int() と同じく0方向へ切り捨て
+        np.clip(prices, MIN_PRICE, MAX_PRICE, out=prices)
+        histograms[step] = np.bincount(prices - MIN_PRICE, minlength=MAX_PRICE - MIN_PRICE + 1)
+        news_count += int(np.count_nonzero(roll <= probability))
+
+    return MonteCarloResult(n_paths, months, histograms, news_count)
+
+
+class _ReplayRandom:
+    """NumPy で引いた値を RiceSimulation の rng.randint の呼び出しに順番に返す乱数生成器
+
+    呼び出しの範囲が _DRAWS の順序と食い違えば ValueError にする（ゲームのモデルが
+    乱数の引き方を変えたことを検出するため）。価格に関係しない choice・random は固定値を返す。
+    """
+
+    def __init__(self):
+        self.values: List[int] = []
+        self.position = 0
+
+    def load(self, values: List[int]):
+        self.values = values
+        self.position = 0
+
+    def randint(self, a: int, b: int) -> int:
+        if self.position >= len(self.values) or _DRAWS[self.position] != (a, b):
+            raise ValueError(f"乱数の引き方がNumPy版と一致しません: {self.position}回目 randint({a}, {b})")
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    def choice(self, seq):
+        return seq[0]
+
+    def random(self) -> float:
+        return 0.0
+
+
+def simulate_scalar(n_paths: int, months: int, seed: Optional[int] = None,
+                    initial_price: int = INITIAL_PRICE) -> MonteCarloResult:
+    """経路ごと・月ごとに RiceSimulation.advance_month を呼ぶ参照実装
+
+    simulate と同じ乱数列を _ReplayRandom でゲームのモデルに渡すため、同じシードなら
+    simulate と同じ結果になる。ゲームの価格モデルが変わればこちらの結果だけが変わる。
+    """
+    rng = np.random.default_rng(seed)
+    replay = _ReplayRandom()
+    character = Character.create_from_config("housewife", "housewife", "housewife")
+    simulation = RiceSimulation([character], [NewsItem("参照", "参照", "0", "普通")], rng=replay,
+                                clock=lambda: 0.0)
+    prices = [initial_price] * n_paths
+    histograms = np.zeros((months, MAX_PRICE - MIN_PRICE + 1), dtype=np.int64)
+    news_count = 0
+
+    month = INITIAL_MONTH
+    for step in range(months):
+        draws = [a.tolist() for a in _draw_month(rng, n_paths)]
+        for i in range(n_paths):
+            replay.load([column[i] for column in draws])
+            simulation.current_month = month
+            simulation.rice_price = prices[i]
+            simulation.showing_news = False
+            simulation.advance_month(0)
+            if replay.position != len(_DRAWS):
+                raise ValueError(f"乱数の引き方がNumPy版と一致しません: 1か月に{replay.position}回")
+            price = simulation.rice_price
+            prices[i] = price
+            histograms[step, price - MIN_PRICE] += 1
+            if simulation.showing_news:
+                news_count += 1
+        month = simulation.current_month
+
+    return MonteCarloResult(n_paths, months, histograms, news_count)
+
+
+def load_tier_thresholds() -> Dict[str, List[int]]:
+    """assets/messages/*.json の価格帯しきい値（昇順）を役割ごとに読み込む"""
+    thresholds = {}
+    for role_id in ("housewife", "farmer", "politician"):
+        thresholds[role_id] = Character.create_from_config(role_id, role_id, role_id).thresholds
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="米価格モデルのモンテカルロ分析")
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = simulate(args.paths, args.months, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.paths}経路 x {args.months}ヶ月を{elapsed:.2f}秒で計算しました")
+
+    bands = result.percentile_bands()
+    print("月 " + " ".join(f"p{q:>3}" for q in bands))
+    for month in range(args.months):
+        print(f"{month + 1:>3} " + " ".join(f"{bands[q][month]:>4}" for q in bands))
+
+    for role_id, thresholds in load_tier_thresholds().items():
+        fractions = " / ".join(f"{fraction:.1%}" for fraction in result.tier_fractions(thresholds))
+        print(f"{role_id}: {fractions}（価格帯 {thresholds} 区切り）")
+    print(f"ニュース発生頻度: {result.news_frequency:.2%}/月")
+
+
+if __name__ == "__main__":
+    main()
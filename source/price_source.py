@@ -0,0 +1,203 @@
+import csv
+import errno
+import io
+import json
+import os
+import queue
+import threading
+import urllib.request
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from source.log import get_logger
+
+log = get_logger("price_source")
+
+_END = object()  # 先読みキューの終端
+
+
+class PricePoint(NamedTuple):
+    label: str  # 年月など（データにあれば）
+    price: int
+
+
+class PriceSource:
+    """RiceSimulation.advance_month が毎月の価格を取り出す価格ソース
+
+    next_price はメインスレッドから呼ばれるため、I/O で待たせてはならない。
+    価格を用意できない月は None を返し、シミュレーションは乱数モデルで代替する。
+    """
+
+    def next_price(self, simulation) -> Optional[int]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RandomWalkPriceSource(PriceSource):
+    """従来の乱数による価格変動（季節係数付きのランダムウォーク）"""
+
+    def next_price(self, simulation) -> int:
+        season_factor = simulation.get_season_price_factor()
+        base_change = simulation.rng.randint(-100, 100)
+        seasonal_change = season_factor * simulation.rng.randint(-50, 50)
+        return simulation.rice_price + int(base_change + seasonal_change)
+
+
+def parse_csv_lines(lines: Iterable[str]) -> Iterator[PricePoint]:
+    """CSVの行を1行ずつ価格に変換する
+
+    ヘッダー行があれば price/価格 列と month/date/年月 列を使い、無ければ
+    先頭列を年月、最後の列を価格とみなす。数値にならない行（inf なども）は読み飛ばす。
+    """
+    reader = csv.reader(lines)
+    label_column, price_column = 0, -1
+    for row in reader:
+        if not row:
+            continue
+        try:
+            cell = row[price_column]
+            price = int(cell) if cell.isdigit() else int(float(cell))
+        except (ValueError, OverflowError, IndexError):
+            names = [name.strip().lower() for name in row]
+            for i, name in enumerate(names):
+                if name in ("price", "価格", "米価格"):
+                    price_column = i
+                elif name in ("month", "date", "年月", "月"):
+                    label_column = i
+            continue
+        yield PricePoint(row[label_column] if len(row) > 1 else "", price)
+
+
+def parse_jsonl_lines(lines: Iterable[str]) -> Iterator[PricePoint]:
+    """JSON Lines（1行1オブジェクト、{"month": ..., "price": ...}）を1行ずつ価格に変換する"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            price = int(float(record["price"]))
+        except (ValueError, OverflowError, KeyError, TypeError):
+            continue
+        yield PricePoint(str(record.get("month", record.get("date", ""))), price)
+
+
+def iter_file_prices(path: str) -> Iterator[PricePoint]:
+    """CSV/JSONLファイルを先頭から遅延して読み、価格を順に返す（拡張子で形式を判断）"""
+    parse = parse_jsonl_lines if path.lower().endswith((".jsonl", ".ndjson")) else parse_csv_lines
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        yield from parse(f)
+
+
+def iter_http_prices(url: str, timeout: float = 10.0) -> Iterator[PricePoint]:
+    """HTTPの応答（CSV または JSON Lines）を受信しながら価格を順に返す"""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        lines = io.TextIOWrapper(response, encoding='utf-8', newline='')
+        content_type = response.headers.get("Content-Type", "")
+        if "json" in content_type or url.lower().endswith((".jsonl", ".ndjson")):
+            yield from parse_jsonl_lines(lines)
+        else:
+            yield from parse_csv_lines(lines)
+
+
+class StreamPriceSource(PriceSource):
+    """価格の系列をバックグラウンドで読み、容量付きのキューに先読みしておく価格ソース
+
+    読み込みスレッドはキューが一杯になると待つため、巨大なファイルでも
+    メモリ使用量は prefetch 件分に収まる。next_price はキューを覗くだけで待たない
+    （block=True は画面の無い実行用で、届くまで待つ）。
+
+    キューの受け渡しは chunk 件ずつまとめて行う。ただし取り出し側が待っている
+    （キューが空の）ときは、届いた分をすぐに渡す。
+    """
+
+    def __init__(self, points: Iterable[PricePoint], prefetch: int = 256, name: str = "",
+                 block: bool = False, chunk: int = 64):
+        self.name = name
+        self.block = block
+        self.chunk = max(1, min(chunk, prefetch))
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(1, prefetch // self.chunk))
+        self._buffer: list = []
+        self._position = 0
+        self.finished = False
+        self.current: Optional[PricePoint] = None
+        self._stop = threading.Event()
+        self._missed = 0
+        self._thread = threading.Thread(target=self._produce, args=(points,),
+                                        name="price-source", daemon=True)
+        self._thread.start()
+
+    def _produce(self, points: Iterable[PricePoint]):
+        batch = []
+        try:
+            for point in points:
+                batch.append(point)
+                if len(batch) >= self.chunk or self.queue.empty():
+                    if not self._put(batch):
+                        return
+                    batch = []
+        except Exception as e:
+            log.error("価格データの読み込みに失敗しました: %s, %s", self.name, e)
+        batch.append(_END)
+        self._put(batch)
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_item(self, block: bool):
+        if self._position >= len(self._buffer):
+            self._buffer = self.queue.get(block=block)
+            self._position = 0
+        item = self._buffer[self._position]
+        self._position += 1
+        if item is _END:
+            self.finished = True
+        return item
+
+    def next_price(self, simulation) -> Optional[int]:
+        if self.finished:
+            return None
+        try:
+            item = self._next_item(self.block)
+        except queue.Empty:
+            # 読み込みが追いついていない月は乱数モデルで代替する
+            self._missed += 1
+            log.warning("価格データが届いていないため乱数で代替します: %s", self.name)
+            return None
+        if item is _END:
+            log.info("価格データの最後まで使いました: %s", self.name)
+            return None
+        self.current = item
+        return item.price
+
+    def __iter__(self) -> Iterator[PricePoint]:
+        """先読みした価格を順に返す（待機あり。画面の無い処理やベンチマーク用）"""
+        while not self.finished:
+            item = self._next_item(True)
+            if item is _END:
+                return
+            yield item
+
+    @property
+    def missed(self) -> int:
+        """価格が届いておらず乱数で代替した月数"""
+        return self._missed
+
+    def close(self):
+        self._stop.set()
+
+
+def open_price_source(spec: str, prefetch: int = 256, block: bool = False) -> StreamPriceSource:
+    """ファイルパスまたは http(s):// のURLから価格ソースを作る"""
+    if spec.startswith(("http://", "https://")):
+        return StreamPriceSource(iter_http_prices(spec), prefetch, name=spec, block=block)
+    if not os.path.exists(spec):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), spec)
+    return StreamPriceSource(iter_file_prices(spec), prefetch, name=spec, block=block)
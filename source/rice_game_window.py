@@ -1,6 +1,4 @@
 import pygame
-import random
-import time
 import os
 import sys
 import csv
@@ -8,8 +6,34 @@ import json
 from typing import Dict, List, Tuple, Optional
 from PIL import Image
 
+from source import asset_bake
 from source.character import Character
 from source.news_item import NewsItem
+from source.news_store import NewsStore
+from source.text_cache import TextCache
+from source.text_layout import GlyphMetrics, TextLayout
+from source.frame_renderer import FrameRenderer
+from source.frame_scheduler import FrameScheduler
+from source.asset_loader import ASSET_LOADED, AssetLoader
+from source.font_manager import FontManager
+from source.audio_engine import AudioEngine
+from source.price_source import open_price_source
+from source.game_clock import TIME_SCALES, GameClock
+from source.hot_reload import AssetWatcher
+from source.display_scaler import DisplayScaler
+from source.price_chart import PriceChart
+from source.price_history import PriceHistory
+from source.character_sprites import (CharacterStage, Frames, decode_sheet, sheet_path, still_frames,
+                                      to_display_frames)
+from source.broadcast_log import BroadcastLog, BroadcastRecorder, ReplaySimulation
+from source.broadcast_server import BroadcastServer
+from source.snapshot import AutoSaver, Snapshot, load_snapshot
+from source.frame_profiler import (DISPLAY_UPDATE, EVENTS, HUD_REFRESH_NS, UPDATE_PRICE,
+                                   UPDATE_TEXT_DISPLAY, FrameProfiler)
+from source.simulation import LINE, MONTH, NEWS, RiceSimulation, SimulationEvent, get_season
+from source.log import get_logger
+
+log = get_logger("rice_game_window")
 
 def resource_path(relative_path):
     """ 実行ファイル (.exe) とソースコードの両方でリソースへのパスを解決する """
@@ -21,18 +45,40 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+# レイアウト座標の基準となる画面サイズ
+DESIGN_WIDTH = 800
+DESIGN_HEIGHT = 600
+
+
 class RiceGameWindow:
-    def __init__(self):
+    def __init__(self, profile: bool = False, native_size: Optional[Tuple[int, int]] = None,
+                 window_size: Optional[Tuple[int, int]] = None, fullscreen: bool = False,
+                 time_scale: float = 1.0):
         pygame.init()
-        self.width = 800
-        self.height = 600
-        self.screen = pygame.display.set_mode((self.width, self.height))
+        # native_size（例: 256x240, 400x300）を指定すると低解像度で描画し、整数倍に拡大して表示する
+        self.display = DisplayScaler(native_size or (DESIGN_WIDTH, DESIGN_HEIGHT), window_size, fullscreen)
+        self.screen = self.display.surface
+        self.width, self.height = self.screen.get_size()
+        # レイアウト座標（800x600基準）から描画先の座標への倍率
+        self.scale_x = self.width / DESIGN_WIDTH
+        self.scale_y = self.height / DESIGN_HEIGHT
+        self.scale = min(self.scale_x, self.scale_y)
         pygame.display.set_caption("ファミコン風米価格アドベンチャー")
 
-        # 日本語フォント設定 - PressStart2Pを優先
-        self.font_large = self.load_japanese_font(40)
-        self.font_medium = self.load_japanese_font(36)
-        self.font_small = self.load_japanese_font(34)
+        # 資源はスレッドプールで並列に読み込み、届くまでは代替表示を使う
+        self.loader = AssetLoader()
+
+        # 起動時の計測値（フォント解決時間など）
+        self.startup_metrics = {}
+
+        # 日本語フォントが届くまではデフォルトフォントを使用
+        self.font_manager = FontManager()
+        self.font_large = pygame.font.Font(None, self.ui_size(40))
+        self.font_medium = pygame.font.Font(None, self.ui_size(36))
+        self.font_small = pygame.font.Font(None, self.ui_size(34))
+
+        # 文字列Surfaceのキャッシュ（毎フレームのfont.renderを避ける）
+        self.text_cache = TextCache()
 
         # 色定義（ファミコン風カラーパレット）
         self.colors = {
@@ -49,34 +95,54 @@ class RiceGameWindow:
         }
 
         # ゲーム状態
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(max_fps=60)
+        # すべてのタイマーが読むゲーム内時計（P: 一時停止、1/2/3: 1倍/10倍/100倍、N: 次の月へ）
+        self.game_clock = GameClock(time_scale)
+        # フェーズ別の処理時間計測（F3でHUD表示、F4でCSV書き出し。無効時は None）
+        self.profiler = FrameProfiler() if profile else None
+        self.profile_export = profile  # 終了時に計測結果を書き出す
         self.running = True
-        self.current_month = 1
-        self.rice_price = 400
-        self.last_update = time.time()
 
         # ニュースシステム
-        self.news_items = NewsItem.load_from_csv(resource_path(os.path.join("assets", "data", "news.csv")))
-        self.showing_news = False
-        self.current_news = None
-        self.news_start_time = 0
-        self.news_duration = 6.0  # ニュース表示時間（4秒）
-        self.character_message_duration = 5.0  # キャラクター会話時間（5秒）
-
-        # キャラクター設定
+        self.news_store = NewsStore([])
+
+        # キャラクター設定（メッセージは読み込み完了後に差し替え）
+        self.character_configs = [
+            ("田中さん", "主婦", "housewife"),
+            ("山田さん", "農家", "farmer"),
+            ("佐藤議員", "政治家", "politician")
+        ]
         self.characters = [
-            Character.create_from_config("田中さん", "主婦", "housewife"),
-            Character.create_from_config("山田さん", "農家", "farmer"),
-            Character.create_from_config("佐藤議員", "政治家", "politician")
+            Character.create_from_config(name, role, role_id, load_messages=False)
+            for name, role, role_id in self.character_configs
         ]
-        self.current_speaker = 0
+
+        # キャラクターのスプライト（待機・口パクのアニメーションと話者ハイライト）
+        self.character_stage = CharacterStage(self.colors['yellow'], self.ui_size(10), self.ui_size(16))
+
+        # 価格・ニュース・話者ローテーションのシミュレーション
+        self.simulation = RiceSimulation(self.characters, self.news_store, clock=self.game_clock.now)
+        self.recorder: Optional[BroadcastRecorder] = None
+        self.broadcaster: Optional[BroadcastServer] = None
+        # 月の切り替わりごとの自動保存と、起動時に再開する状態
+        self.autosaver: Optional[AutoSaver] = None
+        self.resume_snapshot: Optional[Snapshot] = None
+
+        # 価格の履歴とグラフ（テキストウィンドウの右上）
+        self.price_history = PriceHistory()
+        self.price_history.append(self.current_month, self.rice_price, self.get_season(self.current_month))
+        self.chart_rect = self.ui_rect(460, 328, 288, 60)
+        self.price_chart = PriceChart(self.price_history, self.chart_rect.size,
+                                      column_width=self.ui_size(3))
 
         # テキスト表示用
-        self.current_message = ""
         self.display_message = ""
         self.message_index = 0
         self.last_char_time = 0
         self.char_delay = 100  # ミリ秒
+        # 表示中メッセージの折り返し（一文字ずつ追加して確定行を保持）
+        self.glyph_metrics = GlyphMetrics(self.font_small)
+        self.text_layout = TextLayout(self.glyph_metrics, self.ui_x(DESIGN_WIDTH - 140))
 
         # 画像フォルダ
         self.image_folders = {
@@ -89,10 +155,10 @@ class RiceGameWindow:
         # --- Sound Setup ---
         try:
             pygame.mixer.init() # Initialize the mixer module
-            print("Pygame mixer initialized successfully.")
+            log.info("Pygame mixer initialized successfully.")
         except pygame.error as e:
-            print(f"Error initializing pygame mixer: {e}")
-            print("Sound playback will be disabled.")
+            log.error("Error initializing pygame mixer: %s", e)
+            log.warning("Sound playback will be disabled.")
             self.mixer_available = False
         else:
             self.mixer_available = True
@@ -104,7 +170,8 @@ class RiceGameWindow:
             "background_music": resource_path(os.path.join("assets", "sounds", "background_music.mp3")),
             "news_alert": resource_path(os.path.join("assets", "sounds", "news_alert.wav"))  # ニュース開始音
         }
-        self.loaded_sounds = {}
+        # Effects play on reserved per-category channels; music is streamed
+        self.audio = AudioEngine(self.mixer_available)
         self.load_sounds()
         # --- End Sound Setup ---
 
@@ -112,19 +179,148 @@ class RiceGameWindow:
         self.background_images = {}
         self.load_resources()
 
-    def should_show_news(self) -> bool:
-        """ニュースを表示するかどうかを決定（10-36%の確率）"""
-        if not self.news_items:
-            return False
+        # 差分描画レンダラー（静的レイヤーは季節・話者・ニュース状態ごとに合成）
+        self.renderer = FrameRenderer(self)
+
+        self.load_fonts()
+        self.load_game_data()
+
+        # 編集された資源を月の切り替わりで差し替える（run() の開始時に監視を始める）
+        self.watcher = AssetWatcher()
+        self.watch_assets()
+
+    # レイアウト座標（800x600基準）を描画先の座標に変換する
+    def ui_x(self, x: float) -> int:
+        return int(x * self.scale_x)
+
+    def ui_y(self, y: float) -> int:
+        return int(y * self.scale_y)
+
+    def ui_point(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x * self.scale_x), int(y * self.scale_y)
+
+    def ui_rect(self, x: float, y: float, width: float, height: float) -> pygame.Rect:
+        return pygame.Rect(self.ui_x(x), self.ui_y(y), self.ui_x(width), self.ui_y(height))
+
+    def ui_size(self, size: float) -> int:
+        """縦横比を保つ大きさ（フォント・キャラクター画像・線の太さ）"""
+        return max(1, int(size * self.scale))
+
+    def load_fonts(self):
+        """日本語フォントを読み込み"""
+        def load():
+            # 日本語フォント設定 - x12y16pxMaruMonicaを優先
+            return (self.load_japanese_font(self.ui_size(40)),
+                    self.load_japanese_font(self.ui_size(36)),
+                    self.load_japanese_font(self.ui_size(34)))
+        self.loader.submit("fonts", load, self.set_fonts, essential=True)
+
+    def set_fonts(self, fonts):
+        """フォントを差し替え、フォントに依存するキャッシュを作り直す"""
+        self.font_large, self.font_medium, self.font_small = fonts
+        self.startup_metrics["font_resolution_ms"] = self.font_manager.resolve_time * 1000
+        self.startup_metrics["font_cache_hit"] = self.font_manager.cache_hit
+        self.text_cache.clear()
+        self.glyph_metrics = GlyphMetrics(self.font_small)
+        self.text_layout = TextLayout(self.glyph_metrics, self.ui_x(DESIGN_WIDTH - 140))
+        self.text_layout.set_text(self.display_message)
+        self.renderer.invalidate()
+
+    def load_game_data(self):
+        """ニュースとキャラクターのメッセージを読み込み"""
+        news_path = resource_path(os.path.join("assets", "data", "news.csv"))
+        self.loader.submit("news.csv", lambda: NewsStore.load(news_path),
+                           self.set_news_store, essential=True)
+
+        # パックファイルがあれば全キャラクターをまとめて読み込む
+        pack_path = resource_path(os.path.join('assets', 'messages', 'characters.json'))
+        if os.path.exists(pack_path):
+            self.loader.submit("characters.json", lambda: Character.load_pack(pack_path),
+                               self.set_cast, essential=True)
+            return
 
-        probability = random.randint(10, 36)
-        return random.randint(1, 100) <= probability
+        for char, (_, _, role_id) in zip(self.characters, self.character_configs):
+            def set_messages(messages, char=char):
+                char.messages = messages
+            self.loader.submit(f"{role_id}.json",
+                               lambda role_id=role_id: Character.load_messages(role_id),
+                               set_messages, essential=True)
 
-    def select_random_news(self) -> Optional[NewsItem]:
-        """ランダムなニュース項目を選択"""
-        if not self.news_items:
-            return None
-        return random.choice(self.news_items)
+    def set_cast(self, characters: List[Character]):
+        """パックから読み込んだキャラクターに差し替える"""
+        if not characters:
+            return
+        # simulation と同じリストを共有しているため中身だけを入れ替える
+        self.characters[:] = characters
+        self.simulation.current_speaker %= len(characters)
+        for char in characters:
+            self.load_character_image(char)
+        self.renderer.invalidate()
+        # 増えた・入れ替わったキャラクターの画像も監視する
+        self.watch_character_images()
+
+    def watch_assets(self):
+        """ニュース・メッセージ・画像の更新を監視する"""
+        news_path = resource_path(os.path.join("assets", "data", "news.csv"))
+        self.watcher.watch(news_path, lambda: self.reload_news(news_path), self.set_news_store)
+
+        pack_path = resource_path(os.path.join('assets', 'messages', 'characters.json'))
+        if os.path.exists(pack_path):
+            self.watcher.watch(pack_path, lambda: Character.load_pack(pack_path), self.set_cast)
+        else:
+            for char, (_, _, role_id) in zip(self.characters, self.character_configs):
+                def set_messages(messages, char=char):
+                    char.messages = messages
+                self.watcher.watch(Character.message_path(role_id),
+                                   lambda role_id=role_id: Character.load_messages(role_id, strict=True),
+                                   set_messages)
+
+        self.watch_character_images()
+
+        for season in ('spring', 'summer', 'autumn', 'winter'):
+            bg_path = os.path.join(self.image_folders['backgrounds'], f"{season}.png")
+            def set_background(surface, season=season):
+                self.background_images[season] = asset_bake.to_display_format(surface)
+                self.renderer.invalidate()
+            self.watcher.watch(bg_path,
+                               lambda path=bg_path: asset_bake.decode_image(path, (self.width, self.height)),
+                               set_background)
+
+    def watch_character_images(self):
+        """今のキャラクターの画像とスプライトシートを監視する（キャストが入れ替わるたびに作り直す）"""
+        entries = []
+        for char in self.characters:
+            def set_character_image(surface, image_path=char.image_path):
+                # 差し替え時点のキャラクター（パックの再読み込み後も同じ画像パス）に反映
+                for current in self.characters:
+                    if current.image_path == image_path:
+                        current.image = asset_bake.to_display_format(surface)
+                self.renderer.invalidate()
+            entries.append((char.image_path,
+                            lambda path=char.image_path: asset_bake.decode_image(path, self.character_size()),
+                            set_character_image))
+
+            def set_character_frames(frames, image_path=char.image_path):
+                for current in self.characters:
+                    if current.image_path == image_path:
+                        current.frames = to_display_frames(frames)
+                self.renderer.invalidate()
+            entries.append((sheet_path(char.image_path),
+                            lambda path=sheet_path(char.image_path): decode_sheet(path, self.character_size()),
+                            set_character_frames))
+        self.watcher.replace_group("characters", entries)
+
+    @staticmethod
+    def reload_news(news_path: str) -> NewsStore:
+        """news.csv を厳密に読み直す（読めない・1件も無い場合は例外）"""
+        news_store = NewsStore.load(news_path, strict=True)
+        if not news_store:
+            raise ValueError("ニュース項目がありません")
+        return news_store
+
+    def set_news_store(self, news_store: NewsStore):
+        self.news_store = news_store
+        self.simulation.news_items = news_store
 
     def load_sounds(self):
         """Loads sound files into the mixer."""
@@ -133,30 +329,20 @@ class RiceGameWindow:
 
         for name, path in self.sound_files.items():
             if os.path.exists(path):
-                try:
-                    if name == "background_music":
-                        # For background music, we'll load it directly in play_background_music
-                        pass
-                    else:
-                        self.loaded_sounds[name] = pygame.mixer.Sound(path)
-                        print(f"Loaded sound: {name} from {path}")
-                except pygame.error as e:
-                    print(f"Error loading sound file {path}: {e}")
+                if name == "background_music":
+                    # For background music, we'll load it directly in play_background_music
+                    continue
+
+                def set_sound(sound, name=name, path=path):
+                    self.audio.add_sound(name, sound)
+                    log.debug("Loaded sound: %s from %s", name, path)
+                self.loader.submit(f"sound:{name}", lambda path=path: pygame.mixer.Sound(path), set_sound)
             else:
-                print(f"Sound file not found: {path}")
+                log.warning("Sound file not found: %s", path)
 
     def play_sound_effect(self, sound_name: str):
         """Plays a sound effect if the mixer is available and the sound is loaded."""
-        if not self.mixer_available:
-            return
-
-        if sound_name in self.loaded_sounds:
-            try:
-                self.loaded_sounds[sound_name].play()
-            except pygame.error as e:
-                print(f"Error playing sound effect '{sound_name}': {e}")
-        else:
-            print(f"Sound effect '{sound_name}' not found or not loaded.")
+        self.audio.play(sound_name)
 
     def play_background_music(self):
         """Plays the background music, looping indefinitely, if mixer is available."""
@@ -165,20 +351,13 @@ class RiceGameWindow:
 
         music_path = self.sound_files.get("background_music")
         if music_path and os.path.exists(music_path):
-            try:
-                pygame.mixer.music.load(music_path)
-                pygame.mixer.music.play(-1) # -1 for infinite loop
-                print(f"Playing background music: {music_path}")
-            except pygame.error as e:
-                print(f"Error playing background music {music_path}: {e}")
+            self.audio.play_music(music_path)
         else:
-            print("Background music file not found or not specified.")
+            log.info("Background music file not found or not specified.")
 
     def stop_background_music(self):
         """Stops the background music if the mixer is available."""
-        if self.mixer_available:
-            pygame.mixer.music.stop()
-            print("Background music stopped.")
+        self.audio.stop_music()
 
     def load_resources(self):
         """リソースを読み込み"""
@@ -188,206 +367,230 @@ class RiceGameWindow:
                 os.makedirs(folder)
 
         # 画像読み込み（存在する場合）
-        try:
-            # キャラクター画像の読み込み
-            for char in self.characters:
-                if os.path.exists(char.image_path):
-                    char.image = pygame.image.load(char.image_path)
-                    char.image = pygame.transform.scale(char.image, (120, 120))
-
-            # 背景画像の読み込み（季節別）
-            seasons = ['spring', 'summer', 'autumn', 'winter']
-            for season in seasons:
-                bg_path = os.path.join(self.image_folders['backgrounds'], f"{season}.png")
-                if os.path.exists(bg_path):
-                    self.background_images[season] = pygame.image.load(bg_path)
-                    self.background_images[season] = pygame.transform.scale(
-                        self.background_images[season], (self.width, self.height)
-                    )
-        except Exception as e:
-            print(f"画像読み込みエラー: {e}")
+        # ベイク済みの画像をワーカーで読み込み、届いたら画面形式に変換して差し替える
+        for char in self.characters:
+            self.load_character_image(char)
+
+        # 背景画像の読み込み（季節別）
+        seasons = ['spring', 'summer', 'autumn', 'winter']
+        for season in seasons:
+            bg_path = os.path.join(self.image_folders['backgrounds'], f"{season}.png")
+            if os.path.exists(bg_path):
+                def set_background(surface, season=season):
+                    self.background_images[season] = asset_bake.to_display_format(surface)
+                    self.renderer.invalidate()
+                self.loader.submit(bg_path,
+                                   lambda path=bg_path: asset_bake.decode_image(path, (self.width, self.height)),
+                                   set_background)
+
+    def load_character_image(self, char: Character):
+        """キャラクター画像（とスプライトシート）をワーカーで読み込み、届いたら差し替える"""
+        if os.path.exists(char.image_path):
+            def set_character_image(surface):
+                char.image = asset_bake.to_display_format(surface)
+                self.renderer.invalidate()
+            self.loader.submit(char.image_path,
+                               lambda: asset_bake.decode_image(char.image_path, self.character_size()),
+                               set_character_image)
+
+        path = sheet_path(char.image_path)
+        if os.path.exists(path):
+            def set_character_frames(frames):
+                char.frames = to_display_frames(frames)
+                self.renderer.invalidate()
+            self.loader.submit(path, lambda: decode_sheet(path, self.character_size()), set_character_frames)
 
     def load_japanese_font(self, size: int):
-        """日本語フォントを読み込み (x12y16pxMaruMonica.ttfを優先)"""
-        font_paths_to_try = [
-            # 優先度1: x12y16pxMaruMonica (ファミコン風) - resource_pathを使用
-            resource_path(os.path.join('assets', 'fonts', 'x12y16pxMaruMonica.ttf')),
-
-            # 優先度2: システムフォント（Windows, macOS, Linux）
-            # Windows
-            "C:/Windows/Fonts/msgothic.ttc",  # MS Gothic
-            "C:/Windows/Fonts/msmincho.ttc",  # MS Mincho
-            "C:/Windows/Fonts/meiryo.ttc",    # Meiryo
-            "C:/Windows/Fonts/NotoSansCJK-Regular.ttc",
-            # macOS
-            "/System/Library/Fonts/Helvetica.ttc",
-            "/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc",
-            # Linux
-            "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
-            "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        ]
-
-        for font_path in font_paths_to_try:
-            try:
-                if os.path.exists(font_path):
-                    print(f"フォントを読み込み中: {font_path}")
-                    return pygame.font.Font(font_path, size)
-            except Exception as e:
-                print(f"フォント '{font_path}' の読み込みに失敗しました: {e}")
-                continue
-
-        # フォールバック: システムフォントから日本語対応フォントを探す
-        try:
-            print("システムフォントから日本語フォントを検索します...")
-            available_fonts = pygame.font.get_fonts()
-            japanese_fonts = [
-                'msgothic', 'msmincho', 'meiryo', 'notosanscjk',
-                'hiraginokakugothicpro', 'hiraginominchopro',
-                'takao', 'ipa', 'vlgothic', 'arial unicode ms'
-            ]
-
-            for jp_font in japanese_fonts:
-                if jp_font in available_fonts:
-                    print(f"システムフォント '{jp_font}' を使用します。")
-                    return pygame.SysFont(jp_font, size)
-
-            print("日本語対応システムフォントが見つかりません。デフォルトフォントを使用します。")
-            return pygame.font.Font(None, size)
-        except Exception as e:
-            print(f"システムフォントの検索中にエラーが発生しました: {e}")
-            print("デフォルトフォントを使用します。")
-            return pygame.font.Font(None, size)
+        """日本語フォントを読み込み (x12y16pxMaruMonica.ttfを優先、解決結果はキャッシュ)"""
+        return self.font_manager.get(size)
 
     def get_season(self, month: int) -> str:
         """月から季節を取得"""
-        if month in [3, 4, 5]:
-            return 'spring'
-        elif month in [6, 7, 8]:
-            return 'summer'
-        elif month in [9, 10, 11]:
-            return 'autumn'
-        else:
-            return 'winter'
+        return get_season(month)
 
     def update_price(self):
-        """価格を更新（タイミング調整版）"""
-        current_time = time.time()
-
-        # ニュース表示中の場合
-        if self.showing_news:
-            if current_time - self.news_start_time >= self.news_duration:
-                # ニュース終了、キャラクター会話に移行
-                self.showing_news = False
-                self.current_news = None
-                self.set_new_message()
-                self.character_start_time = current_time  # キャラクター会話の開始時間を記録
-            return
+        """シミュレーションを進め、発生したイベントを画面・音に反映"""
+        self.apply_simulation_events(self.simulation.update())
 
-        # キャラクター会話中で、ニュースの後の場合
-        if hasattr(self, 'character_start_time') and self.character_start_time > 0:
-            if current_time - self.character_start_time >= self.character_message_duration:
-                # キャラクター会話終了、月を切り替える
-                self.advance_month(current_time)
-                self.character_start_time = 0  # リセット
-            return
+    def set_new_message(self):
+        """新しいメッセージを設定"""
+        self.apply_simulation_events(self.simulation.set_new_message())
 
-        # 通常の月更新タイミング（ニュースがなかった場合）
-        if current_time - self.last_update >= self.character_message_duration:
-            self.advance_month(current_time)
-
-    def advance_month(self, current_time):
-        """月を進める処理"""
-        # 月を進める
-        self.current_month += 1
-        if self.current_month > 12:
-            self.current_month = 1
-
-        # 価格を変動させる（季節要因も考慮）
-        season_factor = self.get_season_price_factor()
-        base_change = random.randint(-100, 100)
-        seasonal_change = season_factor * random.randint(-50, 50)
-
-        self.rice_price += int(base_change + seasonal_change)
-        self.rice_price = max(200, min(800, self.rice_price))  # 価格範囲制限
-
-        # 月変更音
-        self.play_sound_effect("month_change")
-
-        # ニュースを表示するかチェック
-        if self.should_show_news():
-            self.current_news = self.select_random_news()
-            if self.current_news:
-                self.showing_news = True
-                self.news_start_time = current_time
-                self.display_message = ""
-                self.message_index = 0
+    def set_price_source(self, spec: str):
+        """価格を実データ（CSV/JSONLファイルまたはURL）から読む。届かない月は乱数モデルで代替"""
+        try:
+            self.simulation.price_source = open_price_source(spec)
+        except OSError as e:
+            log.error("価格データを開けないため乱数モデルで続けます: %s, %s", spec, e)
+
+    def start_recording(self, path: str):
+        """以降の状態変化を放送ログに記録する"""
+        self.recorder = BroadcastRecorder(path, self.simulation)
+
+    def enable_autosave(self, path: str, resume: bool = True):
+        """月の切り替わりごとに状態を path へ保存する（resume なら保存済みの状態から再開）"""
+        if resume:
+            snapshot = load_snapshot(path)
+            if snapshot is not None:
+                # 状態はすぐに戻し、表示とタイマーは読み込みが終わった run() の開始時に合わせる
+                snapshot.restore(self.simulation, self.price_history)
+                self.resume_snapshot = snapshot
+                log.info("保存した状態から再開します: %s (%d月)", path, snapshot.month)
+        self.autosaver = AutoSaver(path)
+
+    def capture_snapshot(self) -> Snapshot:
+        return Snapshot.capture(self.simulation, self.price_history, self.message_index)
+
+    def resume_display(self, snapshot: Snapshot):
+        """再開した状態のニュースまたはセリフを、タイプ済みの位置から表示する"""
+        snapshot.restore_timers(self.simulation)
+        # 表示し直すだけのイベント（放送ログには保存時までに書いてある）
+        self.apply_simulation_events(self.simulation.display_events(), record=False)
+        self.reveal_all(self.current_text()[:snapshot.typed])
+
+    def start_broadcast(self, host: str, port: int, frames: bool = False):
+        """LAN内の画面へ状態（frames が True なら画面も）を配信する"""
+        self.broadcaster = BroadcastServer(host, port, frames=frames)
+        self.broadcaster.start()
+
+    def broadcast_state(self) -> dict:
+        """配信する状態（月・価格・話者・表示中の文字数・ニュース）"""
+        news = self.current_news if self.showing_news else None
+        return {
+            "month": self.current_month,
+            "price": self.rice_price,
+            "season": self.get_season(self.current_month),
+            "speaker": self.highlighted_speaker(),
+            "speaker_name": "" if news else self.characters[self.highlighted_speaker()].name,
+            "news": {"name": news.name, "content": news.content} if news else None,
+            "line": self.current_text(),
+            "typed": self.message_index,
+            "clock": self.game_clock.label(),
+        }
 
+    def start_replay(self, path: str, month_seq: Optional[int] = None):
+        """放送ログを再生する（month_seq を指定するとその月から）"""
+        if self.simulation.price_source is not None:
+            # 再生中は価格もログから読むため、設定済みの価格ソースは読み込みスレッドごと止める
+            self.simulation.price_source.close()
+            self.simulation.price_source = None
+        self.simulation = ReplaySimulation(self.characters, BroadcastLog(path), clock=self.simulation.clock)
+        if month_seq is not None:
+            self.simulation.seek(month_seq)
+
+    def seek_replay(self, months: int):
+        """再生中に months か月分前後へ移動する"""
+        if isinstance(self.simulation, ReplaySimulation):
+            # 移動前の履歴は続きではないため消去する
+            self.price_history.clear()
+            self.apply_simulation_events(self.simulation.seek(self.simulation.month_seq + months))
+
+    def apply_simulation_events(self, events: List[SimulationEvent], record: bool = True):
+        """シミュレーションのイベントを表示・効果音に反映（record が False なら放送ログには書かない）"""
+        if record and self.recorder is not None:
+            self.recorder.record(events)
+        for event in events:
+            if event.kind == MONTH:
+                # 月変更音
+                self.play_sound_effect("month_change")
+            elif event.kind == NEWS:
+                self.reset_display_message()
                 # ニュースアラート音
                 self.play_sound_effect("news_alert")
-                print(f"ニュースを表示中: {self.current_news.name}")
-            else:
-                # ニュースがない場合は通常のキャラクター会話
-                self.set_new_message()
-                self.last_update = current_time
-        else:
-            # ニュースを表示しない場合は通常のキャラクター会話
-            self.set_new_message()
-            self.last_update = current_time
-
-    def get_season_price_factor(self) -> float:
-        """季節による価格変動係数"""
-        season = self.get_season(self.current_month)
-        factors = {
-            'spring': 0.8,  # 春：やや安定
-            'summer': 1.2,  # 夏：やや高め
-            'autumn': 0.6,  # 秋：収穫期で安め
-            'winter': 1.0   # 冬：通常
-        }
-        return factors.get(season, 1.0)
-
-    def set_new_message(self):
-        """新しいメッセージを設定"""
-        speaker = self.characters[self.current_speaker]
-        self.current_message = speaker.get_message(self.rice_price)
-        self.display_message = ""
-        self.message_index = 0
-
-        # 次の話者に変更
-        self.current_speaker = (self.current_speaker + 1) % len(self.characters)
+                log.debug("ニュースを表示中: %s", event.value.name)
+            elif event.kind == LINE:
+                self.reset_display_message()
+        if events and events[0].kind == MONTH:
+            # 再読み込みした資源は月の切り替わりでまとめて差し替える
+            if self.watcher.pending:
+                self.watcher.apply_pending()
+            self.price_history.append(self.current_month, self.rice_price,
+                                      self.get_season(self.current_month), self.showing_news)
+            if self.autosaver is not None:
+                # 書き込みは保存スレッドで行い、ここでは状態をバイト列にするだけ
+                self.autosaver.save(self.capture_snapshot().to_bytes())
+
+    # 表示側から参照するシミュレーションの状態
+    @property
+    def current_month(self) -> int:
+        return self.simulation.current_month
+
+    @property
+    def rice_price(self) -> int:
+        return self.simulation.rice_price
+
+    @property
+    def showing_news(self) -> bool:
+        return self.simulation.showing_news
+
+    @property
+    def current_news(self) -> Optional[NewsItem]:
+        return self.simulation.current_news
+
+    @property
+    def current_speaker(self) -> int:
+        return self.simulation.current_speaker
+
+    @property
+    def current_message(self) -> str:
+        return self.simulation.current_message
 
     def update_text_display(self):
-        """テキストを一文字ずつ表示"""
-        current_time = pygame.time.get_ticks()
-
+        """テキストを一文字ずつ表示（早送り中は経過時間分をまとめて表示）"""
+        current_time = self.game_clock.now_ms()
+        text = self.current_text()
+        elapsed = current_time - self.last_char_time
+        if self.message_index < len(text) and elapsed > self.char_delay:
+            count = min(max(1, elapsed // (self.char_delay + 1)), len(text) - self.message_index)
+            for _ in range(count):
+                self.reveal_next_char(text)
+            self.last_char_time = current_time
+
+            # テキスト音効果
+            self.play_sound_effect("text_click")
+
+    def current_text(self) -> str:
+        """タイプ表示する全文（ニュース表示中は見出し付きのニュース本文）"""
         if self.showing_news and self.current_news:
-            # ニューステキストの表示
-            full_news_text = f"【{self.current_news.name}】{self.current_news.content}"
-            if (self.message_index < len(full_news_text) and
-                current_time - self.last_char_time > self.char_delay):
-
-                self.display_message += full_news_text[self.message_index]
-                self.message_index += 1
-                self.last_char_time = current_time
-
-                # テキスト音効果
-                self.play_sound_effect("text_click")
-        else:
-            # 通常のキャラクター会話
-            if (self.message_index < len(self.current_message) and
-                current_time - self.last_char_time > self.char_delay):
+            return f"【{self.current_news.name}】{self.current_news.content}"
+        return self.current_message
 
-                self.display_message += self.current_message[self.message_index]
-                self.message_index += 1
-                self.last_char_time = current_time
+    def render_text(self, font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """テキストをキャッシュ経由でレンダリング"""
+        return self.text_cache.render(font, text, color)
 
-                # テキスト音効果
-                self.play_sound_effect("text_click")
+    def reset_display_message(self):
+        """表示中のメッセージを空に戻す"""
+        self.display_message = ""
+        self.message_index = 0
+        self.text_layout.reset()
+        # 最初の1文字はすぐに表示し、以降は char_delay ごとに表示する
+        self.last_char_time = self.game_clock.now_ms() - self.char_delay - 1
+
+    def reveal_next_char(self, text: str):
+        """次の一文字を表示に追加"""
+        char = text[self.message_index]
+        self.display_message += char
+        self.message_index += 1
+        self.text_layout.append(char)
+
+    def reveal_all(self, text: str):
+        """メッセージを即座に全表示（レイアウトは残りの文字分だけ計算）"""
+        self.display_message = text
+        self.message_index = len(text)
+        self.text_layout.set_text(text)
 
     def draw_text_window(self):
         """ファミコン風テキストウィンドウを描画"""
+        self.draw_text_frame()
+        self.draw_speaker_label()
+        self.draw_message_lines()
+
+    def draw_text_frame(self):
+        """テキストウィンドウの枠とニュース速報の見出しを描画（話者名は draw_speaker_label）"""
         # ウィンドウの位置とサイズ
-        window_rect = pygame.Rect(50, 400, self.width - 100, 150)
-        border_rect = pygame.Rect(45, 395, self.width - 90, 160)
+        window_rect = self.ui_rect(50, 400, DESIGN_WIDTH - 100, 150)
+        border_rect = self.ui_rect(45, 395, DESIGN_WIDTH - 90, 160)
 
         # ニュース表示時は背景色を変更
         bg_color = self.colors['news_bg'] if self.showing_news else self.colors['text_bg']
@@ -397,81 +600,89 @@ class RiceGameWindow:
         pygame.draw.rect(self.screen, bg_color, window_rect)
 
         # 内側のボーダー
-        inner_border = pygame.Rect(45, 395, self.width - 90, 160)
-        pygame.draw.rect(self.screen, self.colors['white'], inner_border, 2)
+        inner_border = self.ui_rect(45, 395, DESIGN_WIDTH - 90, 160)
+        pygame.draw.rect(self.screen, self.colors['white'], inner_border, self.ui_size(2))
 
         if self.showing_news and self.current_news:
             # ニュース表示
-            news_label = self.font_medium.render("【 ニュース速報 】", True, self.colors['yellow'])
-            self.screen.blit(news_label, (70, 405))
-        else:
-            # 話者名表示
-            speaker = self.characters[(self.current_speaker - 1) % len(self.characters)]
-            speaker_text = self.font_medium.render(f"{speaker.name}（{speaker.role}）",
-                                                 True, self.colors['yellow'])
-            self.screen.blit(speaker_text, (70, 405))
+            news_label = self.render_text(self.font_medium, "【 ニュース速報 】", self.colors['yellow'])
+            self.screen.blit(news_label, self.ui_point(70, 405))
+
+    def draw_speaker_label(self):
+        """テキストウィンドウの見出しに話者名を描画（ニュース表示中は描かない）"""
+        if self.showing_news and self.current_news:
+            return
+        speaker = self.characters[(self.current_speaker - 1) % len(self.characters)]
+        speaker_text = self.render_text(self.font_medium, f"{speaker.name}（{speaker.role}）",
+                                        self.colors['yellow'])
+        self.screen.blit(speaker_text, self.ui_point(70, 405))
 
+    def draw_message_lines(self):
+        """タイプ中のメッセージ本文を描画"""
         # メッセージテキスト表示（複数行対応）445は表示の高さの位置 2行目の高さは45
-        lines = self.wrap_text(self.display_message, self.width - 140)
+        lines = self.text_layout.lines
         y_offset = 445
         for line in lines:
             if y_offset < 540:  # ウィンドウ内に収まる範囲
-                text_surface = self.font_small.render(line, True, self.colors['white'])
-                self.screen.blit(text_surface, (70, y_offset))
+                text_surface = self.render_text(self.font_small, line, self.colors['white'])
+                self.screen.blit(text_surface, self.ui_point(70, y_offset))
                 y_offset += 45
 
     def wrap_text(self, text: str, max_width: int) -> List[str]:
         """テキストを指定幅で折り返し"""
-        words = text
-        lines = []
-        current_line = ""
-
-        for char in words:
-            test_line = current_line + char
-            text_width = self.font_small.size(test_line)[0]
-
-            if text_width <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = char
-
-        if current_line:
-            lines.append(current_line)
-
-        return lines
+        layout = TextLayout(self.glyph_metrics, max_width)
+        layout.extend(text)
+        return layout.lines
 
     def draw_ui(self):
         """UI要素を描画"""
-        # タイトル
-        title = self.font_large.render("Rice Weather Japan", True, self.colors['white'])
-        title_rect = title.get_rect(center=(self.width // 2, 30))
+        self.draw_title()
+        self.draw_status()
+        self.draw_price_chart()
+        self.draw_news_indicator()
+
+        # キャラクター表示
+        self.draw_characters()
+
+    def draw_title(self):
+        """タイトルを描画"""
+        title = self.render_text(self.font_large, "Rice Weather Japan", self.colors['white'])
+        title_rect = title.get_rect(center=(self.width // 2, self.ui_y(30)))
         self.screen.blit(title, title_rect)
 
+    def draw_status(self):
+        """月・価格・価格インジケーターを描画"""
         # 月表示
-        month_text = self.font_medium.render(f"{self.current_month}月", True, self.colors['white'])
-        self.screen.blit(month_text, (50, 70))
+        month_text = self.render_text(self.font_medium, f"{self.current_month}月", self.colors['white'])
+        self.screen.blit(month_text, self.ui_point(50, 70))
 
         # 価格表示
-        price_text = self.font_medium.render(f"米価格: ¥{self.rice_price}/kg",
-                                           True, self.colors['green'])
-        self.screen.blit(price_text, (140, 70))
-
-        # ニュース表示中の表示
-        if self.showing_news:
-            news_indicator = self.font_small.render("【新しいトピックです】", True, self.colors['red'])
-            self.screen.blit(news_indicator, (70, 350))
+        price_text = self.render_text(self.font_medium, f"米価格: ¥{self.rice_price}/kg",
+                                      self.colors['green'])
+        self.screen.blit(price_text, self.ui_point(140, 70))
 
         # 価格グラフ（簡易版）
         self.draw_price_indicator()
 
-        # キャラクター表示
-        self.draw_characters()
+        # 一時停止中・早送り中の表示
+        speed_label = self.game_clock.label()
+        if speed_label:
+            speed_text = self.render_text(self.font_small, speed_label, self.colors['yellow'])
+            self.screen.blit(speed_text, self.ui_point(670, 72))
+
+    def draw_price_chart(self):
+        """価格の推移グラフを描画（新しい月の分だけ描き足す）"""
+        self.price_chart.draw(self.screen, self.chart_rect.topleft)
+
+    def draw_news_indicator(self):
+        """ニュース表示中の表示"""
+        if self.showing_news:
+            news_indicator = self.render_text(self.font_small, "【新しいトピックです】", self.colors['red'])
+            self.screen.blit(news_indicator, self.ui_point(70, 350))
 
     def draw_price_indicator(self):
         """価格インジケーターを描画"""
-        indicator_rect = pygame.Rect(400, 87, 250, 20)
+        indicator_rect = self.ui_rect(400, 87, 250, 20)
         pygame.draw.rect(self.screen, self.colors['gray'], indicator_rect)
 
         # 価格に応じた色分け
@@ -484,34 +695,59 @@ class RiceGameWindow:
             color = self.colors['red']  # 高い
 
         fill_width = int(240 * price_ratio)
-        fill_rect = pygame.Rect(405, 92, fill_width, 10)
+        fill_rect = self.ui_rect(405, 92, fill_width, 10)
         pygame.draw.rect(self.screen, color, fill_rect)
 
     def draw_characters(self):
-        """キャラクターを描画"""
-        char_positions = [(150, 190), (350, 190), (550, 190)]
-
-        for i, char in enumerate(self.characters):
-            x, y = char_positions[i]
-
-            # キャラクター画像（または代替矩形）
-            if char.image:
-                self.screen.blit(char.image, (x, y))
-            else:
-                # 画像がない場合の代替表示
-                char_rect = pygame.Rect(x, y, 120, 120)
-                colors = [self.colors['red'], self.colors['green'], self.colors['blue']]
-                pygame.draw.rect(self.screen, colors[i], char_rect)
-
-                # キャラクター名
-                name_text = self.font_small.render(char.role, True, self.colors['white'])
-                name_rect = name_text.get_rect(center=(x + 60, y + 60))
-                self.screen.blit(name_text, name_rect)
-
-            # 現在の話者をハイライト（ニュース表示中は無効）8はボーダーの太さ
-            if not self.showing_news and i == (self.current_speaker - 1) % len(self.characters):
-                highlight_rect = pygame.Rect(x - 10, y - 10, 140, 140)
-                pygame.draw.rect(self.screen, self.colors['yellow'], highlight_rect, 16)
+        """キャラクターを描画（通常は FrameRenderer が変化したスプライトだけを描く）"""
+        self.update_character_sprites()
+        for sprite in self.character_stage.group.sprites():
+            if sprite.visible:
+                self.screen.blit(sprite.image, sprite.rect)
+
+    def character_frames(self, index: int, char: Character) -> Frames:
+        """キャラクターのコマ（スプライトシート、1枚絵、画像が無ければ代替表示の順）"""
+        if char.frames:
+            return char.frames
+        if char.image:
+            return still_frames(char.image, self.ui_size(2))
+        # 画像がない場合の代替表示（色付きの矩形と役割名）
+        placeholder = pygame.Surface(self.character_size()).convert()
+        colors = [self.colors['red'], self.colors['green'], self.colors['blue']]
+        placeholder.fill(colors[index % len(colors)])
+        name_text = self.render_text(self.font_small, char.role, self.colors['white'])
+        placeholder.blit(name_text, name_text.get_rect(center=placeholder.get_rect().center))
+        return still_frames(placeholder, self.ui_size(2))
+
+    def build_character_sprites(self):
+        """キャラクターのスプライトを作り直す（画像の読み込み・差し替え後）"""
+        self.character_stage.build([self.character_frames(i, char) for i, char in enumerate(self.characters)],
+                                   self.character_positions(), self.character_size())
+
+    def update_character_sprites(self):
+        """話者の口パク（タイプ表示の1文字ごと）と待機アニメーションのコマを選ぶ"""
+        talking = not self.showing_news and self.message_index < len(self.current_text())
+        self.character_stage.update(self.game_clock.now(), self.highlighted_speaker(), talking,
+                                    self.message_index)
+
+    def character_positions(self) -> List[Tuple[int, int]]:
+        """キャラクターの表示位置（3人のときは (150, 190), (350, 190), (550, 190)）"""
+        count = len(self.characters)
+        spacing = min(200, (DESIGN_WIDTH - 40) // max(count, 1))
+        # 元のレイアウトに合わせ、中央から右へ10pxずらして並べる
+        left = (DESIGN_WIDTH - spacing * (count - 1) - 120) // 2 + 10
+        return [self.ui_point(left + i * spacing, 190) for i in range(count)]
+
+    def character_size(self) -> Tuple[int, int]:
+        """キャラクター画像の表示サイズ"""
+        width, height = asset_bake.CHARACTER_SIZE
+        return self.ui_size(width), self.ui_size(height)
+
+    def highlighted_speaker(self) -> int:
+        """ハイライトする話者のインデックス（ニュース表示中は-1）"""
+        if self.showing_news:
+            return -1
+        return (self.current_speaker - 1) % len(self.characters)
 
     def draw_background(self):
         """背景を描画"""
@@ -530,53 +766,165 @@ class RiceGameWindow:
             bg_color = season_colors.get(season, (50, 50, 100))
             self.screen.fill(bg_color)
 
+    def handle_event(self, event):
+        """入力イベントを処理"""
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == ASSET_LOADED:
+            self.loader.poll()
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                # プロファイラーのHUD表示を切り替え（未使用なら計測を開始）
+                if self.profiler is None:
+                    self.profiler = FrameProfiler()
+                self.profiler.hud_visible = not self.profiler.hud_visible
+            elif event.key == pygame.K_F4 and self.profiler is not None:
+                self.profiler.export_csv()
+            elif event.key == pygame.K_p:
+                self.game_clock.toggle_pause()
+            elif event.key in (pygame.K_1, pygame.K_2, pygame.K_3):
+                self.game_clock.scale = TIME_SCALES[event.key - pygame.K_1]
+            elif event.key == pygame.K_n:
+                self.skip_to_next_month()
+            elif event.key == pygame.K_PAGEUP:
+                self.seek_replay(-12)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.seek_replay(12)
+            elif event.key == pygame.K_SPACE:
+                # スペースキーで次のメッセージ（再生中は記録どおりに進めるため全文表示のみ）
+                if isinstance(self.simulation, ReplaySimulation):
+                    if self.message_index < len(self.current_text()):
+                        self.reveal_all(self.current_text())
+                elif self.showing_news:
+                    if self.message_index >= len(self.current_text()):
+                        # ニュース表示を強制終了してキャラクター会話へ
+                        self.apply_simulation_events(self.simulation.end_news())
+                    else:
+                        # ニュースメッセージを即座に全表示
+                        self.reveal_all(self.current_text())
+                else:
+                    if self.message_index >= len(self.current_message):
+                        self.set_new_message()
+                    else:
+                        # メッセージを即座に全表示
+                        self.reveal_all(self.current_message)
+
+    def skip_to_next_month(self):
+        """ゲーム内時計を次の月の切り替わりまで進める（ニュースが残っていれば先に終える）"""
+        for _ in range(3):
+            self.game_clock.advance(self.simulation.time_until_next_update())
+            events = self.simulation.update()
+            self.apply_simulation_events(events)
+            if events and events[0].kind == MONTH:
+                break
+
+    def time_until_next_update(self) -> float:
+        """次に状態が変化するまでの実時間のミリ秒（タイプ中の文字・ニュース終了・月切り替え）"""
+        wait_ms = self.simulation.time_until_next_update() * 1000
+
+        if self.message_index < len(self.current_text()):
+            # update_text_display は char_delay を「超えた」時点で次の文字を出す
+            next_char = self.last_char_time + self.char_delay + 1 - self.game_clock.now_ms()
+            wait_ms = min(wait_ms, next_char)
+
+        # 待機アニメーションの次のコマ（動くスプライトシートが無ければ待たない）
+        wait_ms = min(wait_ms, self.character_stage.time_until_next_frame(self.game_clock.now()) * 1000)
+
+        # ゲーム内時間の待ち時間を実時間に換算（停止中は入力が来るまで待つ）
+        wait_ms = self.game_clock.real_delay_ms(wait_ms)
+
+        if self.profiler is not None and self.profiler.hud_visible:
+            wait_ms = min(wait_ms, HUD_REFRESH_NS / 1e6)
+
+        return max(0.0, wait_ms)
+
+    def show_loading_splash(self):
+        """必須資源の読み込みが終わるまで進捗バーを表示"""
+        bar_rect = pygame.Rect(self.width // 4, self.height // 2 - 10, self.width // 2, 20)
+        while self.running and not self.loader.essential_ready:
+            self.screen.fill(self.colors['black'])
+            label = self.render_text(self.font_medium, "Loading...", self.colors['white'])
+            self.screen.blit(label, label.get_rect(midbottom=(self.width // 2, bar_rect.top - 10)))
+            pygame.draw.rect(self.screen, self.colors['white'], bar_rect, 2)
+            fill_rect = bar_rect.inflate(-6, -6)
+            fill_rect.width = int(fill_rect.width * self.loader.progress)
+            pygame.draw.rect(self.screen, self.colors['green'], fill_rect)
+            self.display.present()
+
+            # 読み込み完了イベント（ASSET_LOADED）か入力が来るまで待機
+            for event in self.scheduler.wait(self.scheduler.max_wait_ms):
+                self.handle_event(event)
+
+        # 開始時点では simulation の時計を読み込み完了時刻に合わせる
+        self.simulation.last_update = self.simulation.clock()
+
     def run(self):
         """メインゲームループ"""
-        # 初期メッセージ設定
-        self.set_new_message()
+        # フォント・ニュース・メッセージが揃うまで読み込み画面を表示
+        self.show_loading_splash()
+        if not self.running:
+            self.loader.shutdown()
+            pygame.quit()
+            return
+
+        self.watcher.start()
+
+        # 初期メッセージ設定（再生時は移動先の状態、保存した状態があればその続き）
+        if self.resume_snapshot is not None:
+            self.resume_display(self.resume_snapshot)
+            self.resume_snapshot = None
+        else:
+            self.apply_simulation_events(self.simulation.start())
 
         # Play background music
         self.play_background_music()
 
         while self.running:
-            # イベント処理
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        # スペースキーで次のメッセージ
-                        if self.showing_news:
-                            if self.message_index >= len(f"【{self.current_news.name}】{self.current_news.content}"):
-                                # ニュース表示を強制終了してキャラクター会話へ
-                                self.showing_news = False
-                                self.current_news = None
-                                self.set_new_message()
-                            else:
-                                # ニュースメッセージを即座に全表示
-                                full_text = f"【{self.current_news.name}】{self.current_news.content}"
-                                self.display_message = full_text
-                                self.message_index = len(full_text)
-                        else:
-                            if self.message_index >= len(self.current_message):
-                                self.set_new_message()
-                            else:
-                                # メッセージを即座に全表示
-                                self.display_message = self.current_message
-                                self.message_index = len(self.current_message)
+            # 次の状態変化まで待機し、その間に届いたイベントを処理
+            events = self.scheduler.wait(self.time_until_next_update())
+            profiler = self.profiler
+            if profiler:
+                profiler.begin_frame()
+            for event in events:
+                self.handle_event(event)
+            if profiler:
+                profiler.mark(EVENTS)
 
             # ゲーム状態更新
             self.update_price()
+            if profiler:
+                profiler.mark(UPDATE_PRICE)
             self.update_text_display()
-
-            # 描画
-            self.draw_background()
-            self.draw_ui()
-            self.draw_text_window()
-
-            pygame.display.flip()
-            self.clock.tick(60)
-
-        # Stop background music before quitting
-        self.stop_background_music()
+            if profiler:
+                profiler.mark(UPDATE_TEXT_DISPLAY)
+
+            # 描画（変化した領域のみ転送）
+            hud = profiler.hud_surface() if profiler and profiler.hud_visible else None
+            dirty_rects = self.renderer.render(hud)
+            if dirty_rects:
+                self.display.present(dirty_rects)
+            if self.broadcaster is not None:
+                self.broadcaster.publish_state(self.broadcast_state())
+                if dirty_rects:
+                    self.broadcaster.publish_frame(self.screen)
+            if profiler:
+                profiler.mark(DISPLAY_UPDATE)
+                profiler.end_frame()
+
+        if self.profile_export and self.profiler is not None:
+            self.profiler.export_csv()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.broadcaster is not None:
+            self.broadcaster.stop()
+        if self.autosaver is not None:
+            self.autosaver.save(self.capture_snapshot().to_bytes())
+            self.autosaver.close()
+        if self.simulation.price_source is not None:
+            self.simulation.price_source.close()
+
+        # Stop background music (and wait for its loader thread) before quitting
+        self.watcher.stop()
+        self.loader.shutdown()
+        self.audio.shutdown()
         pygame.quit()
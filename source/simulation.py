@@ -0,0 +1,224 @@
+import argparse
+import os
+import random
+import time
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from source.character import Character
+from source.news_item import NewsItem
+from source.news_store import NewsStore
+from source.price_source import PriceSource, RandomWalkPriceSource, open_price_source
+
+# イベントの種類
+MONTH = "month"      # value: 新しい月 (1-12)
+PRICE = "price"      # value: 新しい米価格
+NEWS = "news"        # value: 表示するNewsItem
+SPEAKER = "speaker"  # value: 話者のインデックス
+LINE = "line"        # value: 話者のセリフ
+
+SEASON_PRICE_FACTORS = {
+    'spring': 0.8,  # 春：やや安定
+    'summer': 1.2,  # 夏：やや高め
+    'autumn': 0.6,  # 秋：収穫期で安め
+    'winter': 1.0   # 冬：通常
+}
+
+
+class SimulationEvent(NamedTuple):
+    kind: str
+    value: object
+
+
+def get_season(month: int) -> str:
+    """月から季節を取得"""
+    if month in [3, 4, 5]:
+        return 'spring'
+    elif month in [6, 7, 8]:
+        return 'summer'
+    elif month in [9, 10, 11]:
+        return 'autumn'
+    else:
+        return 'winter'
+
+
+class RiceSimulation:
+    """米価格・ニュース・話者ローテーションのシミュレーション（pygame非依存）
+
+    乱数生成器と時計を外から注入でき、状態の変化をイベントのリストとして返す。
+    """
+
+    def __init__(self, characters: List[Character], news_items: Iterable[NewsItem],
+                 rng: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 price_source: Optional[PriceSource] = None):
+        self.characters = characters
+        self.news_items = news_items if isinstance(news_items, NewsStore) else NewsStore(list(news_items))
+        self.rng = rng if rng is not None else random.Random()
+        self.clock = clock
+        # 実データなどの価格ソース（None なら乱数モデルのみ）
+        self.price_source = price_source
+        self.random_walk = RandomWalkPriceSource()
+
+        self.current_month = 1
+        self.rice_price = 400
+        self.last_update = clock()
+
+        self.showing_news = False
+        self.current_news: Optional[NewsItem] = None
+        self.news_start_time = 0
+        self.news_duration = 6.0  # ニュース表示時間（6秒）
+        self.character_message_duration = 5.0  # キャラクター会話時間（5秒）
+        self.character_start_time = 0
+
+        self.current_speaker = 0
+        self.current_message = ""
+
+    def start(self) -> List[SimulationEvent]:
+        """初期メッセージを設定"""
+        return self.set_new_message()
+
+    def update(self) -> List[SimulationEvent]:
+        """時計を読み、タイマーに応じて状態を進める"""
+        current_time = self.clock()
+
+        # ニュース表示中の場合
+        if self.showing_news:
+            if current_time - self.news_start_time >= self.news_duration:
+                # ニュース終了、キャラクター会話に移行
+                events = self.end_news()
+                self.character_start_time = current_time  # キャラクター会話の開始時間を記録
+                return events
+            return []
+
+        # キャラクター会話中で、ニュースの後の場合
+        if self.character_start_time > 0:
+            if current_time - self.character_start_time >= self.character_message_duration:
+                # キャラクター会話終了、月を切り替える
+                self.character_start_time = 0  # リセット
+                return self.advance_month(current_time)
+            return []
+
+        # 通常の月更新タイミング（ニュースがなかった場合）
+        if current_time - self.last_update >= self.character_message_duration:
+            return self.advance_month(current_time)
+        return []
+
+    def time_until_next_update(self) -> float:
+        """次にタイマーで状態が変化するまでの秒数"""
+        if self.showing_news:
+            deadline = self.news_start_time + self.news_duration
+        elif self.character_start_time > 0:
+            deadline = self.character_start_time + self.character_message_duration
+        else:
+            deadline = self.last_update + self.character_message_duration
+        return max(0.0, deadline - self.clock())
+
+    def advance_month(self, current_time: float) -> List[SimulationEvent]:
+        """月を進める処理"""
+        # 月を進める
+        self.current_month += 1
+        if self.current_month > 12:
+            self.current_month = 1
+
+        # 価格を変動させる（価格ソースが無い・届いていない場合は季節要因付きの乱数モデル）
+        previous_price = self.rice_price
+        price = self.price_source.next_price(self) if self.price_source is not None else None
+        if price is None:
+            price = self.random_walk.next_price(self)
+        self.rice_price = max(200, min(800, price))  # 価格範囲制限
+
+        events = [SimulationEvent(MONTH, self.current_month), SimulationEvent(PRICE, self.rice_price)]
+
+        # ニュースを表示するかチェック
+        if self.should_show_news():
+            self.current_news = self.select_random_news(self.rice_price - previous_price)
+            if self.current_news:
+                self.showing_news = True
+                self.news_start_time = current_time
+                events.append(SimulationEvent(NEWS, self.current_news))
+                return events
+
+        # ニュースを表示しない場合は通常のキャラクター会話
+        events.extend(self.set_new_message())
+        self.last_update = current_time
+        return events
+
+    def end_news(self) -> List[SimulationEvent]:
+        """ニュース表示を終了してキャラクター会話へ"""
+        self.showing_news = False
+        self.current_news = None
+        return self.set_new_message()
+
+    def should_show_news(self) -> bool:
+        """ニュースを表示するかどうかを決定（10-36%の確率）"""
+        if not self.news_items:
+            return False
+
+        probability = self.rng.randint(10, 36)
+        return self.rng.randint(1, 100) <= probability
+
+    def select_random_news(self, price_change: Optional[int] = None) -> Optional[NewsItem]:
+        """価格の動きと季節に合ったニュース項目を重み付きで選択"""
+        return self.news_items.sample(self.rng, price_change, get_season(self.current_month))
+
+    def get_season_price_factor(self) -> float:
+        """季節による価格変動係数"""
+        return SEASON_PRICE_FACTORS.get(get_season(self.current_month), 1.0)
+
+    def set_new_message(self) -> List[SimulationEvent]:
+        """新しいメッセージを設定"""
+        speaker_index = self.current_speaker
+        speaker = self.characters[speaker_index]
+        self.current_message = speaker.get_message(self.rice_price, self.rng)
+
+        # 次の話者に変更
+        self.current_speaker = (self.current_speaker + 1) % len(self.characters)
+        return [SimulationEvent(SPEAKER, speaker_index), SimulationEvent(LINE, self.current_message)]
+
+    def display_events(self) -> List[SimulationEvent]:
+        """表示中のニュース、または最後の話者とセリフを表示し直すためのイベント"""
+        if self.showing_news:
+            return [SimulationEvent(NEWS, self.current_news)]
+        if self.current_message:
+            return [SimulationEvent(SPEAKER, (self.current_speaker - 1) % len(self.characters)),
+                    SimulationEvent(LINE, self.current_message)]
+        return []
+
+    def run_months(self, months: int) -> Iterator[SimulationEvent]:
+        """時計を使わずに指定した月数だけ進め、イベントを順に返す（ヘッドレス実行用）"""
+        for _ in range(months):
+            yield from self.advance_month(0)
+            if self.showing_news:
+                yield from self.end_news()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="米価格シミュレーションを画面なしで実行します")
+    parser.add_argument("--years", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--prices", default=None, help="価格データ（CSV/JSONLファイルまたはURL）")
+    args = parser.parse_args()
+
+    characters = [
+        Character.create_from_config("田中さん", "主婦", "housewife"),
+        Character.create_from_config("山田さん", "農家", "farmer"),
+        Character.create_from_config("佐藤議員", "政治家", "politician")
+    ]
+    news_items = NewsStore.load(os.path.join("assets", "data", "news.csv"))
+    simulation = RiceSimulation(characters, news_items, rng=random.Random(args.seed))
+    if args.prices:
+        simulation.price_source = open_price_source(args.prices, block=True)
+
+    start = time.perf_counter()
+    counts = {}
+    for event in simulation.run_months(args.years * 12):
+        counts[event.kind] = counts.get(event.kind, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.years}年分を{elapsed:.3f}秒で実行しました（{args.years / elapsed:.0f}年/秒）")
+    for kind, count in counts.items():
+        print(f"  {kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import os
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+from source.log import get_logger
+from source.news_item import NewsItem
+from source.news_store import SEASONS
+from source.price_history import PriceHistory
+
+log = get_logger("snapshot")
+
+# 状態の保存ファイル（.rws）: [ヘッダー][本体][本体のCRC32 u32]
+# 本体: 固定長の状態 → セリフ → ニュース（表示中のみ）→ 乱数の状態 → 価格履歴（古い順）
+SNAPSHOT_MAGIC = b"RWSS"
+SNAPSHOT_VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+CHECKSUM = struct.Struct("<I")
+
+_STATE_FIELDS = struct.Struct("<BiBBdddI")  # 月, 価格, 次の話者, ニュース表示中, 経過秒数x3, 表示済み文字数
+_RNG_FIELDS = struct.Struct("<B625IBd")     # random.Random の状態（版, 内部状態, gauss の次の値）
+_HISTORY_FIELDS = struct.Struct("<QI")      # 通算件数, 保存した件数
+_STRING_LENGTH = struct.Struct("<H")
+
+_INACTIVE = -1.0  # 経過秒数の欄で「そのタイマーは動いていない」を表す
+
+
+def _pack_string(text: str) -> bytes:
+    data = text.encode('utf-8')
+    return _STRING_LENGTH.pack(len(data)) + data
+
+
+def _unpack_string(buffer, offset: int) -> Tuple[str, int]:
+    (length,) = _STRING_LENGTH.unpack_from(buffer, offset)
+    start = offset + _STRING_LENGTH.size
+    return bytes(buffer[start:start + length]).decode('utf-8'), start + length
+
+
+class Snapshot:
+    """RiceSimulation と価格履歴の状態一式（pickle を使わない版付きの形式）
+
+    タイマーは保存時点からの経過秒数で持ち、復元時の時計に合わせ直す。
+    乱数生成器の状態も含むため、再開後の価格・ニュース・セリフの選択は
+    停止しなかった場合と同じ系列が続く（価格ソースの読み込み位置は含まない）。
+    """
+
+    __slots__ = ("month", "price", "speaker", "message", "news", "news_elapsed",
+                 "character_elapsed", "since_update", "typed", "rng_state", "history_total", "history")
+
+    def __init__(self, month: int, price: int, speaker: int, message: str, news: Optional[NewsItem],
+                 news_elapsed: float, character_elapsed: float, since_update: float, typed: int,
+                 rng_state: tuple, history: List[Tuple[int, int, int, int]], history_total: int = 0):
+        self.month = month
+        self.price = price
+        self.speaker = speaker  # 次に話す話者（RiceSimulation.current_speaker）
+        self.message = message
+        self.news = news  # 表示中のニュース（表示していなければ None）
+        self.news_elapsed = news_elapsed
+        self.character_elapsed = character_elapsed
+        self.since_update = since_update
+        self.typed = typed  # タイプ表示済みの文字数
+        self.rng_state = rng_state
+        self.history_total = history_total  # PriceHistory.total
+        self.history = history  # 古い順の (月, 価格, 季節番号, ニュース有無)
+
+    @classmethod
+    def capture(cls, simulation, history: PriceHistory, typed: int = 0) -> "Snapshot":
+        now = simulation.clock()
+        news = simulation.current_news if simulation.showing_news else None
+        count = len(history)
+        start = history.total - count
+        rows = []
+        for serial in range(start, history.total):
+            i = serial % history.capacity
+            rows.append((history.months[i], history.prices[i], history.seasons[i], history.news[i]))
+        return cls(simulation.current_month, simulation.rice_price, simulation.current_speaker,
+                   simulation.current_message, news,
+                   now - simulation.news_start_time if news is not None else _INACTIVE,
+                   now - simulation.character_start_time if simulation.character_start_time > 0 else _INACTIVE,
+                   now - simulation.last_update, typed, simulation.rng.getstate(), rows, history.total)
+
+    def restore(self, simulation, history: PriceHistory):
+        """simulation と history をこのスナップショットの状態にする"""
+        simulation.current_month = self.month
+        simulation.rice_price = self.price
+        simulation.current_speaker = self.speaker % len(simulation.characters)
+        simulation.current_message = self.message
+        simulation.showing_news = self.news is not None
+        simulation.current_news = self.news
+        simulation.rng.setstate(self.rng_state)
+        self.restore_timers(simulation)
+
+        rows = self.history[-history.capacity:]
+        history.clear()
+        # 通算件数（グラフの描画位置の基準）を保ったまま、古い順に追加し直す
+        history.total = self.history_total - len(rows)
+        for month, price, season, news in rows:
+            history.append(month, price, SEASONS[season], bool(news))
+
+    def restore_timers(self, simulation):
+        """ニュース・会話・月のタイマーを、今の時計から保存時の経過秒数だけ戻した位置に合わせる"""
+        now = simulation.clock()
+        if self.news is not None:
+            simulation.news_start_time = now - self.news_elapsed
+        # 0 以下は「会話タイマーなし」の意味になるため、起動直後の時計ではわずかに正の値にする
+        simulation.character_start_time = (max(now - self.character_elapsed, 1e-6)
+                                           if self.character_elapsed >= 0 else 0)
+        simulation.last_update = now - self.since_update
+
+    def to_bytes(self) -> bytes:
+        version, internal, gauss_next = self.rng_state
+        has_news = self.news is not None
+        parts = [
+            FILE_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION),
+            _STATE_FIELDS.pack(self.month, self.price, self.speaker, has_news, self.news_elapsed,
+                               self.character_elapsed, self.since_update, self.typed),
+            _pack_string(self.message),
+        ]
+        if has_news:
+            parts.extend(_pack_string(s) for s in (self.news.name, self.news.content,
+                                                   self.news.news_id, self.news.category))
+        parts.append(_RNG_FIELDS.pack(version, *internal, gauss_next is not None, gauss_next or 0.0))
+
+        rows = self.history
+        parts.append(_HISTORY_FIELDS.pack(self.history_total, len(rows)))
+        # 列ごとにまとめて書く（PriceHistory の配列と同じ並び）
+        for column, code in ((0, "B"), (1, "i"), (2, "B"), (3, "B")):
+            parts.append(struct.pack(f"<{len(rows)}{code}", *(row[column] for row in rows)))
+        body = b"".join(parts)
+        return body + CHECKSUM.pack(zlib.crc32(body))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Snapshot":
+        """バイト列から読み込む（形式が違う・壊れている場合は ValueError）"""
+        if len(data) < FILE_HEADER.size + CHECKSUM.size:
+            raise ValueError("スナップショットが短すぎます")
+        body = memoryview(data)[:-CHECKSUM.size]
+        (checksum,) = CHECKSUM.unpack_from(data, len(data) - CHECKSUM.size)
+        if zlib.crc32(body) != checksum:
+            raise ValueError("スナップショットが壊れています（チェックサム不一致）")
+        magic, version = FILE_HEADER.unpack_from(body, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("スナップショットではありません")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"未対応のスナップショットの版です: {version}")
+
+        try:
+            offset = FILE_HEADER.size
+            (month, price, speaker, has_news, news_elapsed, character_elapsed,
+             since_update, typed) = _STATE_FIELDS.unpack_from(body, offset)
+            offset += _STATE_FIELDS.size
+            message, offset = _unpack_string(body, offset)
+            news = None
+            if has_news:
+                fields = []
+                for _ in range(4):
+                    text, offset = _unpack_string(body, offset)
+                    fields.append(text)
+                news = NewsItem(*fields)
+
+            values = _RNG_FIELDS.unpack_from(body, offset)
+            offset += _RNG_FIELDS.size
+            rng_state = (values[0], tuple(values[1:626]), values[627] if values[626] else None)
+
+            total, count = _HISTORY_FIELDS.unpack_from(body, offset)
+            offset += _HISTORY_FIELDS.size
+            columns = []
+            for code, size in (("B", 1), ("i", 4), ("B", 1), ("B", 1)):
+                columns.append(struct.unpack_from(f"<{count}{code}", body, offset))
+                offset += count * size
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"スナップショットを読み込めません: {e}") from e
+        return cls(month, price, speaker, message, news, news_elapsed, character_elapsed, since_update,
+                   typed, rng_state, list(zip(*columns)), total)
+
+
+def load_snapshot(path: str) -> Optional[Snapshot]:
+    """保存した状態を読み込む（無い・読めない場合は None で、最初から始める）"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        log.warning("保存した状態を読み込めません: %s, %s", path, e)
+        return None
+    try:
+        return Snapshot.from_bytes(data)
+    except ValueError as e:
+        log.warning("保存した状態を使わずに最初から始めます: %s, %s", path, e)
+        return None
+
+
+def write_atomic(path: str, data: bytes):
+    """一時ファイルに書いてから置き換える（途中で電源が落ちても古いか新しいかのどちらかが残る）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # 置き換え（ディレクトリの更新）も確実に書き込む
+        try:
+            fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class AutoSaver:
+    """状態をバックグラウンドのスレッドで保存する
+
+    save() は保存する内容を渡すだけで待たない。書き込み中に次の内容が
+    届いた場合は最新のものだけを残し、古いものは書かずに捨てる。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.saved = 0
+        self._pending: Optional[bytes] = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def save(self, data: bytes):
+        with self._condition:
+            self._pending = data
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                data, self._pending = self._pending, None
+                if data is None:
+                    return
+            try:
+                write_atomic(self.path, data)
+                self.saved += 1
+            except OSError as e:
+                log.error("状態の保存に失敗しました: %s, %s", self.path, e)
+
+    def close(self, timeout: float = 5.0):
+        """保存待ちの内容を書き終えてからスレッドを止める"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
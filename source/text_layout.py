@@ -0,0 +1,70 @@
+from typing import Dict, List
+
+import pygame
+
+
+class GlyphMetrics:
+    """フォントごとの文字送り幅をキャッシュする"""
+
+    def __init__(self, font: pygame.font.Font):
+        self.font = font
+        self._advances: Dict[str, int] = {}
+
+    def advance(self, char: str) -> int:
+        width = self._advances.get(char)
+        if width is None:
+            width = self.font.size(char)[0]
+            self._advances[char] = width
+        return width
+
+
+class TextLayout:
+    """一文字ずつ追加しながら折り返し位置を確定していくレイアウトエンジン
+
+    確定済みの行はフレームをまたいで保持し、追加された文字の分だけ計算する。
+    """
+
+    def __init__(self, metrics: GlyphMetrics, max_width: int):
+        self.metrics = metrics
+        self.max_width = max_width
+        self.text = ""
+        self._lines: List[str] = []
+        self._current_line = ""
+        self._current_width = 0
+
+    def reset(self):
+        """レイアウトを空にする（文字幅キャッシュは保持）"""
+        self.text = ""
+        self._lines = []
+        self._current_line = ""
+        self._current_width = 0
+
+    def append(self, char: str):
+        """一文字追加して折り返しを更新"""
+        width = self.metrics.advance(char)
+        if self._current_width + width <= self.max_width:
+            self._current_line += char
+            self._current_width += width
+        else:
+            if self._current_line:
+                self._lines.append(self._current_line)
+            self._current_line = char
+            self._current_width = width
+        self.text += char
+
+    def extend(self, text: str):
+        """複数文字をまとめて追加"""
+        for char in text:
+            self.append(char)
+
+    def set_text(self, text: str):
+        """テキスト全体を一度だけレイアウトする。既存の内容の続きであれば差分のみ追加"""
+        if not text.startswith(self.text):
+            self.reset()
+        self.extend(text[len(self.text):])
+
+    @property
+    def lines(self) -> List[str]:
+        if self._current_line:
+            return self._lines + [self._current_line]
+        return list(self._lines)